@@ -6,7 +6,7 @@ Free trading system for SPOT exchanges
 __author__ = "Jerry Fedorenko"
 __copyright__ = "Copyright © 2021-2026 Jerry Fedorenko aka VM"
 __license__ = "MIT"
-__version__ = "3.1.8post01"
+__version__ = "3.1.9"
 __maintainer__ = "Jerry Fedorenko"
 __contact__ = "https://github.com/DogsTailFarmer"
 
@@ -26,6 +26,7 @@ DB_FILE = Path(WORK_PATH, "funds_rate.db")
 LOG_PATH = Path(WORK_PATH, "log")
 LAST_STATE_PATH = Path(WORK_PATH, "last_state")
 BACKTEST_PATH = Path(WORK_PATH, "back_test")
+ARCHIVE_PATH = Path(BACKTEST_PATH, "archive")  # raw_bak.zip of the MODE 'TC' periods, see ARCHIVE_SESSIONS
 TRIAL_PARAMS = Path(WORK_PATH, "trial_params.json")
 CERT_DIR = Path(WORK_PATH, "keys")
 LOG_FILE_TLG = Path(LOG_PATH, "tlg_proxy.log")
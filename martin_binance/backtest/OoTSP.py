@@ -6,7 +6,7 @@ Optimization of Trading Strategy Parameters
 __author__ = "Jerry Fedorenko"
 __copyright__ = "Copyright © 2021 Jerry Fedorenko aka VM"
 __license__ = "MIT"
-__version__ = "3.1.0"
+__version__ = "3.1.9"
 __maintainer__ = "Jerry Fedorenko"
 __contact__ = "https://github.com/DogsTailFarmer"
 
@@ -15,7 +15,7 @@ import optuna
 import inquirer
 from inquirer.themes import GreenPassion
 from martin_binance import BACKTEST_PATH
-from martin_binance.backtest.optimizer import optimize
+from martin_binance.backtest.optimizer import JOURNAL, optimize, study_storage
 
 SKIP_LOG = True
 
@@ -43,15 +43,27 @@ def main():
                     default='150',
                     validate=lambda _, c: 15 <= int(c) <= 1000,
                 ),
+                inquirer.Text(
+                    "share",
+                    message="Shared folder for the multi-host study with backtest/optimizer_worker.py, empty for local",
+                    ignore=lambda x: x["mode"] == "Exit",
+                    default='',
+                ),
             ]
 
         answers = inquirer.prompt(questions, theme=GreenPassion())
 
         study_name = answers.get('path')  # Unique identifier of the study
-        storage_name = f"sqlite:///{Path(BACKTEST_PATH, study_name, 'study.db')}"
+        if answers.get('share'):
+            storage_path = Path(answers.get('share'), study_name, 'study.log')
+            storage_path.parent.mkdir(parents=True, exist_ok=True)
+            storage_name = f"{JOURNAL}{storage_path}"
+        else:
+            storage_path = Path(BACKTEST_PATH, study_name, 'study.db')
+            storage_name = f"sqlite:///{storage_path}"
 
         if answers.get('mode') == 'New':
-            Path(BACKTEST_PATH, study_name, 'study.db').unlink(missing_ok=True)
+            storage_path.unlink(missing_ok=True)
             try:
                 strategy = next(Path(BACKTEST_PATH, study_name).glob("cli_*.py"))
             except StopIteration:
@@ -69,7 +81,7 @@ def main():
             print(f"Study instance saved to {storage_name} for later use")
         elif answers.get('mode') == 'Analise saved study session':
             # noinspection PyArgumentList
-            study = optuna.load_study(study_name=study_name, storage=storage_name)
+            study = optuna.load_study(study_name=study_name, storage=study_storage(storage_name))
 
             print(f"Best value: {study.best_value}")
             print(f"Original value: {study.get_trials()[0].value}")
@@ -6,7 +6,7 @@ Visual Comparison of Session Extended Log
 __author__ = "Jerry Fedorenko"
 __copyright__ = "Copyright © 2021-2026 Jerry Fedorenko aka VM"
 __license__ = "MIT"
-__version__ = "3.1.6"
+__version__ = "3.1.9"
 __maintainer__ = "Jerry Fedorenko"
 __contact__ = "https://github.com/DogsTailFarmer"
 
@@ -14,23 +14,46 @@ from dash import Dash, html, dcc
 import plotly.graph_objects as go
 import pandas as pd
 
+from datetime import datetime, timezone
 from pathlib import Path
 from tkinter.filedialog import askdirectory
 
 from martin_binance import BACKTEST_PATH
+from martin_binance.backtest.grid_log import GRID_LOG_PRKT, read_events, grid_lines
 
 clrs = {'background': '#696969',
         'text': '#7FDBFF'}
 
+
+def load_grid(_path: Path) -> tuple[list, list]:
+    """
+    Grid lines (x, y) for sell and buy orders from grid event log, or from wide DataFrames of older sessions
+    """
+    res = []
+    if Path(_path, GRID_LOG_PRKT).exists():
+        lines = grid_lines(read_events(Path(_path, GRID_LOG_PRKT)))
+        for buy in (False, True):
+            x, y = lines[buy]
+            # Naive UTC same as ticker.pkl index
+            x = [datetime.fromtimestamp(i / 1000, timezone.utc).replace(tzinfo=None) if i else None for i in x]
+            res.append([x, y])
+    else:
+        for name in ("sell.pkl", "buy.pkl"):
+            df = pd.read_pickle(Path(_path, name))
+            res.append([[], []])
+            for _col in df.columns:
+                res[-1][0].extend([*df.index, None])
+                res[-1][1].extend([*df[_col], None])
+    return res[0], res[1]
+
+
 source_path = askdirectory(title='Pick a folder for base strategy: "back_test/exchange_AAABBB/snapshot/"',
                            initialdir=str(BACKTEST_PATH))
-s_sell_df: pd.DataFrame = pd.read_pickle(Path(BACKTEST_PATH, source_path, "sell.pkl"))
-s_buy_df = pd.read_pickle(Path(BACKTEST_PATH, source_path, "buy.pkl"))
+s_sell, s_buy = load_grid(Path(BACKTEST_PATH, source_path))
 
 df_path = askdirectory(title='Pick a folder for test strategy', initialdir=str(BACKTEST_PATH))
 ds_ticker = pd.read_pickle(Path(BACKTEST_PATH, df_path, "ticker.pkl"))
-df_grid_sell = pd.read_pickle(Path(BACKTEST_PATH, df_path, "sell.pkl"))
-df_grid_buy = pd.read_pickle(Path(BACKTEST_PATH, df_path, "buy.pkl"))
+grid_sell, grid_buy = load_grid(Path(BACKTEST_PATH, df_path))
 
 app = Dash(__name__)
 fig = go.Figure()
@@ -42,40 +65,35 @@ fig.add_traces(
     go.Scatter(x=ds_ticker.index, y=ds_ticker.values, mode='lines', line_color='brown', name='Test')
 )
 
-for col in df_grid_sell.columns:
-    # noinspection PyTypeChecker
-    fig.add_traces(go.Scatter(x=df_grid_sell.index,
-                              y=df_grid_sell[col],
-                              mode='lines',
-                              line_color='red',
-                              showlegend=False))
-
-for col in df_grid_buy.columns:
-    # noinspection PyTypeChecker
-    fig.add_traces(go.Scatter(x=df_grid_buy.index,
-                              y=df_grid_buy[col],
-                              mode='lines',
-                              line_color='green',
-                              showlegend=False))
+# Each grid is one trace, orders are separated by gaps
+# noinspection PyTypeChecker
+fig.add_traces(go.Scatter(x=grid_sell[0],
+                          y=grid_sell[1],
+                          mode='lines',
+                          line_color='red',
+                          showlegend=False))
+
+# noinspection PyTypeChecker
+fig.add_traces(go.Scatter(x=grid_buy[0],
+                          y=grid_buy[1],
+                          mode='lines',
+                          line_color='green',
+                          showlegend=False))
 
 # SOURCE data
 # noinspection PyTypeChecker
+fig.add_traces(go.Scatter(x=s_sell[0],
+                          y=s_sell[1],
+                          mode='lines',
+                          showlegend=False,
+                          line={'color': 'indianred', 'width': 5, 'dash': 'dot'}))
 
-for col in s_sell_df.columns:
-    # noinspection PyTypeChecker
-    fig.add_traces(go.Scatter(x=s_sell_df.index,
-                              y=s_sell_df[col],
-                              mode='lines',
-                              showlegend=False,
-                              line={'color': 'indianred', 'width': 5, 'dash': 'dot'}))
-
-for col in s_buy_df.columns:
-    # noinspection PyTypeChecker
-    fig.add_traces(go.Scatter(x=s_buy_df.index,
-                              y=s_buy_df[col],
-                              mode='lines',
-                              showlegend=False,
-                              line={'color': 'forestgreen', 'width': 5, 'dash': 'dot'}))
+# noinspection PyTypeChecker
+fig.add_traces(go.Scatter(x=s_buy[0],
+                          y=s_buy[1],
+                          mode='lines',
+                          showlegend=False,
+                          line={'color': 'forestgreen', 'width': 5, 'dash': 'dot'}))
 
 
 fig.update_layout(xaxis_tickformat="%H:%M:%S.%L", height=700, autosize=True)
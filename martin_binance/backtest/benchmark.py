@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulator performance benchmarks and regressions of the simulator optimizations
+
+python -m martin_binance.backtest.benchmark [<cli_*.py> <exchange>]
+With the strategy also checks the tick skipping on its synthetic session, needs exchanges-wrapper server
+same as MODE 'S', see strategy_benchmark.py for the session folder
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+import random
+import sys
+import time
+import tracemalloc
+from decimal import Decimal, InvalidOperation
+
+from martin_binance.backtest import optimizer
+from martin_binance.backtest.exchange_simulator import Account, FillEvent, FixedPoint
+from martin_binance.backtest.strategy_benchmark import session_aside
+from martin_binance.backtest.synthetic import Session
+
+GRID_SIZES = (10, 100, 1000, 10000)
+TICKS = 20000
+CHURN_SIZES = (10000, 100000, 1000000)
+PRICE = 30000.0
+FF_SCENARIOS = {'calm': {'ticks': 50000, 'volatility': 0.3}, 'volatile': {'ticks': 50000, 'volatility': 1.2}}
+
+
+class TCM:
+    tick_size = Decimal('0.01')
+    step_size = Decimal('0.00001')
+    base_asset_precision = 8
+    quote_asset_precision = 8
+
+
+class TCMCoarse(TCM):
+    """
+    Asset precision is finer than the amount and fee grid need
+    """
+    step_size = Decimal('0.001')
+
+
+# (exchange info, (fee maker, fee taker)) of the engines_match() cases
+MATCH_CASES = (
+    (TCM, (Decimal('0.1'), Decimal('0.075'))),
+    (TCMCoarse, (Decimal('0.1'), Decimal('0.1'))),
+)
+
+
+def matching_account(grid_size: int, fixed_point: bool = False) -> Account:
+    """
+    Account with grid_size buy and sell orders placed 1..10% away from the price
+    """
+    account = Account(save_ds=False, fp=FixedPoint(TCM, (Decimal('0.1'),)) if fixed_point else None)
+    account.init_funds(
+        {'asset': 'BTC', 'free': Decimal('1000000'), 'locked': Decimal()},
+        {'asset': 'USDT', 'free': Decimal('1000000000000'), 'locked': Decimal()}
+    )
+    step = 0.09 / grid_size
+    for i in range(grid_size):
+        k = 0.01 + step * i
+        account.create_order('BTCUSDT', '', True, '0.001', f"{PRICE * (1 - k):.2f}", 0)
+        account.create_order('BTCUSDT', '', False, '0.001', f"{PRICE * (1 + k):.2f}", 0)
+    return account
+
+
+def account_matching(grid_size: int, ticks: int = TICKS, seed: int = 0, fixed_point: bool = False) -> float:
+    """
+    Mean cost of Account.on_ticker_update() in microseconds per tick for random walk inside the grid spread
+    """
+    rng = random.Random(seed)
+    account = matching_account(grid_size, fixed_point)
+    rows = [
+        {'lastPrice': f"{PRICE * (1 + rng.uniform(-0.005, 0.005)):.2f}", 'Qty': '0', 'closeTime': i}
+        for i in range(ticks)
+    ]
+    start = time.perf_counter()
+    for i, row in enumerate(rows):
+        account.on_ticker_update(row, i)
+    return (time.perf_counter() - start) * 1e6 / ticks
+
+
+def _by_value(res: dict) -> dict:
+    """
+    Numbers of the API response by value, the engines differ in str exponent only, as '0' and '0.00000'
+    """
+    def value(v):
+        try:
+            return Decimal(v) if isinstance(v, str) else v
+        except InvalidOperation:
+            return v
+    return {k: value(v) for k, v in res.items()}
+
+
+def engines_match(tcm=TCM, fees: tuple = MATCH_CASES[0][1], ticks: int = TICKS, seed: int = 0) -> int:
+    """
+    Regression of the fixed-point engine: the same orders, cancels and ticks, with partial fills and market orders,
+    are replayed on the Decimal and the fixed-point Account. Responses, fill events and funds after each step
+    must be equal by value.
+    :return: count of the compared fill events
+    """
+    rng = random.Random(seed)
+    accounts = (Account(save_ds=False), Account(save_ds=False, fp=FixedPoint(tcm, fees)))
+    for account in accounts:
+        account.init_funds(
+            {'asset': 'BTC', 'free': Decimal('100'), 'locked': Decimal()},
+            {'asset': 'USDT', 'free': Decimal('10000000'), 'locked': Decimal()}
+        )
+        account.set_fee(*fees)
+    price = PRICE
+    fills = 0
+    for i in range(ticks):
+        price *= 1 + rng.uniform(-0.002, 0.002)
+        action = rng.random()
+        if action < 0.05:
+            # Limit order around the price, sometimes crossed already, that is the market one
+            buy = rng.random() < 0.5
+            order_price = Decimal(price * rng.uniform(0.99, 1.01)).quantize(tcm.tick_size)
+            args = ('BTCUSDT', '', buy, str(rng.randint(1, 500) * tcm.step_size), str(order_price), i)
+            res = [_by_value(account.create_order(*args)) for account in accounts]
+        elif action < 0.07 and (active := sorted(accounts[0].orders)):
+            order_id = rng.choice(active)
+            res = [_by_value(account.cancel_order(order_id, i)) for account in accounts]
+        else:
+            ticker = {'lastPrice': str(Decimal(price).quantize(tcm.tick_size)),
+                      'Qty': str(rng.choice((0, rng.randint(1, 300))) * tcm.step_size),
+                      'closeTime': i}
+            res = [[{key: e[key] for key in FillEvent.__slots__} for e in account.on_ticker_update(ticker, i)]
+                   for account in accounts]
+            fills += len(res[0])
+        funds = [list(map(_by_value, account.funds.get_funds())) for account in accounts]
+        if res[0] != res[1] or funds[0] != funds[1]:
+            raise UserWarning(f"Fixed-point engine differs from Decimal at step {i}: {res}, {funds}")
+    return fills
+
+
+def _replay(mbs, fast_forward: bool) -> tuple[list, dict, list]:
+    """
+    :return: (fills, session result, funds) of the Strategy replay on the session in BACKTEST_PATH
+    """
+    fills = []
+    on_ticker_update = Account.on_ticker_update
+
+    def probe(account, *args):
+        res = on_ticker_update(account, *args)
+        fills.extend(
+            (e.order_id, e.side, e.last_executed_quantity, e.last_executed_price, e.transaction_time) for e in res
+        )
+        return res
+
+    Account.on_ticker_update = probe
+    try:
+        result = optimizer.trade_result(mbs, True, FAST_FORWARD=fast_forward)
+    finally:
+        Account.on_ticker_update = on_ticker_update
+    return fills, {k: result[k] for k in ('profit', 'free')}, optimizer.STRATEGY.account.funds.get_funds()
+
+
+def fast_forward_match(mbs) -> int:
+    """
+    Regression of the tick skipping: Strategy replays the session with each tick and with FAST_FORWARD.
+    Fills, profit and funds must be equal, else some strategy timer or state of on_new_ticker()
+    is out of fast_forward_bounds()
+    :return: count of the compared fills
+    """
+    full, fast = _replay(mbs, False), _replay(mbs, True)
+    for name, a, b in zip(('fills', 'result', 'funds'), full, fast):
+        if a == b:
+            continue
+        if name == 'fills':
+            i = next((i for i, (x, y) in enumerate(zip(a, b)) if x != y), min(len(a), len(b)))
+            name, a, b = f"fill {i}", a[i:i + 1], b[i:i + 1]
+        raise UserWarning(f"Fast forward differs from full replay in {name}: {a}, {b}")
+    return len(full[0])
+
+
+def fill_allocations(fills: int = 2000) -> tuple[float, float]:
+    """
+    Memory allocated by Account.on_ticker_update() per fill event: (bytes, blocks)
+    """
+    account = Account(save_ds=False)
+    account.init_funds(
+        {'asset': 'BTC', 'free': Decimal('1000000'), 'locked': Decimal()},
+        {'asset': 'USDT', 'free': Decimal('1000000000000'), 'locked': Decimal()}
+    )
+    for i in range(fills):
+        account.create_order('BTCUSDT', '', True, '0.001', f"{PRICE - i * 0.01:.2f}", 0)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        res = account.on_ticker_update({'lastPrice': f"{PRICE / 2:.2f}", 'Qty': '0', 'closeTime': 1}, 1)
+        stat = tracemalloc.take_snapshot().compare_to(before, 'filename')
+    finally:
+        tracemalloc.stop()
+    del res
+    return sum(i.size_diff for i in stat) / fills, sum(i.count_diff for i in stat) / fills
+
+
+def order_churn(orders: int) -> tuple[float, int]:
+    """
+    Cost of create_order() + cancel_order() pair in microseconds after the orders count of session history
+    :return: (us/order, orders in memory)
+    """
+    account = Account(save_ds=False)
+    account.init_funds(
+        {'asset': 'BTC', 'free': Decimal('1000000'), 'locked': Decimal()},
+        {'asset': 'USDT', 'free': Decimal('1000000000000'), 'locked': Decimal()}
+    )
+    price = f"{PRICE / 2:.2f}"
+    start = time.perf_counter()
+    for i in range(orders):
+        res = account.create_order('BTCUSDT', '', True, '0.001', price, i)
+        account.cancel_order(res['orderId'], i)
+    return (time.perf_counter() - start) * 1e6 / orders, len(account.orders) + len(account.archive)
+
+
+def main():
+    for tcm, fees in MATCH_CASES:
+        try:
+            fills = engines_match(tcm, fees)
+        except UserWarning as ex:
+            print(ex)
+            raise SystemExit(1)
+        print(f"Fixed-point engine matches Decimal one on {fills} fill events, step {tcm.step_size}, fees {fees}")
+    if len(sys.argv) > 2:
+        mbs = optimizer.load_strategy(sys.argv[1])
+        with session_aside(mbs, sys.argv[2]) as session_root:
+            for name, scenario in FF_SCENARIOS.items():
+                Session(**scenario).write(session_root)
+                try:
+                    fills = fast_forward_match(mbs)
+                except UserWarning as ex:
+                    print(f"*** {name} *** {ex}")
+                    raise SystemExit(1)
+                print(f"Fast forward matches full replay on {fills} fills of *** {name} *** session")
+    print("Account.on_ticker_update() cost per tick")
+    print(f"{'grid size':>10} {'Decimal':>10} {'fixed':>10}  us/tick")
+    for grid_size in GRID_SIZES:
+        print(f"{grid_size:>10} {account_matching(grid_size):>10.2f}"
+              f" {account_matching(grid_size, fixed_point=True):>10.2f}")
+    size, blocks = fill_allocations()
+    print(f"Fill event allocations: {size:.0f} bytes, {blocks:.1f} blocks")
+    print("Order create + cancel cost by session history length")
+    print(f"{'orders':>10} {'us/order':>10} {'in memory':>10}")
+    for orders in CHURN_SIZES:
+        cost, kept = order_churn(orders)
+        print(f"{orders:>10} {cost:>10.2f} {kept:>10}")
+
+
+if __name__ == '__main__':
+    main()
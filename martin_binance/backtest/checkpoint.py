@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Checkpoint of the running simulation for optimizer trials. The simulation runs once up to checkpoint,
+then each trial is a forked process that continue from the same state with own parameters.
+Account, Strategy vars, Klines, clock and replay cursor are shared copy-on-write, result is sent back by pipe
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+import os
+import select
+
+import ujson as json
+
+PIPE_CHUNK = 65536
+
+
+class Checkpoint:
+    """
+    ask() -> trial | None, called in the parent, None when there are no more trials
+    apply(trial), called in the child before continue simulation
+    tell(trial, result: dict | None), called in the parent, None if child failed
+    """
+    __slots__ = ("ask", "apply", "tell", "ts", "workers", "taken", "pipe")
+
+    def __init__(self, ask, apply, tell, ts: float = 0.0, workers: int = 1):
+        self.ask = ask
+        self.apply = apply
+        self.tell = tell
+        self.ts = ts  # sec from the replay start, strategy must not make parameter depended decision before
+        self.workers = max(workers, 1)
+        self.taken = False
+        self.pipe = None  # Write end in the child process
+
+    @property
+    def child(self) -> bool:
+        return self.pipe is not None
+
+    def due(self, elapsed: float) -> bool:
+        return not self.taken and elapsed >= self.ts
+
+    def fork(self) -> bool:
+        """
+        Run all trials from the current state, up to workers at once
+        :return: True in the child process, False in the parent when all trials are done
+        """
+        self.taken = True
+        running = {}  # {read end: (pid, trial, result bytes)}
+        while True:
+            while len(running) < self.workers and (trial := self.ask()) is not None:
+                r, w = os.pipe()
+                pid = os.fork()
+                if pid == 0:
+                    os.close(r)
+                    [os.close(_r) for _r in running]
+                    self.pipe = w
+                    self.apply(trial)
+                    return True
+                os.close(w)
+                running[r] = (pid, trial, bytearray())
+            if not running:
+                return False
+            # Pipes are read while children run, else a result above the pipe buffer blocks the child for ever
+            for r in select.select(list(running), [], [])[0]:
+                if chunk := os.read(r, PIPE_CHUNK):
+                    running[r][2].extend(chunk)
+                    continue
+                os.close(r)
+                pid, trial, data = running.pop(r)
+                _, status = os.waitpid(pid, 0)
+                self.tell(trial, json.loads(data) if data and os.waitstatus_to_exitcode(status) == 0 else None)
+
+    def done(self, result: dict):
+        """
+        Child process only: send result to the parent and exit without cleanup of the inherited resources
+        """
+        with os.fdopen(self.pipe, 'wb') as f:
+            f.write(json.dumps(result).encode())
+        os._exit(0)
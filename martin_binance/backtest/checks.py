@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Behavior checks of the pure parts of the simulator and the optimizer, no exchange and no strategy needed.
+Run after a change of them, exit code is 1 if some check fails
+
+python -m martin_binance.backtest.checks
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+import asyncio
+import random
+import tempfile
+import traceback
+from decimal import Decimal
+from pathlib import Path
+
+import optuna
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from martin_binance.backtest.crossing_index import BLOCK, CrossingIndex
+from martin_binance.backtest.exchange_simulator import PriceIndex
+from martin_binance.backtest.optimizer import promote_candidates, rank_correlation
+from martin_binance.backtest.raw_data import decimate
+from martin_binance.backtest.study_share import BLOBS, STATE, digest, publish, sync
+from martin_binance.backtest.trial_cache import TrialCache, fingerprint
+from martin_binance.backtest.virtual_clock import VirtualClock
+
+
+def expect(condition: bool, message: str):
+    if not condition:
+        raise UserWarning(message)
+
+
+def check_virtual_clock():
+    """
+    Timers fire in (deadline, sequence) order, past deadline is now, feeds are out of horizon,
+    woken task is not a sleeper anymore
+    """
+    async def sleeper(clock, name, when, order):
+        await clock.sleep_until(when)
+        order.append((name, clock.now))
+
+    async def feed(clock):
+        await clock.sleep_until(105, feed=True)
+
+    async def run():
+        clock = VirtualClock(100.0)
+        order = []
+        jobs = []
+        tasks = [
+            asyncio.create_task(sleeper(clock, name, when, order))
+            for name, when in (('c', 103), ('a', 101), ('b', 101), ('past', 50))
+        ]
+        tasks.append(asyncio.create_task(feed(clock)))
+        await asyncio.sleep(0)
+        clock.call_at(102, lambda: jobs.append(clock.now))
+        expect(len(clock.sleepers) == 5, f"Sleepers {len(clock.sleepers)}, expected 5")
+        expect(clock.horizon() == 100, f"Horizon {clock.horizon()}, expected 100 for the past deadline")
+        clock.step()
+        expect(len(clock.sleepers) == 4, "Task woken by step() is still a sleeper")
+        await asyncio.sleep(0)
+        while len(clock.timers) > 1:
+            clock.step()
+            await asyncio.sleep(0)
+        expect(clock.horizon() == float('inf'), f"Horizon {clock.horizon()} with the feed timer only")
+        clock.step()
+        await asyncio.gather(*tasks)
+        expect(
+            order == [('past', 100), ('a', 101), ('b', 101), ('c', 103)],
+            f"Sleepers woken as {order}"
+        )
+        expect(jobs == [102], f"Job fired at {jobs}, expected [102]")
+        expect(clock.now == 105 and not clock.sleepers, f"Clock {clock.now} with sleepers {clock.sleepers}")
+
+    asyncio.run(run())
+
+
+def check_price_index():
+    """
+    Crossed orders of each side by last price, best price first, after add, re-add and remove
+    """
+    buy = PriceIndex(buy=True)
+    for order_id, price in ((1, '100'), (2, '101'), (3, '99')):
+        buy.add(order_id, Decimal(price))
+    expect(buy.crossed(Decimal('100')) == [2, 1], f"Buy crossed {buy.crossed(Decimal('100'))}, expected [2, 1]")
+    expect(buy.best() == Decimal('101'), f"Buy best {buy.best()}")
+    buy.remove(2)
+    buy.add(1, Decimal('98'))  # Price of the existing order is changed
+    expect(buy.crossed(Decimal('100')) == [], f"Buy crossed {buy.crossed(Decimal('100'))} after re-add")
+    expect(buy.crossed(Decimal('98')) == [3, 1], f"Buy crossed {buy.crossed(Decimal('98'))}, expected [3, 1]")
+    expect(len(buy) == 2 and 2 not in buy and 1 in buy, "Buy orders after remove")
+
+    sell = PriceIndex(buy=False)
+    expect(sell.best() is None and sell.crossed(Decimal('1e9')) == [], "Empty sell side")
+    for order_id, price in ((5, '103'), (6, '102'), (7, '104')):
+        sell.add(order_id, Decimal(price))
+    expect(sell.crossed(Decimal('101.99')) == [], f"Sell crossed {sell.crossed(Decimal('101.99'))}")
+    expect(sell.crossed(Decimal('103')) == [6, 5], f"Sell crossed {sell.crossed(Decimal('103'))}, expected [6, 5]")
+    expect(sell.best() == Decimal('102'), f"Sell best {sell.best()}")
+
+
+def _parquet(table: pa.Table) -> pq.ParquetFile:
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink)
+    return pq.ParquetFile(pa.BufferReader(sink.getvalue()))
+
+
+def check_crossing_index(seed: int = 0):
+    """
+    next_crossing() is the first tick out of the corridor in [start, stop), same as the scan of every tick,
+    for the bounds inside and across the blocks
+    """
+    rng = random.Random(seed)
+    n = BLOCK * 15 + 17
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(round(prices[-1] + rng.choice((-0.01, 0, 0.01)), 2))
+    keys = [1_700_000_000_000 + i * 1000 for i in range(n)]
+    ci = CrossingIndex(_parquet(pa.table({'key': keys, 'lastPrice': [f"{p:.2f}" for p in prices]})))
+    expect(len(ci) == n, f"Index of {len(ci)} ticks, expected {n}")
+    expect(ci.before(keys[10] / 1000) == 10 and ci.before(float('inf')) == n, "Ticks before ts")
+    for _ in range(2000):
+        start, stop = sorted(rng.randrange(n + 1) for _ in range(2))
+        if rng.random() < 0.05:
+            start, stop = stop, start
+        price = prices[min(start, n - 1)]
+        low, high = price - rng.choice((0.0, 0.01, 0.05, 0.2)), price + rng.choice((0.0, 0.01, 0.05, 0.2))
+        expected = next((i for i in range(start, stop) if prices[i] <= low or prices[i] >= high), stop)
+        res = ci.next_crossing(start, stop, low, high)
+        expect(res == expected, f"next_crossing({start}, {stop}, {low}, {high}) = {res}, expected {expected}")
+
+
+def check_trial_cache():
+    """
+    The same point of the study on the same dataset is a hit, whatever the key order and float artefacts,
+    other parameters, dataset or strategy are a miss
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = Path(tmp, "raw")
+        dataset.mkdir()
+        Path(dataset, "ticker.parquet").write_bytes(b"ticks")
+        cli = Path(tmp, "cli_0_BTCUSDT.py")
+        cli.write_text("# strategy")
+        salt = fingerprint(dataset, cli)
+        expect(salt == fingerprint(dataset, cli), "Fingerprint of the same files differs")
+
+        cache = TrialCache(salt, Path(tmp, "cache.db"))
+        try:
+            cache.put({'PROFIT': 0.3, 'ORDER_Q': 8}, {'profit': '1.5', 'free': '0'})
+            hit = cache.get({'ORDER_Q': 8, 'PROFIT': 0.1 + 0.2})
+            expect(hit == {'profit': '1.5', 'free': '0'}, f"Cache get {hit} for the same params")
+            expect(cache.get({'ORDER_Q': 9, 'PROFIT': 0.3}) is None, "Cache hit for other params")
+        finally:
+            cache.close()
+
+        Path(dataset, "ticker.parquet").write_bytes(b"other ticks")
+        expect(fingerprint(dataset, cli) != salt, "Fingerprint of the changed dataset is the same")
+        cli.write_text("# other strategy")
+        other = TrialCache(fingerprint(dataset, cli), Path(tmp, "cache.db"))
+        try:
+            expect(other.get({'ORDER_Q': 8, 'PROFIT': 0.3}) is None, "Cache hit for other dataset and strategy")
+        finally:
+            other.close()
+
+
+def _low_study(direction: str, values: list) -> optuna.Study:
+    study = optuna.create_study(direction=direction)
+    distribution = optuna.distributions.IntDistribution(0, 100)
+    study.add_trials([
+        optuna.trial.create_trial(params={'ORDER_Q': x}, distributions={'ORDER_Q': distribution}, value=float(value))
+        for x, value in enumerate(values)
+    ])
+    return study
+
+
+def check_promote():
+    """
+    Top and control shares of the low fidelity trials by the first objective, the first trial is kept if asked,
+    rank correlation of the low and full values
+    """
+    fidelity = {'promote': 0.2, 'control': 0.1}
+    values = [5, 1, 9, 3, 8, 0, 7, 2, 6, 4]
+    top = [t.values[0] for t in promote_candidates(_low_study('maximize', values), fidelity)]
+    expect(top[:2] == [9, 8] and len(top) == 3 and top[2] not in (9, 8), f"Promoted {top} of maximize")
+    top = [t.values[0] for t in promote_candidates(_low_study('minimize', values), fidelity, keep_first=True)]
+    expect(top[:3] == [5, 0, 1] and len(top) == 4, f"Promoted {top} of minimize with the first trial")
+    top = promote_candidates(_low_study('maximize', [9]), fidelity, keep_first=True)
+    expect(len(top) == 1, f"The first trial is promoted {len(top)} times")
+
+    expect(rank_correlation([1, 2, 3, 4], [10, 40, 90, 160]) == 1, "Rank correlation of the same order")
+    expect(rank_correlation([1, 2, 3, 4], [4, 3, 2, 1]) == -1, "Rank correlation of the reverse order")
+    expect(rank_correlation([1], [2]) is None, "Rank correlation of one value")
+    expect(rank_correlation([1, 2, 3], [5, 5, 5]) is None, "Rank correlation of constant values")
+
+
+def check_decimate():
+    """
+    Every step-th row of the first share of rows, the first and the last of them are kept
+    """
+    ds = _parquet(pa.table({'key': list(range(100))}))
+    for step, share, expected in (
+            (10, 1.0, [*range(0, 100, 10), 99]),
+            (10, 0.5, [*range(0, 50, 10), 49]),
+            (7, 1.0, [*range(0, 99, 7), 99]),
+            (1, 0.25, list(range(25))),
+            (1000, 0.001, [0]),
+    ):
+        keys = decimate(ds, step, share).read().column('key').to_pylist()
+        expect(keys == expected, f"decimate(step={step}, share={share}) keys {keys}")
+
+
+def check_study_share():
+    """
+    Published files are stored once by content hash, sync copies only the changed ones, drops the files
+    of raw/ and the state that are not in the manifest, and waits for the missing or partial blob
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        share, source, target = Path(tmp, "share"), Path(tmp, "source"), Path(tmp, "target")
+        Path(source, "raw").mkdir(parents=True)
+        files = {"raw/ticker.parquet": b"ticks", "raw/klines.json": b"ticks", "cli_0_BTCUSDT.py": b"# strategy"}
+        for name, data in files.items():
+            Path(source, name).write_bytes(data)
+        manifest = publish(share, {name: Path(source, name) for name in files})
+        expect(
+            all(manifest[name] == digest(Path(source, name)) for name in files),
+            f"Manifest {manifest} is not the content hash"
+        )
+        expect(len(list(Path(share, BLOBS).iterdir())) == 2, "Same content is stored twice")
+
+        Path(target, "raw").mkdir(parents=True)
+        Path(target, "raw", "stale.parquet").write_bytes(b"old")
+        Path(target, STATE).write_text("{}")
+        Path(target, "cli_0_BTCUSDT.py").write_bytes(b"# local change")
+        expect(sync(share, manifest, target), "Sync of the published files failed")
+        expect(
+            all(Path(target, name).read_bytes() == data for name, data in files.items()),
+            "Synced files differ from the published ones"
+        )
+        expect(not Path(target, "raw", "stale.parquet").exists(), "File of raw/ out of the manifest is kept")
+        expect(not Path(target, STATE).exists(), "State out of the manifest is kept")
+
+        blob = Path(share, BLOBS, manifest["cli_0_BTCUSDT.py"])
+        blob.write_bytes(b"# partial")
+        Path(target, "cli_0_BTCUSDT.py").unlink()
+        expect(not sync(share, manifest, target), "Sync from the partial blob is done")
+        blob.unlink()
+        expect(not sync(share, manifest, target), "Sync without the blob is done")
+
+
+CHECKS = (
+    check_virtual_clock,
+    check_price_index,
+    check_crossing_index,
+    check_trial_cache,
+    check_promote,
+    check_decimate,
+    check_study_share,
+)
+
+
+def main():
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    failed = 0
+    for check in CHECKS:
+        try:
+            check()
+        except Exception as ex:
+            failed += 1
+            print(f"FAIL {check.__name__}: {ex}")
+            print(traceback.format_exc())
+        else:
+            print(f"ok   {check.__name__}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
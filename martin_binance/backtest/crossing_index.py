@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Price-crossing index over ticker stream for skipping quiet ticks in simulate mode
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+import numpy as np
+import orjson
+import pyarrow as pa
+
+from martin_binance.backtest.raw_data import batch_rows, is_v2
+
+BLOCK = 64
+
+
+class CrossingIndex:
+    """
+    Precomputed ticker column with min/max of lastPrice over the blocks of BLOCK ticks,
+    so the first tick where price leave (low, high) corridor is found without touching every row
+    """
+    __slots__ = ("keys", "rows", "prices", "block_min", "block_max")
+
+    def __init__(self, ds):
+        table = ds.read()
+        self.keys = table.column('key').to_numpy() / 1000
+        batches = table.combine_chunks().to_batches()
+        self.rows = batches[0] if batches else None  # Rows stay in Arrow buffer until delivered
+        if is_v2(ds):
+            self.prices = table.column('lastPrice').cast(pa.float64()).to_numpy()
+        else:
+            self.prices = np.fromiter(
+                (float(orjson.loads(row)['lastPrice']) for row in table.column('row').to_pylist()),
+                dtype=np.float64,
+                count=table.num_rows
+            )
+        pad = -len(self.prices) % BLOCK
+        blocks = np.pad(self.prices, (0, pad), mode='edge').reshape(-1, BLOCK)
+        self.block_min = blocks.min(axis=1)
+        self.block_max = blocks.max(axis=1)
+
+    def __len__(self):
+        return len(self.prices)
+
+    def row(self, i: int):
+        return next(batch_rows(self.rows.slice(i, 1)))[1]
+
+    def before(self, ts: float) -> int:
+        """
+        Count of ticks with timestamp less than ts
+        """
+        return int(np.searchsorted(self.keys, ts, side='left'))
+
+    def next_crossing(self, start: int, stop: int, low: float, high: float) -> int:
+        """
+        First index in [start, stop) where price <= low or price >= high, stop if not crossed
+        """
+        if start >= stop:
+            return stop
+        head = min(stop, -(-start // BLOCK) * BLOCK)
+        if start < head and (hit := self._scan(start, head, low, high)) is not None:
+            return hit
+        if head == stop:
+            return stop
+        b_start, b_stop = head // BLOCK, -(-stop // BLOCK)
+        blocks = np.flatnonzero(
+            (self.block_min[b_start:b_stop] <= low) | (self.block_max[b_start:b_stop] >= high)
+        )
+        for b in blocks:
+            i = (b_start + int(b)) * BLOCK
+            if i >= stop:
+                break
+            if (hit := self._scan(i, min(i + BLOCK, stop), low, high)) is not None:
+                return hit
+        return stop
+
+    def _scan(self, start: int, stop: int, low: float, high: float) -> int | None:
+        prices = self.prices[start:stop]
+        hits = np.flatnonzero((prices <= low) | (prices >= high))
+        return start + int(hits[0]) if hits.size else None
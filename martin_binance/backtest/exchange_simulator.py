@@ -6,20 +6,175 @@ Simple exchange simulator for backtest purpose
 __author__ = "Jerry Fedorenko"
 __copyright__ = "Copyright © 2021 Jerry Fedorenko aka VM"
 __license__ = "MIT"
-__version__ = "3.0.34"
+__version__ = "3.1.9"
 __maintainer__ = "Jerry Fedorenko"
 __contact__ = "https://github.com/DogsTailFarmer"
 
+from bisect import bisect_left, bisect_right, insort
 from decimal import Decimal
-from typing import Dict
+from operator import itemgetter
+from pathlib import Path
 
-import pandas as pd
+from martin_binance.backtest.grid_log import GridLog
+from martin_binance.backtest.order_archive import OrderArchive
+
+_price = itemgetter(0)
+ZERO = Decimal('0')
 
 
 def any2str(_x) -> str:
     return f"{_x:.8f}".rstrip('0').rstrip('.')
 
 
+class PriceIndex:
+    """
+    Active orders for one side of the book, sorted by (price, order_id).
+    Crossed orders lookup is O(log n + k), removal is in place
+    """
+    __slots__ = ("buy", "keys", "prices")
+
+    def __init__(self, buy: bool):
+        self.buy = buy
+        self.keys = []  # [(price, order_id), ] in ascending order
+        self.prices = {}  # {order_id: price}
+
+    def __len__(self):
+        return len(self.prices)
+
+    def __contains__(self, order_id):
+        return order_id in self.prices
+
+    def add(self, order_id: int, price: Decimal):
+        if order_id in self.prices:
+            self.remove(order_id)
+        self.prices[order_id] = price
+        insort(self.keys, (price, order_id))
+
+    def remove(self, order_id: int):
+        price = self.prices.pop(order_id)
+        del self.keys[bisect_left(self.keys, (price, order_id))]
+
+    def crossed(self, last_price: Decimal) -> list[int]:
+        """
+        Id of orders executed by last price, best price first
+        """
+        if self.buy:
+            i = bisect_left(self.keys, last_price, key=_price)
+            return [k[1] for k in reversed(self.keys[i:])]
+        i = bisect_right(self.keys, last_price, key=_price)
+        return [k[1] for k in self.keys[:i]]
+
+    def best(self):
+        """
+        Price of the order that will be crossed first, None if empty
+        """
+        if self.keys:
+            return self.keys[-1][0] if self.buy else self.keys[0][0]
+        return None
+
+
+def _exp(value) -> int:
+    return max(0, -Decimal(value).normalize().as_tuple().exponent)
+
+
+class DecimalPoint:
+    """
+    Reference number engine for simulator: Decimal everywhere
+    """
+    __slots__ = ()
+
+    price = qty = fee = staticmethod(Decimal)
+    str_price = str_qty = str_notional = staticmethod(str)
+
+    @staticmethod
+    def dec_price(value: Decimal) -> Decimal:
+        return value
+
+    dec_qty = dec_notional = dec_price
+
+
+class FixedPoint:
+    """
+    Scaled integer number engine for simulator. Price is an integer of tick_size units, amount of step_size units.
+    Balances scale also has room for fee, so result is exact and equal to the DecimalPoint engine
+    while prices and amounts are on the exchange grid. Decimal or str are used on the API boundary only.
+    """
+    __slots__ = (
+        "price_exp",
+        "qty_exp",
+        "fee_exp",
+        "notional_exp",
+        "base_exp",
+        "quote_exp",
+        "base_k",
+        "quote_k",
+        "base_fee_k",
+        "quote_fee_k",
+    )
+
+    def __init__(self, tcm, fees: tuple):
+        self.price_exp = _exp(tcm.tick_size)
+        self.qty_exp = _exp(tcm.step_size)
+        self.fee_exp = max(map(_exp, fees))
+        self.notional_exp = self.qty_exp + self.price_exp  # amount * price
+        # fee * amount / 100 and fee * amount * price / 100 must be integer
+        self.base_exp = max(self.qty_exp + self.fee_exp + 2, tcm.base_asset_precision)
+        self.quote_exp = max(self.notional_exp + self.fee_exp + 2, tcm.quote_asset_precision)
+        self.base_k = 10 ** (self.base_exp - self.qty_exp)
+        self.quote_k = 10 ** (self.quote_exp - self.notional_exp)
+        # fee * amount is in qty_exp + fee_exp + 2 units, asset precision can be finer
+        self.base_fee_k = 10 ** (self.base_exp - self.qty_exp - self.fee_exp - 2)
+        self.quote_fee_k = 10 ** (self.quote_exp - self.notional_exp - self.fee_exp - 2)
+
+    @staticmethod
+    def to_int(value, exp: int) -> int:
+        if type(value) is str:
+            whole, _, frac = value.partition('.')
+            if (n := len(frac)) > exp:
+                frac = frac.rstrip('0')
+                n = len(frac)
+            if n <= exp:
+                try:
+                    return int(whole + frac + '0' * (exp - n))
+                except ValueError:
+                    pass  # Exponent notation
+        _value = Decimal(value).scaleb(exp)
+        if _value == _value.to_integral_value():
+            return int(_value)
+        raise ValueError(f"{value} is out of 1e-{exp} grid, use Decimal engine for this data")
+
+    @staticmethod
+    def to_dec(value: int, exp: int) -> Decimal:
+        return Decimal(value).scaleb(-exp)
+
+    def price(self, value) -> int:
+        return self.to_int(value, self.price_exp)
+
+    def qty(self, value) -> int:
+        return self.to_int(value, self.qty_exp)
+
+    def fee(self, value) -> int:
+        return self.to_int(value, self.fee_exp)
+
+    def dec_price(self, value: int) -> Decimal:
+        return self.to_dec(value, self.price_exp)
+
+    def dec_qty(self, value: int) -> Decimal:
+        return self.to_dec(value, self.qty_exp)
+
+    def dec_notional(self, value: int) -> Decimal:
+        return self.to_dec(value, self.notional_exp)
+
+    def str_price(self, value: int) -> str:
+        return str(self.dec_price(value))
+
+    def str_qty(self, value: int) -> str:
+        return str(self.dec_qty(value))
+
+    def str_notional(self, value: int) -> str:
+        return str(self.dec_notional(value))
+
+
 class Funds:
     __slots__ = ("base", "quote")
 
@@ -35,6 +190,14 @@ class Funds:
         quote |= {'free': str(quote['free']), 'locked': str(quote['locked'])}
         return [base, quote]
 
+    def set_funds(self, base: dict, quote: dict):
+        self.base = base
+        self.quote = quote
+
+    def add_funds(self, base: Decimal, quote: Decimal):
+        self.base['free'] += base
+        self.quote['free'] += quote
+
     def on_order_created(self, buy: bool, amount: Decimal, price: Decimal):
         if buy:
             self.quote['free'] -= amount * price
@@ -61,6 +224,123 @@ class Funds:
             self.quote['free'] += amount * last_price - fee * (amount * last_price) / 100
 
 
+class FundsFixed(Funds):
+    """
+    Funds on scaled integers, see FixedPoint
+    """
+    __slots__ = ("fp",)
+
+    def __init__(self, fp: FixedPoint):
+        super().__init__()
+        self.fp = fp
+
+    def get_funds(self):
+        res = []
+        for funds, exp in ((self.base, self.fp.base_exp), (self.quote, self.fp.quote_exp)):
+            res.append(
+                {
+                    'asset': funds['asset'],
+                    'free': str(self.fp.to_dec(funds['free'], exp)),
+                    'locked': str(self.fp.to_dec(funds['locked'], exp))
+                }
+            )
+        return res
+
+    def set_funds(self, base: dict, quote: dict):
+        self.base = base | {
+            'free': self.fp.to_int(base['free'], self.fp.base_exp),
+            'locked': self.fp.to_int(base['locked'], self.fp.base_exp)
+        }
+        self.quote = quote | {
+            'free': self.fp.to_int(quote['free'], self.fp.quote_exp),
+            'locked': self.fp.to_int(quote['locked'], self.fp.quote_exp)
+        }
+
+    def add_funds(self, base: Decimal, quote: Decimal):
+        self.base['free'] += self.fp.to_int(base, self.fp.base_exp)
+        self.quote['free'] += self.fp.to_int(quote, self.fp.quote_exp)
+
+    def on_order_created(self, buy: bool, amount: int, price: int):
+        if buy:
+            self.quote['free'] -= amount * price * self.fp.quote_k
+            self.quote['locked'] += amount * price * self.fp.quote_k
+        else:
+            self.base['free'] -= amount * self.fp.base_k
+            self.base['locked'] += amount * self.fp.base_k
+
+    def on_order_canceled(self, side: str, amount: int, price: int):
+        if side == 'BUY':
+            self.quote['free'] += amount * price * self.fp.quote_k
+            self.quote['locked'] -= amount * price * self.fp.quote_k
+        else:
+            self.base['free'] += amount * self.fp.base_k
+            self.base['locked'] -= amount * self.fp.base_k
+
+    def on_order_filled(self, side: str, amount: int, price: int, last_price: int, fee: int):
+        if side == 'BUY':
+            self.base['free'] += amount * self.fp.base_k - fee * amount * self.fp.base_fee_k
+            self.quote['locked'] -= amount * price * self.fp.quote_k
+            self.quote['free'] += amount * (price - last_price) * self.fp.quote_k
+        else:
+            self.base['locked'] -= amount * self.fp.base_k
+            self.quote['free'] += amount * last_price * (self.fp.quote_k - fee * self.fp.quote_fee_k)
+
+
+class FillEvent:
+    """
+    Execution report of the simulator, same keys as exchange user data event but numbers are Decimal
+    and only the ones that strategy use. Access by key is supported, so it can be consumed as event dict
+    """
+    __slots__ = (
+        "symbol",
+        "client_order_id",
+        "side",
+        "order_type",
+        "time_in_force",
+        "order_quantity",
+        "order_price",
+        "order_status",
+        "order_id",
+        "last_executed_quantity",
+        "cumulative_filled_quantity",
+        "last_executed_price",
+        "commission_amount",
+        "commission_asset",
+        "transaction_time",
+        "trade_id",
+        "is_maker_side",
+        "order_creation_time",
+        "quote_asset_transacted",
+    )
+
+    def __init__(self, order, fp, is_maker_side: bool):
+        self.symbol = order.symbol
+        self.client_order_id = order.client_order_id
+        self.side = order.side
+        self.order_type = order.type
+        self.time_in_force = order.time_in_force
+        self.order_quantity = fp.dec_qty(order.orig_qty)
+        self.order_price = fp.dec_price(order.price)
+        self.order_status = order.status
+        self.order_id = order.order_id
+        self.last_executed_quantity = fp.dec_qty(order.last_executed_quantity)
+        self.cumulative_filled_quantity = fp.dec_qty(order.cumulative_filled_quantity)
+        self.last_executed_price = fp.dec_price(order.last_executed_price)
+        self.commission_amount = ZERO
+        self.commission_asset = ''
+        self.transaction_time = order.transact_time
+        self.trade_id = order.trade_id
+        self.is_maker_side = is_maker_side
+        self.order_creation_time = order.order_creation_time
+        self.quote_asset_transacted = fp.dec_notional(order.quote_asset_transacted)
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+
 class Order:
     __slots__ = (
         "symbol",
@@ -89,16 +369,17 @@ class Order:
         "quote_order_quantity",
     )
 
-    def __init__(self, symbol: str, order_id: int, client_order_id: str, buy: bool, amount: str, price: str, lt: int):
+    def __init__(self, symbol: str, order_id: int, client_order_id: str, buy: bool, amount, price, lt: int):
+        zero = type(price)()  # Decimal or int, see number engine
         self.symbol = symbol
         self.order_id = order_id
         self.order_list_id = -1
         self.client_order_id = client_order_id
         self.transact_time = lt  # local time
-        self.price = Decimal(price)
-        self.orig_qty = Decimal(amount)
-        self.executed_qty = Decimal('0')
-        self.cummulative_quote_qty = Decimal('0')
+        self.price = price
+        self.orig_qty = amount
+        self.executed_qty = zero
+        self.cummulative_quote_qty = zero
         self.status = 'NEW'
         self.time_in_force = 'GTC'
         self.type = 'LIMIT'
@@ -107,48 +388,62 @@ class Order:
         self.self_trade_prevention_mode = 'NONE'
         #
         self.event_time: int
-        self.last_executed_quantity = Decimal('0')
-        self.cumulative_filled_quantity = Decimal('0')
-        self.last_executed_price = Decimal('0')
+        self.last_executed_quantity = zero
+        self.cumulative_filled_quantity = zero
+        self.last_executed_price = zero
         self.trade_id: int
         self.order_creation_time = lt
-        self.quote_asset_transacted = Decimal('0')
-        self.last_quote_asset_transacted = Decimal('0')
+        self.quote_asset_transacted = zero
+        self.last_quote_asset_transacted = zero
         self.quote_order_quantity = self.orig_qty * self.price
 
 
 class Account:
     __slots__ = (
         "save_ds",
+        "fp",
         "funds",
         "fee_maker",
         "fee_taker",
         "orders",
+        "archive",
+        "next_order_id",
         "orders_buy",
         "orders_sell",
         "trade_id",
         "ticker",
-        "grid_buy",
-        "grid_sell",
+        "grid_log",
         "ticker_last",
         "market_ids",
     )
 
-    def __init__(self, save_ds: bool):
+    def __init__(self, save_ds: bool, fp: FixedPoint = None, grid_log: GridLog = None, spill: Path = None):
         self.save_ds = save_ds
-        self.funds = Funds()
-        self.fee_maker = Decimal('0')
-        self.fee_taker = Decimal('0')
-        self.orders = {}
-        self.orders_buy = pd.Series()
-        self.orders_sell = pd.Series()
+        self.fp = fp or DecimalPoint()
+        self.funds = FundsFixed(fp) if fp else Funds()
+        self.fee_maker = self.fp.fee('0')
+        self.fee_taker = self.fp.fee('0')
+        self.orders = {}  # Active orders only, terminal are moved to archive
+        self.archive = OrderArchive(self.fp, spill=spill)
+        self.next_order_id = 1
+        self.orders_buy = PriceIndex(buy=True)
+        self.orders_sell = PriceIndex(buy=False)
         self.trade_id = 0
         self.ticker = {}
-        self.grid_buy = {}
-        self.grid_sell = {}
-        self.ticker_last = Decimal('0')
+        self.grid_log = grid_log
+        self.ticker_last = self.fp.price('0')
         self.market_ids = []
 
+    def init_funds(self, base: dict, quote: dict):
+        """
+        base = {'asset': 'BTC', 'free': Decimal(), 'locked': Decimal()}
+        """
+        self.funds.set_funds(base, quote)
+
+    def set_fee(self, maker: Decimal, taker: Decimal):
+        self.fee_maker = self.fp.fee(maker)
+        self.fee_taker = self.fp.fee(taker)
+
     def create_order(
             self,
             symbol: str,
@@ -159,31 +454,29 @@ class Account:
             lt: int,
             order_id=None) -> {}:
 
-        order_id = order_id or ((max(self.orders.keys()) + 1) if self.orders else 1)
+        order_id = order_id or self.next_order_id
+        self.next_order_id = max(self.next_order_id, order_id + 1)
         order = Order(
             symbol=symbol,
             order_id=order_id,
             client_order_id=client_order_id,
             buy=buy,
-            amount=amount,
-            price=price,
+            amount=self.fp.qty(amount),
+            price=self.fp.price(price),
             lt=lt
         )
 
         if buy:
-            self.orders_buy.at[order_id] = Decimal(price)
-            if self.save_ds:
-                self.grid_buy[lt] = self.orders_buy
+            self.orders_buy.add(order_id, order.price)
         else:
-            self.orders_sell.at[order_id] = Decimal(price)
-            if self.save_ds:
-                self.grid_sell[lt] = self.orders_sell
-            #
-        self.funds.on_order_created(buy=buy, amount=Decimal(amount), price=Decimal(price))
+            self.orders_sell.add(order_id, order.price)
+        if self.grid_log:
+            self.grid_log.add(lt, order_id, buy, self.fp.dec_price(order.price))
+        self.funds.on_order_created(buy=buy, amount=order.orig_qty, price=order.price)
         self.orders[order_id] = order
 
-        if self.ticker_last and ((buy and Decimal(price) >= self.ticker_last) or
-                                 (not buy and Decimal(price) <= self.ticker_last)):
+        if self.ticker_last and ((buy and order.price >= self.ticker_last) or
+                                 (not buy and order.price <= self.ticker_last)):
             # Market event
             self.market_ids.append(order_id)
 
@@ -192,10 +485,10 @@ class Account:
                 'orderListId': order.order_list_id,
                 'clientOrderId': order.client_order_id,
                 'transactTime': order.transact_time,
-                'price': order.price,
-                'origQty': order.orig_qty,
-                'executedQty': order.executed_qty,
-                'cummulativeQuoteQty': order.cummulative_quote_qty,
+                'price': self.fp.dec_price(order.price),
+                'origQty': self.fp.dec_qty(order.orig_qty),
+                'executedQty': self.fp.dec_qty(order.executed_qty),
+                'cummulativeQuoteQty': self.fp.dec_notional(order.cummulative_quote_qty),
                 'status': order.status,
                 'timeInForce': order.time_in_force,
                 'type': order.type,
@@ -204,69 +497,75 @@ class Account:
                 'selfTradePreventionMode': order.self_trade_prevention_mode}
 
     def cancel_order(self, order_id: int, ts: int):
-        order = self.orders.get(order_id)
+        order = self.orders.pop(order_id, None)
         if order is None:
+            if order_id in self.archive:
+                raise UserWarning(f"Order {order_id} not active: {self.archive.get(order_id).status}")
             raise UserWarning(f"Error on Cancel order, can't find {order_id} anymore")
 
+        if order.side == 'BUY':
+            self.orders_buy.remove(order_id)
+        else:
+            self.orders_sell.remove(order_id)
+        if self.grid_log:
+            self.grid_log.remove(ts, order_id, order.side == 'BUY')
         order.status = 'CANCELED'
-        try:
-            if order.side == 'BUY':
-                self.orders_buy = self.orders_buy.drop(order_id)
-                if self.save_ds and self.orders_buy.values.size:
-                    self.grid_buy[ts] = self.orders_buy
-            else:
-                self.orders_sell = self.orders_sell.drop(order_id)
-                if self.save_ds and self.orders_sell.values.size:
-                    self.grid_sell[ts] = self.orders_sell
-        except Exception as ex:
-            raise UserWarning(f"Order {order_id} not active: {ex}") from ex
 
-        self.orders[order_id] = order
+        self.archive.add(order)
         self.funds.on_order_canceled(order.side, order.orig_qty - order.executed_qty, order.price)
         return {'symbol': order.symbol,
                 'origClientOrderId': order.client_order_id,
                 'orderId': order.order_id,
                 'orderListId': order.order_list_id,
                 'clientOrderId': 'qwert',
-                'price': str(order.price),
-                'origQty': str(order.orig_qty),
-                'executedQty': str(order.executed_qty),
-                'cummulativeQuoteQty': str(order.cummulative_quote_qty),
+                'price': self.fp.str_price(order.price),
+                'origQty': self.fp.str_qty(order.orig_qty),
+                'executedQty': self.fp.str_qty(order.executed_qty),
+                'cummulativeQuoteQty': self.fp.str_notional(order.cummulative_quote_qty),
                 'status': order.status,
                 'timeInForce': order.time_in_force,
                 'type': order.type,
                 'side': order.side,
                 'selfTradePreventionMode': order.self_trade_prevention_mode}
 
-    def on_ticker_update(self, ticker: {}, ts: int) -> list[Dict]:
-        filled_buy_id = []
-        filled_sell_id = []
+    def ticker_corridor(self) -> tuple[float, float]:
+        """
+        Last price range (low, high), exclusive, where the ticker does not fill any order
+        """
+        if self.market_ids:
+            return float('inf'), float('-inf')  # Any next tick fills market order
+        low = self.orders_buy.best()
+        high = self.orders_sell.best()
+        return (
+            float('-inf') if low is None else float(self.fp.dec_price(low)),
+            float('inf') if high is None else float(self.fp.dec_price(high))
+        )
+
+    def on_ticker_update(self, ticker: {}, ts: int) -> list[FillEvent]:
         orders_id = []
         orders_filled = []
 
-        self.ticker_last = Decimal(ticker['lastPrice'])
-        qty = Decimal(ticker['Qty'])
+        self.ticker_last = self.fp.price(ticker['lastPrice'])
+        qty = self.fp.qty(ticker['Qty'])
         part = bool(qty)
 
         if self.market_ids:
             orders_id.extend(self.market_ids)
 
-        orders_id.extend(self.orders_buy[self.orders_buy >= self.ticker_last].index.values)
-        orders_id.extend(self.orders_sell[self.orders_sell <= self.ticker_last].index.values)
+        orders_id.extend(self.orders_buy.crossed(self.ticker_last))
+        orders_id.extend(self.orders_sell.crossed(self.ticker_last))
 
         if self.save_ds:
             # Save data for analytics
             self.ticker[ts] = ticker['lastPrice']
-            if self.orders_sell.values.size:
-                self.grid_sell[ts] = self.orders_sell
-            if self.orders_buy.values.size:
-                self.grid_buy[ts] = self.orders_buy
         #
-        for order_id in orders_id:
+        for order_id in dict.fromkeys(orders_id):  # Market order can be crossed also
             if part and not qty:
                 break
 
             order = self.orders.get(order_id)
+            if order is None:
+                continue  # Market order canceled before this tick
 
             order.transact_time = int(ticker['closeTime'])
             order.event_time = order.transact_time
@@ -289,49 +588,16 @@ class Account:
             if order.executed_qty >= order.orig_qty:
                 order.status = 'FILLED'
                 if order.side == 'BUY':
-                    filled_buy_id.append(order_id)
+                    self.orders_buy.remove(order_id)
                 else:
-                    filled_sell_id.append(order_id)
+                    self.orders_sell.remove(order_id)
+                if self.grid_log:
+                    self.grid_log.remove(ts, order_id, order.side == 'BUY')
+                self.archive.add(self.orders.pop(order_id))
             elif 0 < order.executed_qty < order.orig_qty:
                 order.status = 'PARTIALLY_FILLED'
             #
-            self.orders[order_id] = order
-            #
-            res = {
-                'event_time': order.event_time,
-                'symbol': order.symbol,
-                'client_order_id': order.client_order_id,
-                'side': order.side,
-                'order_type': order.type,
-                'time_in_force': order.time_in_force,
-                'order_quantity': str(order.orig_qty),
-                'order_price': str(order.price),
-                'stop_price': '0',
-                'iceberg_quantity': '0',
-                'order_list_id': -1,
-                'original_client_id': order.client_order_id,
-                'execution_type': 'TRADE',
-                'order_status': order.status,
-                'order_reject_reason': 'NONE',
-                'order_id': order_id,
-                'last_executed_quantity': str(order.last_executed_quantity),
-                'cumulative_filled_quantity': str(order.cumulative_filled_quantity),
-                'last_executed_price': str(order.last_executed_price),
-                'commission_amount': '0',
-                'commission_asset': '',
-                'transaction_time': order.transact_time,
-                'trade_id': order.trade_id,
-                'ignore_a': 12345678,
-                'in_order_book': False,
-                'is_maker_side': bool(order_id not in self.market_ids),
-                'ignore_b': True,
-                'order_creation_time': order.order_creation_time,
-                'quote_asset_transacted': str(order.quote_asset_transacted),
-                'last_quote_asset_transacted': str(order.last_quote_asset_transacted),
-                'quote_order_quantity': str(order.quote_order_quantity)
-            }
-            #
-            orders_filled.append(res)
+            orders_filled.append(FillEvent(order, self.fp, is_maker_side=order_id not in self.market_ids))
 
             self.funds.on_order_filled(
                 order.side,
@@ -341,19 +607,20 @@ class Account:
                 self.fee_taker if order_id in self.market_ids else self.fee_maker
             )
             #
-        self.orders_buy = self.orders_buy.drop(filled_buy_id, errors="ignore")
-        self.orders_sell = self.orders_sell.drop(filled_sell_id, errors="ignore")
         self.market_ids.clear()
 
         return orders_filled
 
+    def close(self):
+        if self.grid_log:
+            self.grid_log.close()
+        self.archive.close()
+
     def restore_state(self, symbol: str, lt: int, orders: list, sum_amount: ()):
         if sum_amount[0]:
-            self.funds.base['free'] += sum_amount[1]
-            self.funds.quote['free'] -= sum_amount[2]
+            self.funds.add_funds(sum_amount[1], -sum_amount[2])
         else:
-            self.funds.base['free'] -= sum_amount[1]
-            self.funds.quote['free'] += sum_amount[2]
+            self.funds.add_funds(-sum_amount[1], sum_amount[2])
 
         for order in orders:
             self.create_order(
@@ -365,3 +632,40 @@ class Account:
                 lt=lt,
                 order_id=order['id']
             )
+
+
+class Portfolio:
+    """
+    Simulated exchange account for several symbols. Each symbol has own Account with orders book,
+    asset balances are the same dict objects for all symbols, so quote asset is shared
+    """
+    __slots__ = ("save_ds", "assets", "accounts")
+
+    def __init__(self, save_ds: bool = False):
+        self.save_ds = save_ds
+        self.assets = {}  # {asset: {'asset': asset, 'free': Decimal, 'locked': Decimal}}
+        self.accounts = {}  # {symbol: Account}
+
+    def asset(self, asset: str) -> dict:
+        return self.assets.setdefault(asset, {'asset': asset, 'free': Decimal(), 'locked': Decimal()})
+
+    def deposit(self, asset: str, amount: Decimal):
+        self.asset(asset)['free'] += amount
+
+    def add_symbol(self, symbol: str, base_asset: str, quote_asset: str, fee_maker: Decimal, fee_taker: Decimal):
+        """
+        Decimal engine only, FixedPoint scale depends on symbol and can't share balances
+        """
+        if symbol in self.accounts:
+            raise UserWarning(f"Symbol {symbol} already exist")
+        account = Account(self.save_ds)
+        account.init_funds(self.asset(base_asset), self.asset(quote_asset))
+        account.set_fee(fee_maker, fee_taker)
+        self.accounts[symbol] = account
+        return account
+
+    def on_ticker_update(self, symbol: str, ticker: {}, ts: int) -> list[FillEvent]:
+        return self.accounts[symbol].on_ticker_update(ticker, ts)
+
+    def get_funds(self) -> list[dict]:
+        return [{'asset': v['asset'], 'free': str(v['free']), 'locked': str(v['locked'])} for v in self.assets.values()]
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Resource limits of the self optimization running beside the live strategy on the same host.
+limit() is applied by the optimizer to own process and inherited by its trial workers,
+LagGovernor runs in the live strategy and suspends the optimizer while the event loop is late
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+import asyncio
+
+import psutil
+
+IOPRIO = {'idle': psutil.IOPRIO_CLASS_IDLE, 'best-effort': psutil.IOPRIO_CLASS_BE}
+LAG_INTERVAL = 0.5  # sec between probes of the event loop
+LAG_SMOOTH = 0.5  # Weight of the last probe in the lag average, single stall of the loop does not pause
+
+
+def limit(spec: dict = None, workers: int = 1) -> int:
+    """
+    spec: {'nice': 10, 'cpus': [2, 3], 'workers': 2, 'ionice': 'idle' | 'best-effort', 'lag': 0.2, 'resume': 0.05}
+    Niceness is only raised, unprivileged process can't lower it back
+    :return: workers within 'workers' and the count of 'cpus'
+    """
+    if not spec:
+        return workers
+    if (ionice := spec.get('ionice')) and ionice not in IOPRIO:
+        raise UserWarning(f"Unknown ionice {ionice}, use one of: {', '.join(IOPRIO)}")
+    process = psutil.Process()
+    if (nice := spec.get('nice')) is not None:
+        process.nice(max(nice, process.nice()))
+    if cpus := spec.get('cpus'):
+        process.cpu_affinity(list(cpus))
+        workers = min(workers, len(cpus))
+    if ionice:
+        process.ionice(IOPRIO[ionice])
+    return max(1, min(workers, spec.get('workers') or workers))
+
+
+class LagGovernor:
+    """
+    Event loop lag is the oversleep of the probe, averaged. The optimizer process with its workers is suspended
+    when the lag is above 'lag' sec and resumed when it falls below 'resume', between them the optimizer
+    runs the part of probe interval in proportion to the lag
+    """
+    __slots__ = ("pid", "pause", "resume", "lag", "suspended", "paused_time", "task")
+
+    def __init__(self, pid: int, pause: float, resume: float):
+        self.pid = pid
+        self.pause = pause
+        self.resume = resume
+        self.lag = 0.0
+        self.suspended = False
+        self.paused_time = 0.0  # sec
+        self.task = None
+
+    @classmethod
+    def start(cls, pid: int, spec: dict = None):
+        """
+        :return: running governor for the optimizer pid, None if 'lag' is not set
+        """
+        if not spec or not spec.get('lag'):
+            return None
+        governor = cls(pid, spec['lag'], spec.get('resume', spec['lag'] / 4))
+        governor.task = asyncio.create_task(governor.run())
+        return governor
+
+    def processes(self) -> list[psutil.Process]:
+        try:
+            process = psutil.Process(self.pid)
+            return [process, *process.children(recursive=True)]
+        except psutil.NoSuchProcess:
+            return []
+
+    def suspend(self, state: bool):
+        if state == self.suspended:
+            return
+        for process in self.processes():
+            try:
+                process.suspend() if state else process.resume()
+            except psutil.NoSuchProcess:
+                pass  # Trial worker is done already
+        self.suspended = state
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            ts = loop.time()
+            await asyncio.sleep(LAG_INTERVAL)
+            elapsed = loop.time() - ts
+            lag = max(0.0, elapsed - LAG_INTERVAL)
+            self.lag += LAG_SMOOTH * (lag - self.lag)
+            if self.suspended:
+                self.paused_time += elapsed
+            if self.lag >= self.pause:
+                self.suspend(True)
+            elif self.lag <= self.resume:
+                self.suspend(False)
+            elif not self.suspended:
+                # Throttle: the optimizer is stopped for the share of next interval
+                self.suspend(True)
+                duty = (self.lag - self.resume) / (self.pause - self.resume)
+                await asyncio.sleep(LAG_INTERVAL * duty)
+                self.paused_time += LAG_INTERVAL * duty
+                self.suspend(False)
+
+    def stop(self) -> float:
+        """
+        Optimizer is resumed, also before terminate, else SIGTERM waits for SIGCONT
+        :return: sec the optimizer was suspended
+        """
+        if self.task:
+            self.task.cancel()
+        self.suspend(False)
+        return self.paused_time
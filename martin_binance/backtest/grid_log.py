@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Grid history for analytics as event log of order add/remove, streamed to parquet during the session.
+Reader restore the grid at any time and build the order lines for VCoSEL
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+GRID_LOG_PRKT = "grid.parquet"
+GRID_LOG_SCHEMA = pa.schema(
+    [
+        ("ts", pa.int64()),  # ms
+        ("order_id", pa.int64()),
+        ("buy", pa.bool_()),
+        ("price", pa.float64()),  # null on remove
+    ]
+)
+BUFFER_SIZE = 20480
+
+
+class GridLog:
+    __slots__ = ("writer", "buffer", "last")
+
+    def __init__(self, path: Path):
+        self.writer = pq.ParquetWriter(path, schema=GRID_LOG_SCHEMA)
+        self.buffer = []
+        self.last = {}  # {order_id: (buy, price)} for snapshot diff
+
+    def add(self, ts: int, order_id: int, buy: bool, price):
+        self._append(ts, order_id, buy, float(price))
+
+    def remove(self, ts: int, order_id: int, buy: bool):
+        self._append(ts, order_id, buy, None)
+
+    def snapshot(self, ts: int, orders_buy: dict, orders_sell: dict):
+        """
+        Log difference between the current grid {order_id: price} and previous snapshot
+        """
+        current = {k: (True, v) for k, v in orders_buy.items()} | {k: (False, v) for k, v in orders_sell.items()}
+        for order_id, (buy, _price) in self.last.items():
+            if current.get(order_id) != (buy, _price):
+                self.remove(ts, order_id, buy)
+        for order_id, (buy, price) in current.items():
+            if self.last.get(order_id) != (buy, price):
+                self.add(ts, order_id, buy, price)
+        self.last = current
+
+    def _append(self, ts: int, order_id: int, buy: bool, price: float | None):
+        self.buffer.append({"ts": ts, "order_id": order_id, "buy": buy, "price": price})
+        if len(self.buffer) >= BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.writer.write_batch(pa.RecordBatch.from_pylist(self.buffer, schema=GRID_LOG_SCHEMA))
+            self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def read_events(path: Path) -> list[dict]:
+    return pq.read_table(path).to_pylist()
+
+
+def grid_at(events: list[dict], ts: int) -> tuple[dict, dict]:
+    """
+    Grid state after all events up to ts inclusive
+    :return: ({order_id: price} for buy, {order_id: price} for sell)
+    """
+    orders_buy = {}
+    orders_sell = {}
+    for event in events:
+        if event['ts'] > ts:
+            break
+        orders = orders_buy if event['buy'] else orders_sell
+        if event['price'] is None:
+            orders.pop(event['order_id'], None)
+        else:
+            orders[event['order_id']] = event['price']
+    return orders_buy, orders_sell
+
+
+def grid_lines(events: list[dict], ts_end: int = None) -> dict[bool, tuple[list, list]]:
+    """
+    Each order as horizontal line from add to remove time, lines are separated by None as plotly expects.
+    Orders active at the end are drawn until ts_end or last event
+    :return: {buy: (x ms, y price)}
+    """
+    ts_end = ts_end or (events[-1]['ts'] if events else 0)
+    active = {}
+    lines = {True: ([], []), False: ([], [])}
+
+    def _line(_buy, _start, _stop, _price):
+        x, y = lines[_buy]
+        x.extend((_start, _stop, None))
+        y.extend((_price, _price, None))
+
+    for event in events:
+        key = event['order_id']
+        if key in active:
+            buy, start, price = active.pop(key)
+            _line(buy, start, event['ts'], price)
+        if event['price'] is not None:
+            active[key] = (event['buy'], event['ts'], event['price'])
+    for buy, start, price in active.values():
+        _line(buy, start, ts_end, price)
+    return lines
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming metrics of the simulated session for multi-objective optimization, sampled by simulated time
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+DAY = 86400
+
+
+class SessionMetrics:
+    """
+    Max drawdown of total equity, time in reverse cycle and capital locked in grid.
+    State of the sample is held up to the next one, so time weights are exact for the sampled steps
+    """
+    __slots__ = ("start", "ts", "peak", "drawdown", "reverse_time", "locked_time", "equity_time", "last")
+
+    def __init__(self, ts: float):
+        self.start = self.ts = ts
+        self.peak = 0.0
+        self.drawdown = 0.0
+        self.reverse_time = 0.0  # sec
+        self.locked_time = 0.0  # quote * sec
+        self.equity_time = 0.0  # quote * sec
+        self.last = (0.0, 0.0, False)  # equity, locked, reverse
+
+    def update(self, ts: float, equity: float, locked: float, reverse: bool):
+        dt = ts - self.ts
+        _equity, _locked, _reverse = self.last
+        self.reverse_time += dt * _reverse
+        self.locked_time += dt * _locked
+        self.equity_time += dt * _equity
+        self.ts = ts
+        self.last = (equity, locked, reverse)
+        self.peak = max(self.peak, equity)
+        if self.peak:
+            self.drawdown = max(self.drawdown, 1 - equity / self.peak)
+
+    def result(self, value: float, cycles: int) -> dict:
+        """
+        drawdown - max relative drop of equity from the peak, reverse - share of time in reverse cycle,
+        locked - mean share of equity in orders, efficiency - session value per mean locked capital per day
+        """
+        period = self.ts - self.start
+        locked = self.locked_time / period if period else 0.0
+        return {
+            'drawdown': self.drawdown,
+            'reverse': self.reverse_time / period if period else 0.0,
+            'cycles': cycles,
+            'locked': self.locked_time / self.equity_time if self.equity_time else 0.0,
+            'efficiency': value / locked / (period / DAY) if locked else 0.0,
+        }
@@ -6,22 +6,40 @@ Searches for optimal parameters for a strategy under given conditions
 __author__ = "Jerry Fedorenko"
 __copyright__ = "Copyright © 2024 Jerry Fedorenko aka VM"
 __license__ = "MIT"
-__version__ = "3.0.5"
+__version__ = "3.1.9"
 __maintainer__ = "Jerry Fedorenko"
 __contact__ = "https://github.com/DogsTailFarmer"
 
 
 import importlib.util as iu
 import logging.handlers
+import math
+import multiprocessing
+import os
+import random
+import signal
+import sqlite3
 import stat
+import statistics
 import sys
+import tempfile
+from contextlib import closing
 from decimal import Decimal
 from pathlib import Path
+from shutil import rmtree
 
 import optuna
+import psutil
 import ujson as json
+from sqlalchemy import event
 
-from martin_binance import LOG_PATH, TRIAL_PARAMS
+from martin_binance import LOG_PATH, TRIAL_PARAMS, __version__ as mb_ver
+from martin_binance.backtest.checkpoint import Checkpoint
+from martin_binance.backtest.governor import limit
+from martin_binance.backtest.raw_data import shared
+from martin_binance.backtest.study_share import STATE, publish
+from martin_binance.backtest.trial_cache import TrialCache, canonical, fingerprint
+from martin_binance.params import Params
 
 OPTIMIZER = Path(__file__).absolute()
 try:
@@ -31,6 +49,19 @@ except PermissionError:
 
 PARAMS_FLOAT = ['KBB']
 STRATEGY = None
+logger = logging.getLogger('logger_S')
+PROMOTE = None  # (mbs, skip_log, cache) of the promotion pool process
+METRICS = ('value', 'profit', 'free', 'drawdown', 'reverse', 'cycles', 'locked', 'efficiency')
+PRUNERS = {
+    'median': optuna.pruners.MedianPruner,
+    'halving': optuna.pruners.SuccessiveHalvingPruner,
+    'hyperband': optuna.pruners.HyperbandPruner,
+}
+SQLITE = "sqlite:///"
+JOURNAL = "journal:///"  # Journal file of the multi-host study, on the shared disk, see backtest/optimizer_worker.py
+SQLITE_TIMEOUT = 600  # sec of waiting for the write lock, trial commits are short but many workers
+HEARTBEAT_INTERVAL = 60  # sec, trial of the dead worker is failed after grace period
+SETTINGS = 'optimizer'  # Section of trial_params.json with the study settings: pruner, fidelity, pareto, robustness
 
 
 # noinspection PyUnusedLocal
@@ -42,89 +73,642 @@ def any2str(_x) -> str:
     return f"{_x:.6f}".rstrip('0').rstrip('.')
 
 
-def try_trade(mbs, skip_log, **kwargs):
-    for key, value in kwargs.items():
-        setattr(mbs.ex, key, value if isinstance(value, int) or key in PARAMS_FLOAT else Decimal(f"{value}"))
-    mbs.ex.MODE = 'S'
-    mbs.ex.SAVE_DS = False
-    mbs.ex.LOGGING = not skip_log
-    global STRATEGY
-    STRATEGY = mbs.trade(STRATEGY)
-    return float(mbs.ex.SESSION_RESULT.get('profit', 0)) + float(mbs.ex.SESSION_RESULT.get('free', 0))
-
+def set_params(params: Params, values: dict) -> Params:
+    return params.update(
+        **{k: v if isinstance(v, int) or k in PARAMS_FLOAT else Decimal(f"{v}") for k, v in values.items()}
+    )
 
-def optimize(study_name, cli, n_trials, storage_name=None, _prm_best=None, skip_log=True, show_progress_bar=False):
-    sys.excepthook = notify_exception
-    optuna.logging.set_verbosity(optuna.logging.WARNING)
 
-    # Load parameter definitions from JSON file
+def trial_params() -> tuple[dict, dict]:
+    """
+    :return: (parameter definitions, study settings) from trial_params.json
+    """
     with open(TRIAL_PARAMS) as f:
         param_defs = json.load(f)
+    settings = param_defs.pop(SETTINGS, {})
+    if wrong := [k for k, v in param_defs.items() if not isinstance(v, dict) or v.get('type') not in ('int', 'float')]:
+        raise UserWarning(
+            f"Not a parameter definition in {TRIAL_PARAMS}: {', '.join(wrong)}, study settings are in '{SETTINGS}'"
+        )
+    return param_defs, settings
+
 
+def load_strategy(cli):
     spec = iu.spec_from_file_location("strategy", cli)
     mbs = iu.module_from_spec(spec)
     spec.loader.exec_module(mbs)
+    return mbs
+
+
+def session_value(session_result: dict) -> float:
+    return float(session_result.get('profit', 0)) + float(session_result.get('free', 0))
+
+
+def result_values(session_result: dict, objectives: dict = None):
+    """
+    Trial value: session value, or tuple of the metrics for the multi-objective study
+    """
+    if not objectives:
+        return session_value(session_result)
+    return tuple(
+        session_value(session_result) if name == 'value' else float(session_result.get(name, 0)) for name in objectives
+    )
+
+
+def suggest(_trial, param_defs: dict) -> dict:
+    params = {}
+    for param_name, param_props in param_defs.items():
+        if param_props['type'] == 'int':
+            params[param_name] = _trial.suggest_int(
+                param_name, *param_props['range'], step=param_props.get('step', 1)
+            )
+        elif param_props['type'] == 'float':
+            params[param_name] = _trial.suggest_float(
+                param_name, *param_props['range'], step=param_props.get('step', 0.1)
+            )
+    return params
+
+
+def fits(params: dict, param_defs: dict) -> bool:
+    return params.keys() == param_defs.keys() and all(
+        p['range'][0] <= params[k] <= p['range'][1] for k, p in param_defs.items()
+    )
+
+
+def warm_seeds(study_name, storage_name, count: int, param_defs: dict) -> list[dict]:
+    """
+    Parameters of the best trials of the previous study, by the first objective, to re-evaluate on the new session.
+    Their values are not reused, as they are from the other data
+    """
+    if not count or not storage_name:
+        return []
+    for prefix in (SQLITE, JOURNAL):
+        if storage_name.startswith(prefix) and not Path(storage_name.removeprefix(prefix)).exists():
+            return []
+    try:
+        prev = optuna.load_study(study_name=study_name, storage=study_storage(storage_name))
+    except KeyError:
+        return []
+    sign = 1 if prev.directions[0] == optuna.study.StudyDirection.MAXIMIZE else -1
+    trials = sorted(
+        prev.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,)),
+        key=lambda t: sign * t.values[0],
+        reverse=True
+    )
+    return [t.params for t in trials if fits(t.params, param_defs)][:count]
+
+
+def make_pruner(spec: dict = None):
+    """
+    spec: {'type': key of PRUNERS, **kwargs of the pruner}, None for the trials without intermediate reports
+    """
+    if not spec:
+        return None
+    spec = dict(spec)
+    _type = spec.pop('type', None)
+    if _type not in PRUNERS:
+        raise UserWarning(f"Unknown pruner {_type}, use one of: {', '.join(PRUNERS)}")
+    return PRUNERS[_type](**spec)
+
+
+def trade_result(mbs, skip_log, checkpoint=None, source=None, trial=None, fidelity=None, **kwargs) -> dict:
+    """
+    Trial parameters are applied to own Params of the strategy, the strategy module stays as loaded.
+    source: raw/ folder or raw_bak.zip to replay instead of the collected session
+    trial: optuna.Trial for intermediate reports, the replay is stopped if the pruner says so
+    fidelity: (step, share) of the ticker for low fidelity replay
+    """
+    global STRATEGY
+    mbs.ex.MODE = 'S'  # For logger setup in trade()
+    params = set_params(
+        Params(
+            MODE='S', VIRTUAL_CLOCK=True, SAVE_DS=False, LOGGING=not skip_log, CHECKPOINT=checkpoint, RAW_SOURCE=source,
+            TRIAL=trial, LOW_FIDELITY=fidelity
+        ),
+        kwargs
+    )
+    if STRATEGY is None:
+        from martin_binance.executor import Strategy
+        STRATEGY = Strategy(params)
+    else:
+        STRATEGY.prm = params
+    mbs.trade(STRATEGY)
+    if step := params.SESSION_RESULT.get('pruned'):
+        raise optuna.TrialPruned(f"Pruned at step {step}")
+    return dict(params.SESSION_RESULT)
+
 
+def try_trade(mbs, skip_log, **kwargs) -> float:
+    return session_value(trade_result(mbs, skip_log, **kwargs))
+
+
+def trial_objective(mbs, param_defs, skip_log, pruner=None, cache: TrialCache = None, fidelity=None, objectives=None):
     def objective(_trial):
-        params = {}
-        for param_name, param_props in param_defs.items():
-            if param_props['type'] == 'int':
-                params[param_name] = _trial.suggest_int(
-                    param_name, *param_props['range'], step=param_props.get('step', 1)
-                )
-            elif param_props['type'] == 'float':
-                params[param_name] = _trial.suggest_float(
-                    param_name, *param_props['range'], step=param_props.get('step', 0.1)
-                )
-        return try_trade(mbs, skip_log, **params)
+        params = suggest(_trial, param_defs)
+        if cache and (result := cache.get(params)) is not None:
+            _trial.set_user_attr('cached', True)
+        else:
+            result = trade_result(mbs, skip_log, trial=_trial if pruner else None, fidelity=fidelity, **params)
+            if cache:
+                cache.put(params, result)
+        return result_values(result, objectives)
+    return objective
+
+
+def strategy_cache(mbs, dataset):
+    """
+    Trial cache for the strategy module on the dataset (raw/ folder or raw_bak.zip), None if TRIAL_CACHE is off
+    """
+    return TrialCache(fingerprint(dataset, mbs.__file__)) if mbs.ex.TRIAL_CACHE else None
+
+
+def study_storage(storage_name, workers=1):
+    """
+    Storage for the study shared by workers. For SQLite: WAL journal, so readers don't block the writer,
+    and busy timeout instead of immediate "database is locked". JOURNAL file is locked by the lock file,
+    which works on NFS also, so the workers of other hosts can share it
+    """
+    if storage_name is not None and storage_name.startswith(JOURNAL):
+        path = storage_name.removeprefix(JOURNAL)
+        return optuna.storages.JournalStorage(
+            optuna.storages.journal.JournalFileBackend(path, lock_obj=optuna.storages.journal.JournalFileOpenLock(path))
+        )
+    if storage_name is None or not storage_name.startswith(SQLITE):
+        return storage_name
+    with closing(sqlite3.connect(storage_name.removeprefix(SQLITE))) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+    storage = optuna.storages.RDBStorage(
+        storage_name,
+        engine_kwargs={"connect_args": {"timeout": SQLITE_TIMEOUT}},
+        heartbeat_interval=HEARTBEAT_INTERVAL if workers > 1 else None,
+        grace_period=2 * HEARTBEAT_INTERVAL if workers > 1 else None,
+    )
+    if workers > 1:
+        # pysqlite begins the transaction at the first write, so two workers could both read the waiting trial
+        # and both take it. With the write lock from the begin the state check and the update are atomic
+        event.listen(storage.engine, "connect", _sqlite_connect)
+        event.listen(storage.engine, "begin", _sqlite_begin)
+        storage.engine.dispose()  # Connection of the storage init is without them
+    return storage
+
+
+def _sqlite_connect(dbapi_connection, _connection_record):
+    dbapi_connection.isolation_level = None
+
+
+def _sqlite_begin(conn):
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _worker(
+        study_name, mbs, storage_name, workers, param_defs, n_trials, skip_log, pruner, cache, fidelity, objectives,
+        total
+):
+    """
+    Pool process, strategy module is inherited from the parent, the own Strategy instance is created on first trial
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _study = optuna.load_study(study_name=study_name, storage=study_storage(storage_name, workers), pruner=pruner)
+    _study.optimize(
+        trial_objective(mbs, param_defs, skip_log, pruner, cache, fidelity, objectives),
+        n_trials=n_trials,
+        gc_after_trial=True,
+        callbacks=[optuna.study.MaxTrialsCallback(total, states=None)] if total else None
+    )
+
+
+def pool_trials(
+        study_name, mbs, storage_name, param_defs, n_trials, skip_log, workers,
+        pruner=None, cache=None, fidelity=None, objectives=None, total=None
+):
+    """
+    Trials are split between worker processes, each pulls them from the same storage.
+    total: trials of the study from all hosts, the workers stop when it is reached
+    """
+    ctx = multiprocessing.get_context('fork')
+    processes = [
+        ctx.Process(
+            target=_worker,
+            args=(study_name, mbs, storage_name, workers, param_defs, n_trials // workers + (i < n_trials % workers),
+                  skip_log, pruner, cache, fidelity, objectives, total)
+        ) for i in range(min(workers, n_trials))
+    ]
+    [process.start() for process in processes]
+    try:
+        [process.join() for process in processes]
+    finally:
+        [process.terminate() for process in processes if process.is_alive()]
+
+
+def fork_trials(
+        _study, mbs, param_defs, n_trials, skip_log, checkpoint_ts=0.0, workers=1, cache=None, fidelity=None,
+        objectives=None
+):
+    """
+    Simulation runs once up to checkpoint_ts sec from the replay start, each trial is forked from there.
+    Parameters are suggested and results are told in this process, so storage is used from one process only
+    """
+    count = iter(range(n_trials))
+
+    def ask():
+        while next(count, None) is not None:
+            _trial = _study.ask()
+            params = suggest(_trial, param_defs)
+            if cache and (result := cache.get(params)) is not None:
+                _trial.set_user_attr('cached', True)
+                _study.tell(_trial, result_values(result, objectives))
+                continue
+            return _trial, params
+        return None
+
+    def apply(item):
+        set_params(STRATEGY.prm, item[1])
+
+    def tell(item, session_result):
+        if session_result is None:
+            _study.tell(item[0], state=optuna.trial.TrialState.FAIL)
+        else:
+            _study.tell(item[0], result_values(session_result, objectives))
+            if cache:
+                cache.put(item[1], session_result)
 
+    checkpoint = Checkpoint(ask, apply, tell, ts=checkpoint_ts, workers=workers)
+    try:
+        try_trade(mbs, skip_log, checkpoint=checkpoint, fidelity=fidelity)
+    finally:
+        if checkpoint.child:
+            os._exit(1)  # Child ends in back_test_handler(), never returns into the study
+
+
+def _init_promote(*args):
+    global PROMOTE
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    PROMOTE = args
+
+
+def _full_result(params: dict) -> dict:
+    mbs, skip_log, cache = PROMOTE
+    if cache and (result := cache.get(params)) is not None:
+        return result
+    result = trade_result(mbs, skip_log, **params)
+    if cache:
+        cache.put(params, result)
+    return result
+
+
+def _window_result(item: tuple) -> dict:
+    params, share = item
+    if share == 1.0:
+        return _full_result(params)
+    mbs, skip_log, _ = PROMOTE
+    return trade_result(mbs, skip_log, fidelity=(1, share), **params)
+
+
+def full_results(mbs, skip_log, candidates: list, workers=1, cache=None, func=_full_result) -> list[dict]:
+    if workers < 2 or len(candidates) < 2:
+        _init_promote(mbs, skip_log, cache)
+        return list(map(func, candidates))
+    if cache:
+        cache.close()
+    ctx = multiprocessing.get_context('fork')
+    with ctx.Pool(min(workers, len(candidates)), initializer=_init_promote, initargs=(mbs, skip_log, cache)) as pool:
+        return pool.map(func, candidates, chunksize=1)
+
+
+def neighbours(params: dict, param_defs: dict) -> list[dict]:
+    """
+    Parameters with one of them shifted by one step of trial_params.json, within its range
+    """
+    res = []
+    for key, props in param_defs.items():
+        if key not in params:
+            continue
+        step = props.get('step', 1 if props['type'] == 'int' else 0.1)
+        for value in (params[key] - step, params[key] + step):
+            if props['range'][0] <= value <= props['range'][1]:
+                res.append(params | {key: value if props['type'] == 'int' else round(value, 10)})
+    return res
+
+
+def robustness(mbs, skip_log, params: dict, param_defs: dict, spec: dict, workers=1, cache=None) -> dict:
+    """
+    spec: {'windows': [0.9, 0.8], 'profitable': 1.0}
+    Neighbours of params and params on the first 'windows' shares of the session are replayed in one parallel batch.
+    :return: 'profitable' - share of them with positive value, 'stable' if it is not less than the spec one
+    """
+    windows = spec.get('windows', ())
+    if not all(0 < share <= 1 for share in windows):
+        raise UserWarning(f"Robustness windows must be shares of session in (0, 1], got {windows}")
+    items = [(p, 1.0) for p in neighbours(params, param_defs)] + [(params, share) for share in windows]
+    values = [session_value(r) for r in full_results(mbs, skip_log, items, workers, cache, _window_result)]
+    profitable = sum(v > 0 for v in values) / len(values) if values else 1.0
+    return {
+        'count': len(values),
+        'profitable': profitable,
+        'min': min(values, default=0.0),
+        'mean': statistics.fmean(values) if values else 0.0,
+        'stable': profitable >= spec.get('profitable', 1.0),
+    }
+
+
+def promote_candidates(low_study, fidelity: dict, keep_first=False) -> list[optuna.trial.FrozenTrial]:
+    """
+    Top 'promote' share of the low fidelity trials, with random 'control' share of the rest, same params once.
+    Trials are ranked by the first objective.
+    keep_first: the first low trial (previous best parameters) is promoted anyway and stays the first
+    """
+    sign = 1 if low_study.directions[0] == optuna.study.StudyDirection.MAXIMIZE else -1
+    trials = low_study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+    ranked = sorted(trials, key=lambda t: sign * t.values[0], reverse=True)
+    n_top = math.ceil(len(ranked) * fidelity.get('promote', 0.2))
+    rest = ranked[n_top:]
+    control = random.Random(0).sample(rest, min(len(rest), math.ceil(len(ranked) * fidelity.get('control', 0.05))))
+    first = trials[:1] if keep_first and trials and trials[0].number == 0 else []
+    candidates = {}
+    for t in first + ranked[:n_top] + control:
+        candidates.setdefault(canonical(t.params), t)
+    return list(candidates.values())
+
+
+def rank_correlation(low: list, full: list) -> float | None:
+    """
+    Spearman correlation of the low and full fidelity values, None for less than two or constant values
+    """
+    try:
+        return statistics.correlation(low, full, method='ranked')
+    except statistics.StatisticsError:
+        return None
+
+
+def promote(
+        low_study, storage, study_name, mbs, skip_log, fidelity: dict, workers=1, cache=None, keep_first=False,
+        objectives=None
+):
+    """
+    Candidates of the low fidelity study are replayed in full, see promote_candidates()
+    :return: new study of the full values, 'rank_correlation' of the low and full values is its user attribute
+    """
+    candidates = promote_candidates(low_study, fidelity, keep_first)
+    results = full_results(mbs, skip_log, [t.params for t in candidates], workers, cache)
+    values = [result_values(result, objectives or {'value': 'maximize'}) for result in results]
+
+    _study = optuna.create_study(study_name=study_name, storage=storage, directions=low_study.directions)
+    _study.add_trials([
+        optuna.trial.create_trial(
+            params=t.params, distributions=t.distributions, values=list(value), user_attrs={'low': t.values[0]}
+        ) for t, value in zip(candidates, values)
+    ])
+    _study.set_user_attr(
+        'rank_correlation', rank_correlation([t.values[0] for t in candidates], [value[0] for value in values])
+    )
+    return _study
+
+
+def make_pareto(spec: dict = None) -> dict | None:
+    """
+    spec: {'objectives': {metric: 'maximize' | 'minimize'}, 'limits': {metric: bound}}, None for single objective.
+    Limit is the lower bound of the maximized metric and the upper one of the minimized, metric must be an objective
+    """
+    if not spec:
+        return None
+    objectives = spec.get('objectives') or {}
+    if unknown := set(objectives) - set(METRICS):
+        raise UserWarning(f"Unknown objectives {unknown}, use one of: {', '.join(METRICS)}")
+    if wrong := {k: v for k, v in objectives.items() if v not in ('maximize', 'minimize')}:
+        raise UserWarning(f"Direction must be 'maximize' or 'minimize', got {wrong}")
+    if unknown := set(spec.get('limits', {})) - set(objectives):
+        raise UserWarning(f"Limits {unknown} are not in objectives")
+    return {'objectives': dict(objectives), 'limits': dict(spec.get('limits', {}))}
+
+
+def best_trial(_study) -> optuna.trial.FrozenTrial | None:
+    """
+    Single objective: the best trial. Multi-objective: Pareto front point with the best first objective
+    among those within 'limits' of the 'pareto' user attribute, None if there is no such one
+    """
+    if len(_study.directions) == 1:
+        return _study.best_trial
+    pareto = _study.user_attrs['pareto']
+    names = list(pareto['objectives'])
+    signs = [1 if d == optuna.study.StudyDirection.MAXIMIZE else -1 for d in _study.directions]
+
+    def within(_trial):
+        return all(
+            signs[names.index(k)] * (_trial.values[names.index(k)] - limit) >= 0
+            for k, limit in pareto['limits'].items()
+        )
+
+    front = [t for t in _study.best_trials if within(t)]
+    return max(front, key=lambda t: signs[0] * t.values[0]) if front else None
+
+
+def previous_trial(_study, prm_best: dict) -> optuna.trial.FrozenTrial | None:
+    """
+    Completed trial of the enqueued previous best params, None if it was pruned or failed
+    """
+    key = canonical(prm_best)
+    trials = _study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+    return next((t for t in trials if canonical(t.params) == key), None)
+
+
+def optimize(
+        study_name,
+        cli,
+        n_trials,
+        storage_name=None,
+        _prm_best=None,
+        skip_log=True,
+        show_progress_bar=False,
+        fork=False,
+        checkpoint_ts=0.0,
+        workers=1,
+        warm_storage=None
+):
+    """
+    fork: trials are forked from checkpoint of one simulation at checkpoint_ts, up to workers at once, POSIX only.
+    The strategy must not make a parameter depended decision before checkpoint_ts
+    workers: without fork, the size of pool of processes for trials. Without storage_name the temporary SQLite is used
+    Study settings are from cli, else from 'optimizer' section of trial_params.json, see trial_params().
+    Pruner is taken from PRUNER or 'pruner', fork trials are not pruned.
+    Results are reused from the trial cache for the same parameters on the same session, if TRIAL_CACHE.
+    Multi-fidelity from FIDELITY or 'fidelity': all trials run on the decimated ticker,
+    then the top of them are replayed in full, see promote()
+    Multi-objective from PARETO or 'pareto', without pruner, see best_trial()
+    Neighbourhood of the best trial is evaluated from ROBUSTNESS or 'robustness',
+    unless it is _prm_best, the result is 'robustness' user attribute of the study, see robustness()
+    warm_storage: of the previous study with the same name, its WARM_START best trials are enqueued after _prm_best
+    GOVERNOR of cli limits priority, CPUs and workers of this process, trial workers inherit them
+    storage_name with JOURNAL: the dataset and the study settings are published next to the journal file,
+    the workers of other hosts join the study up to n_trials in total, see backtest/optimizer_worker.py
+    """
+    sys.excepthook = notify_exception
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+    param_defs, settings = trial_params()
+
+    mbs = load_strategy(cli)
+    try:
+        workers = limit(mbs.ex.GOVERNOR, workers)
+    except psutil.Error as ex:
+        logger.warning(f"Optimizer governor: {ex}")
+    pruner_spec = mbs.ex.PRUNER or settings.get('pruner')
+    pruner = make_pruner(pruner_spec)
+    fidelity = mbs.ex.FIDELITY or settings.get('fidelity')
+    low = (fidelity.get('step', 1), fidelity.get('share', 1.0)) if fidelity else None
+    pareto = make_pareto(mbs.ex.PARETO or settings.get('pareto'))
+    objectives = pareto['objectives'] if pareto else None
+    robust = mbs.ex.ROBUSTNESS or settings.get('robustness')
+    if objectives:
+        pruner_spec = pruner = None  # Intermediate values are not supported for multi-objective study
+    dataset = Path(cli).parent.joinpath("raw")
+    full_cache = cache = strategy_cache(mbs, dataset)
+    if low and cache:
+        cache = TrialCache(f"{cache.salt}{low}")  # Low fidelity values apart from the full ones
+    objective = trial_objective(mbs, param_defs, skip_log, pruner, cache, low, objectives)
+
+    pool = not fork and workers > 1
+    tmp_path = None
+    if pool and storage_name is None:
+        tmp_path = tempfile.mkdtemp()
+        storage_name = f"{SQLITE}{Path(tmp_path, 'study.db')}"
+    storage = study_storage(storage_name, workers if pool else 1)
     # noinspection PyArgumentList
-    _study = optuna.create_study(study_name=study_name, storage=storage_name, direction="maximize")
+    _study = optuna.create_study(
+        study_name=f"{study_name}_low" if low and study_name else study_name,
+        storage=storage,
+        directions=list(objectives.values()) if objectives else ["maximize"],
+        pruner=pruner
+    )
+    if storage_name and storage_name.startswith(JOURNAL):
+        files = {f"raw/{p.name}": p for p in sorted(dataset.iterdir()) if p.is_file()} | {Path(cli).name: cli}
+        if (state := Path(cli).parent.joinpath(STATE)).exists():
+            files[STATE] = state  # Trials of the session restore it, see restore_state_before_backtesting()
+        _study.set_user_attr('worker', {
+            'manifest': publish(Path(storage_name.removeprefix(JOURNAL)).parent, files),
+            'cli': Path(cli).name,
+            'version': mb_ver,
+            'param_defs': param_defs,
+            'pruner': pruner_spec,
+            'low': low,
+            'objectives': objectives,
+            'n_trials': n_trials,
+        })
+    stop = [optuna.study.MaxTrialsCallback(n_trials, states=None)]  # With the trials of other hosts
 
     if _prm_best:
         logger.info(f"Previous best params: {_prm_best}")
-        _study.enqueue_trial(_prm_best)
+    seeds = {canonical(_prm_best): _prm_best} if _prm_best else {}
+    for params in warm_seeds(study_name, warm_storage, mbs.ex.WARM_START, param_defs):
+        seeds.setdefault(canonical(params), params)
+    [_study.enqueue_trial(params) for params in seeds.values()]
 
-    _study.optimize(objective, n_trials=n_trials, gc_after_trial=True, show_progress_bar=show_progress_bar)
+    with shared(dataset, mbs.ex.SHARE_DATASET):  # For all trial processes, see raw_data.share()
+        if fork:
+            fork_trials(_study, mbs, param_defs, n_trials, skip_log, checkpoint_ts, workers, cache, low, objectives)
+        elif pool:
+            # Workers take the enqueued trials first, the storage gives each waiting trial to one of them
+            name = _study.study_name
+            if isinstance(storage, optuna.storages.RDBStorage):
+                storage.engine.dispose()  # Workers open own connections
+            if cache:
+                cache.close()
+            pool_trials(
+                name, mbs, storage_name, param_defs, n_trials, skip_log, workers,
+                pruner, cache, low, objectives, total=n_trials
+            )
+            storage = study_storage(storage_name)
+            if tmp_path:
+                # Results are moved to memory, the temporary storage is removed
+                storage = optuna.storages.InMemoryStorage()
+                optuna.copy_study(from_study_name=name, from_storage=storage_name, to_storage=storage)
+                rmtree(tmp_path, ignore_errors=True)
+            _study = optuna.load_study(study_name=name, storage=storage)
+        else:
+            _study.optimize(
+                objective, n_trials=n_trials, gc_after_trial=True, show_progress_bar=show_progress_bar, callbacks=stop
+            )
+        if low:
+            _study = promote(
+                _study, storage, study_name, mbs, skip_log, fidelity, workers, full_cache, bool(_prm_best), objectives
+            )
+        if pareto:
+            _study.set_user_attr('pareto', pareto)
+        if robust and (best := best_trial(_study)) and canonical(best.params) != canonical(_prm_best or {}):
+            _study.set_user_attr(
+                'robustness', robustness(mbs, skip_log, best.params, param_defs, robust, workers, full_cache)
+            )
+    for _cache in (cache, full_cache):
+        if _cache:
+            _cache.close()
     return _study
 
 
-if __name__ == "__main__":
-    logger = logging.getLogger('logger_S')
+def run(argv: list) -> dict | None:
+    """
+    Self optimization job of backtest_control, argv is the command line without script name:
+    study_name cli n_trials storage_name prm_best log_file [workers] [warm_storage]
+    :return: best params with 'new_value' and '_value' if they are better than prm_best, else {}, None if failed
+    """
     logger.level = logging.INFO
     formatter = logging.Formatter(fmt="[%(asctime)s: %(levelname)s] %(message)s")
     #
-    fh = logging.handlers.RotatingFileHandler(Path(LOG_PATH, sys.argv[6]), maxBytes=500000, backupCount=5)
+    fh = logging.handlers.RotatingFileHandler(Path(LOG_PATH, argv[5]), maxBytes=500000, backupCount=5)
     fh.setFormatter(formatter)
     fh.setLevel(logging.INFO)
     logger.addHandler(fh)
     #
-    prm_best = json.loads(sys.argv[5])
+    prm_best = json.loads(argv[4])
     logger.info(f"Previous best params: {prm_best}")
     try:
         study = optimize(
-            sys.argv[1],
-            sys.argv[2],
-            int(sys.argv[3]),
-            storage_name=sys.argv[4],
-            _prm_best=prm_best
+            argv[0],
+            argv[1],
+            int(argv[2]),
+            storage_name=argv[3],
+            _prm_best=prm_best,
+            workers=int(argv[6]) if len(argv) > 6 else 1,
+            warm_storage=argv[7] if len(argv) > 7 else None
         )
     except KeyboardInterrupt:
-        pass  # ignore
+        return None
     except Exception as ex:
         logger.info(f"optimizer: {ex}")
-    else:
-        new_value = round(study.best_value, ndigits=6)
-        bp = {k: int(any2str(v)) if isinstance(v, int) else float(any2str(v)) for k, v in study.best_params.items()}
+        return None
+    best = best_trial(study)
+    if len(study.directions) > 1:
+        logger.info(f"Pareto front: {[t.values for t in study.best_trials]},"
+                    f" selected: {best.values if best else 'none within limits'}")
+    logger.info(f"Trials from cache: {sum(t.user_attrs.get('cached', False) for t in study.trials)}")
+    if 'rank_correlation' in study.user_attrs:
+        logger.info(f"Multi-fidelity rank correlation: {study.user_attrs['rank_correlation']}")
+    if best is None:
+        return {}
+    new_value = round(best.values[0], ndigits=6)
+    bp = {k: int(any2str(v)) if isinstance(v, int) else float(any2str(v)) for k, v in best.params.items()}
 
-        logger.info(f"Optimal parameters: {bp} for get {new_value}")
-        if new_value:
-            logger.info(f"Importance parameters: {optuna.importance.get_param_importances(study)}")
+    logger.info(f"Optimal parameters: {bp} for get {new_value}")
+    if new_value:
+        importance = optuna.importance.get_param_importances(study, target=lambda t: t.values[0])
+        logger.info(f"Importance parameters: {importance}")
 
-        _value = round(study.get_trials()[0].value, ndigits=6)
-
-        if not prm_best or new_value > _value:
-            bp |= {'new_value': any2str(new_value), '_value': any2str(_value)}
-            print(json.dumps(bp))
+    _value = None
+    if prm_best:
+        if previous := previous_trial(study, prm_best):
+            _value = round(previous.values[0], ndigits=6)
         else:
-            print(json.dumps({}))
+            logger.info("Trial of the previous best params was pruned or failed")
+    sign = 1 if study.directions[0] == optuna.study.StudyDirection.MAXIMIZE else -1
+
+    if _value is None or sign * (new_value - _value) > 0:
+        if (robust := study.user_attrs.get('robustness')) is not None:
+            logger.info(f"Robustness of neighbourhood: {robust}")
+            if not robust['stable']:
+                return {}
+        return bp | {'new_value': any2str(new_value), '_value': 'none' if _value is None else any2str(_value)}
+    return {}
+
+
+if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # backtest_control terminates, stop the pool also
+    if (res := run(sys.argv[1:])) is not None:
+        print(json.dumps(res))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Long-lived local optimizer service for the self optimization of MODE 'TC' strategies with OPTIMIZER_DAEMON.
+Imports of optuna, pandas, scipy, pyarrow and strategy are made once at start, raw data of the session is held
+in memory between cycles. Each job runs in own forked process, so the strategy module globals don't leak between
+jobs and backtest_control can terminate the job by pid, same as the optimizer process.
+
+python -m martin_binance.backtest.optimizer_daemon
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+import multiprocessing
+import os
+import signal
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+
+import ujson as json
+
+from martin_binance import WORK_PATH
+
+DAEMON_SOCKET = Path(WORK_PATH, "optimizer.sock")
+HANDSHAKE_TIMEOUT = 5  # sec, client that doesn't send the job in time is dropped, the next one is accepted
+
+
+class DaemonJob:
+    """
+    Optimizer job submitted to the daemon, in place of the optimizer process for backtest_control.
+    Raise OSError if the daemon is not running
+    """
+    __slots__ = ("conn", "pid")
+
+    def __init__(self, args: list, path: Path = DAEMON_SOCKET):
+        self.conn = Client(str(path), family='AF_UNIX')
+        self.conn.send_bytes(json.dumps({'args': list(map(str, args))}).encode())
+        self.pid = json.loads(self.conn.recv_bytes())['pid']
+
+    def communicate(self) -> tuple[bytes, None]:
+        """
+        Blocking, same output as stdout of the optimizer process, empty if job failed or was terminated
+        """
+        try:
+            return self.conn.recv_bytes(), None
+        except EOFError:
+            return b'', None
+        finally:
+            self.conn.close()
+
+    def terminate(self):
+        try:
+            os.kill(self.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass  # Job is done already
+
+
+def _job(conn, args: list):
+    from martin_binance.backtest import optimizer
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # As for the optimizer process, stop the pool also
+    try:
+        conn.send_bytes(json.dumps({'pid': os.getpid()}).encode())
+        if (res := optimizer.run(args)) is not None:
+            conn.send_bytes(json.dumps(res).encode())
+    except KeyboardInterrupt:
+        pass  # Terminated by backtest_control
+    finally:
+        conn.close()
+
+
+def serve(path: Path = DAEMON_SOCKET):
+    # Heavy imports once, the jobs are forked with them
+    import martin_binance.executor
+    import martin_binance.backtest.optimizer
+    from martin_binance.backtest.raw_data import hold
+
+    ctx = multiprocessing.get_context('fork')
+    path.unlink(missing_ok=True)
+    with Listener(str(path), family='AF_UNIX') as listener:
+        path.chmod(0o600)
+        print(f"Optimizer daemon is listening on {path}")
+        while True:
+            conn = listener.accept()
+            try:
+                if not conn.poll(HANDSHAKE_TIMEOUT):
+                    raise TimeoutError(f"no job in {HANDSHAKE_TIMEOUT} sec")
+                args = json.loads(conn.recv_bytes())['args']
+                hold(Path(args[1]).parent.joinpath("raw"))  # cli is in the session root
+            except (EOFError, OSError, ValueError, KeyError, IndexError, TimeoutError) as ex:
+                print(f"Optimizer daemon: bad request: {ex}")
+                conn.close()
+                continue
+            ctx.Process(target=_job, args=(conn, args), daemon=False).start()
+            conn.close()  # Job has own copy
+            multiprocessing.active_children()  # Reap finished jobs
+
+
+def main():
+    try:
+        serve()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        DAEMON_SOCKET.unlink(missing_ok=True)
+
+
+if __name__ == '__main__':
+    main()
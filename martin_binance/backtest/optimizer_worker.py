@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Worker host of the multi-host study. Joins the newest open study of exchange_PAIR in the shared folder,
+which the optimizer publishes with JOURNAL storage, syncs its dataset and strategy to the local BACKTEST_PATH
+by content hash and contributes trials until the study has n_trials. Then waits for the next one.
+Journal file is locked by the lock file, so the folder must be the shared disk (NFS, CIFS, sshfs),
+not the synchronized one
+
+python -m martin_binance.backtest.optimizer_worker <shared folder>/<exchange_PAIR> [workers]
+Needs exchanges-wrapper server same as MODE 'S'
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+import multiprocessing
+import signal
+import sys
+import time
+from pathlib import Path
+
+import optuna
+
+from martin_binance import BACKTEST_PATH, __version__ as mb_ver
+from martin_binance.backtest.governor import limit
+from martin_binance.backtest.optimizer import (
+    JOURNAL, load_strategy, make_pruner, pool_trials, strategy_cache, study_storage, trial_objective
+)
+from martin_binance.backtest.study_share import sync
+from martin_binance.backtest.trial_cache import TrialCache
+
+POLL = 60  # sec between checks of the shared folder for the open study
+
+
+def open_study(share: Path) -> tuple[str, str, dict] | None:
+    """
+    Study of the newest journal in the share with the 'worker' user attribute and less than n_trials trials
+    :return: (storage_name, study_name, study settings) or None
+    """
+    logs = sorted(share.glob("*.log"), key=lambda p: p.stat().st_mtime)
+    if not logs:
+        return None
+    storage_name = f"{JOURNAL}{logs[-1]}"
+    storage = study_storage(storage_name)
+    for summary in reversed(optuna.get_all_study_summaries(storage, include_best_trial=False)):
+        spec = summary.user_attrs.get('worker')
+        if spec and summary.n_trials < spec['n_trials']:
+            return storage_name, summary.study_name, spec
+    return None
+
+
+def contribute(storage_name: str, study_name: str, spec: dict, target: Path, workers: int):
+    """
+    Forked process, so the strategy module and its globals are own for each study
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    mbs = load_strategy(Path(target, spec['cli']))
+    workers = limit(mbs.ex.GOVERNOR, workers)
+    low = tuple(spec['low']) if spec['low'] else None
+    cache = strategy_cache(mbs, Path(target, "raw"))
+    if low and cache:
+        cache = TrialCache(f"{cache.salt}{low}")  # Same keys as on the host of the study
+    pruner = make_pruner(spec['pruner'])
+    if workers > 1:
+        if cache:
+            cache.close()
+        pool_trials(
+            study_name, mbs, storage_name, spec['param_defs'], spec['n_trials'], True, workers,
+            pruner, cache, low, spec['objectives'], total=spec['n_trials']
+        )
+    else:
+        _study = optuna.load_study(study_name=study_name, storage=study_storage(storage_name), pruner=pruner)
+        _study.optimize(
+            trial_objective(mbs, spec['param_defs'], True, pruner, cache, low, spec['objectives']),
+            gc_after_trial=True,
+            callbacks=[optuna.study.MaxTrialsCallback(spec['n_trials'], states=None)]
+        )
+    if cache:
+        cache.close()
+
+
+def work(share: Path, workers: int = 1):
+    target = Path(BACKTEST_PATH, share.name)
+    ctx = multiprocessing.get_context('fork')
+    while True:
+        if (item := open_study(share)) is None:
+            time.sleep(POLL)
+            continue
+        storage_name, study_name, spec = item
+        if spec['version'] != mb_ver:
+            print(f"Study {study_name} is from martin-binance {spec['version']}, this host has {mb_ver}")
+        elif not sync(share, spec['manifest'], target):
+            print(f"Dataset of {study_name} is not synced yet")
+        else:
+            print(f"Join study {study_name} from {storage_name.removeprefix(JOURNAL)}")
+            process = ctx.Process(target=contribute, args=(storage_name, study_name, spec, target, workers))
+            process.start()
+            try:
+                process.join()
+            finally:
+                if process.is_alive():
+                    process.terminate()
+        time.sleep(POLL)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        raise SystemExit(1)
+    try:
+        work(Path(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) > 2 else 1)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bounded archive of terminal (FILLED, CANCELED) orders for the exchange simulator.
+Last orders stay in memory for lookup, older are dropped or spilled to parquet for analytics
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+ORDERS_PRKT = "orders.parquet"
+ORDERS_SCHEMA = pa.schema(
+    [
+        ("order_id", pa.int64()),
+        ("client_order_id", pa.string()),
+        ("side", pa.string()),
+        ("status", pa.string()),
+        ("price", pa.string()),
+        ("orig_qty", pa.string()),
+        ("executed_qty", pa.string()),
+        ("cummulative_quote_qty", pa.string()),
+        ("order_creation_time", pa.int64()),
+        ("transact_time", pa.int64()),
+    ]
+)
+ARCHIVE_SIZE = 4096
+BUFFER_SIZE = 20480
+
+
+class OrderArchive:
+    """
+    Insertion ordered {order_id: Order}, the oldest order is evicted when size is exceeded, O(1) per order
+    """
+    __slots__ = ("fp", "size", "orders", "path", "writer", "buffer", "evicted")
+
+    def __init__(self, fp, size: int = ARCHIVE_SIZE, spill: Path = None):
+        self.fp = fp  # Number engine of the Account, for exact values on spill
+        self.size = size
+        self.orders = {}
+        self.path = spill
+        self.writer = None
+        self.buffer = []
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __contains__(self, order_id: int):
+        return order_id in self.orders
+
+    def get(self, order_id: int, default=None):
+        return self.orders.get(order_id, default)
+
+    def add(self, order):
+        self.orders[order.order_id] = order
+        if len(self.orders) > self.size:
+            self._evict(self.orders.pop(next(iter(self.orders))))
+
+    def _evict(self, order):
+        self.evicted += 1
+        if self.path is None:
+            return
+        self.buffer.append(self.record(order))
+        if len(self.buffer) >= BUFFER_SIZE:
+            self.flush()
+
+    def record(self, order) -> dict:
+        return {
+            "order_id": order.order_id,
+            "client_order_id": order.client_order_id,
+            "side": order.side,
+            "status": order.status,
+            "price": self.fp.str_price(order.price),
+            "orig_qty": self.fp.str_qty(order.orig_qty),
+            "executed_qty": self.fp.str_qty(order.executed_qty),
+            "cummulative_quote_qty": self.fp.str_notional(order.cummulative_quote_qty),
+            "order_creation_time": order.order_creation_time,
+            "transact_time": order.transact_time,
+        }
+
+    def flush(self):
+        if self.buffer:
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, schema=ORDERS_SCHEMA)
+            self.writer.write_batch(pa.RecordBatch.from_pylist(self.buffer, schema=ORDERS_SCHEMA))
+            self.buffer.clear()
+
+    def close(self):
+        """
+        Spill the rest of archive, so the file contains all terminal orders of the session
+        """
+        if self.path is None:
+            return
+        self.buffer.extend(map(self.record, self.orders.values()))
+        self.orders.clear()
+        self.flush()
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+
+def read_orders(path: Path) -> list[dict]:
+    return pq.read_table(path).to_pylist()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Portfolio backtest: several Strategy instances replay their collected sessions in one process and one event loop.
+Each strategy has own Params from its cli_*.py and own ticker, order book and candles streams of the session,
+orders are on own Account of the Portfolio, and the Accounts share balance of the common asset
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+import asyncio
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+from martin_binance.backtest.exchange_simulator import Portfolio, Account
+from martin_binance.backtest.optimizer import load_strategy
+from martin_binance.backtest.raw_data import TICKER_PRKT, first_row
+from martin_binance.backtest.virtual_clock import VirtualClock
+from martin_binance.lib import tasks_manage
+from martin_binance.params import Params
+
+
+def session_symbol(session_root: Path) -> str:
+    """
+    back_test/<exchange>_<PAIR> -> PAIR
+    """
+    return Path(session_root).name.rsplit('_', 1)[-1]
+
+
+class PortfolioReplay:
+    """
+    Strategies of the pairs run in one event loop. With virtual clock all sessions are on one simulated time,
+    the clock is moved only when every strategy waits for it, so the shared balance is changed in time order
+    across the pairs. Without it each strategy replays own session by XTIME
+    """
+    __slots__ = ("portfolio", "virtual_clock", "strategies", "start", "clock", "tasks", "started", "finished", "done")
+
+    def __init__(self, portfolio: Portfolio = None, virtual_clock: bool = True):
+        self.portfolio = portfolio or Portfolio()
+        self.virtual_clock = virtual_clock
+        self.strategies = {}  # {symbol: Strategy}
+        self.start = {}  # {symbol: first ticker ts, ms}
+        self.clock = None
+        self.tasks = set()
+        self.started = set()
+        self.finished = set()
+        self.done = None
+
+    def add_session(self, session_root: Path, cli: Path, **kwargs):
+        """
+        Strategy with own Params of the cli, replays session_root/raw from scratch
+        kwargs: parameters to change, as the optimizer does for trial
+        :return: Strategy
+        """
+        from martin_binance.executor import Strategy
+        raw_path = Path(session_root, "raw")
+        symbol = session_symbol(session_root)
+        if symbol in self.strategies:
+            raise UserWarning(f"Symbol {symbol} already exist")
+        load_strategy(cli)  # Sets module parameters, Params() takes the snapshot before the next cli
+        params = Params(**kwargs).update(
+            MODE='S', VIRTUAL_CLOCK=self.virtual_clock, FIXED_POINT=False, SAVE_DS=False, RAW_SOURCE=raw_path
+        )
+        if params.SYMBOL != symbol:
+            raise UserWarning(f"Session {session_root} is not for {params.SYMBOL} of {cli}")
+        strategy = Strategy(params)
+        strategy.portfolio = self
+        self.strategies[symbol] = strategy
+        self.start[symbol] = first_row(pq.ParquetFile(Path(raw_path, TICKER_PRKT)))[0]
+        return strategy
+
+    def open_account(self, strategy) -> Account:
+        """
+        Strategy deposit is added to the Portfolio balances, fees are from its Params
+        """
+        prm = strategy.prm
+        account = self.portfolio.add_symbol(
+            strategy.symbol, strategy.base_asset, strategy.quote_asset, prm.FEE_MAKER, prm.FEE_TAKER
+        )
+        self.portfolio.deposit(strategy.base_asset, prm.AMOUNT_FIRST)
+        self.portfolio.deposit(strategy.quote_asset, prm.AMOUNT_SECOND)
+        return account
+
+    def ready(self, strategy):
+        """
+        Strategy streams are declared. The clock starts when all of them are, else the first pair would run alone
+        """
+        self.started.add(strategy.symbol)
+        if self.clock and len(self.started) == len(self.strategies):
+            tasks_manage(self.tasks, self.clock_run())
+
+    def finish(self, strategy):
+        self.finished.add(strategy.symbol)
+        if self.clock:
+            self.clock.discard(strategy)
+        if len(self.finished) == len(self.strategies) and not self.done.done():
+            self.done.set_result(None)
+
+    def main_done(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() and not self.done.done():
+            self.done.set_exception(task.exception())
+
+    async def clock_run(self):
+        """
+        Same as StrategyBase.clock_run() for all strategies on the shared clock
+        """
+        while self.clock.timers and len(self.finished) < len(self.strategies):
+            for strategy in self.strategies.values():
+                await strategy.settle(*self.tasks)
+            if not self.clock.timers:
+                break
+            res = self.clock.step()
+            if asyncio.iscoroutine(res):
+                tasks_manage(self.tasks, res)
+
+    async def run(self) -> list[dict]:
+        """
+        :return: Portfolio balances at the end of the sessions, results of each pair are in its prm.SESSION_RESULT
+        """
+        self.done = asyncio.get_running_loop().create_future()
+        if self.virtual_clock:
+            self.clock = VirtualClock(min(self.start.values()) / 1000)
+        for symbol, strategy in self.strategies.items():
+            task = asyncio.create_task(strategy.main(symbol), name=f"portfolio-main-{symbol}")
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+            task.add_done_callback(self.main_done)
+        await self.done
+        return self.portfolio.get_funds()
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Raw market data format for backtesting: typed columnar Arrow schema (v2),
+reader for v1 (key, orjson row) and v2 files, converter for the v1 raw/ folders,
+source of the session files from raw/ folder or straight from raw_bak.zip archive
+
+v2 keeps price and quantity as exchange decimal strings, so the replay is exact and Decimal-ready,
+time as int64, other numbers as float64. Rows are namedtuple over the column lists with access by key
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+import math
+import sys
+import tempfile
+import zipfile
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from shutil import make_archive, rmtree
+
+import orjson
+import pyarrow as pa
+import ujson as json
+import pyarrow.parquet as pq
+
+ORDER_BOOK_PRKT = "order_book.parquet"
+TICKER_PRKT = "ticker.parquet"
+KLINES_FILE = "klines.json"
+BATCH_SIZE = 65536
+HELD = {}  # {raw/ folder: (stamp, {file name: bytes})}, see hold()
+SHARED = {}  # {raw/ folder or raw_bak.zip: folder of Arrow IPC files}, see share()
+SHARED_PATH = Path("/dev/shm") if Path("/dev/shm").is_dir() else Path(tempfile.gettempdir())
+
+SCHEMA_V1 = pa.schema([("key", pa.int64()), ("row", pa.binary())])
+TICKER_SCHEMA = pa.schema(
+    [
+        ("key", pa.int64()),
+        ("openPrice", pa.string()),
+        ("lastPrice", pa.string()),
+        ("closeTime", pa.int64()),
+        ("Qty", pa.string()),
+        ("delay", pa.float64()),
+    ]
+)
+ORDER_BOOK_SCHEMA = pa.schema(
+    [
+        ("key", pa.int64()),
+        ("bid_price", pa.string()),
+        ("bid_qty", pa.string()),
+        ("ask_price", pa.string()),
+        ("ask_qty", pa.string()),
+    ]
+)
+CANDLE_SCHEMA = pa.schema(
+    [
+        ("key", pa.int64()),
+        ("open_time", pa.int64()),
+        ("open", pa.float64()),
+        ("high", pa.float64()),
+        ("low", pa.float64()),
+        ("close", pa.float64()),
+        ("volume", pa.float64()),
+        ("close_time", pa.int64()),
+        ("quote_volume", pa.float64()),
+        ("trades", pa.int64()),
+    ]
+)
+
+
+class TickerRow(namedtuple('TickerRow', TICKER_SCHEMA.names[1:])):
+    """
+    Ticker from v2 file, access by key same as ticker dict
+    """
+    __slots__ = ()
+    __getitem__ = object.__getattribute__
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
+class OrderBookRow(namedtuple('OrderBookRow', ORDER_BOOK_SCHEMA.names[1:])):
+    """
+    Top of the order book from v2 file, access by key same as order book dict
+    """
+    __slots__ = ()
+    __getitem__ = object.__getattribute__
+
+    @property
+    def bids(self) -> list:
+        return [[self.bid_price, self.bid_qty]] if self.bid_price is not None else []
+
+    @property
+    def asks(self) -> list:
+        return [[self.ask_price, self.ask_qty]] if self.ask_price is not None else []
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
+ROW_TYPES = (
+    ('lastPrice', partial(tuple.__new__, TickerRow)),  # Built in C, without __new__ call per row
+    ('bid_price', partial(tuple.__new__, OrderBookRow)),
+    ('open', tuple),
+)
+
+
+def is_v2(ds: pq.ParquetFile) -> bool:
+    return 'row' not in ds.schema_arrow.names
+
+
+def ticker_record(key: int, ticker: dict) -> dict:
+    return {
+        "key": key,
+        "openPrice": str(ticker['openPrice']),
+        "lastPrice": str(ticker['lastPrice']),
+        "closeTime": int(ticker['closeTime']),
+        "Qty": str(ticker.get('Qty', '0')),
+        "delay": float(ticker.get('delay', 0)),
+    }
+
+
+def order_book_record(key: int, order_book: dict) -> dict:
+    bids = order_book['bids'][:1]
+    asks = order_book['asks'][:1]
+    return {
+        "key": key,
+        "bid_price": str(bids[0][0]) if bids else None,
+        "bid_qty": str(bids[0][1]) if bids else None,
+        "ask_price": str(asks[0][0]) if asks else None,
+        "ask_qty": str(asks[0][1]) if asks else None,
+    }
+
+
+def candle_record(key: int, candle: list) -> dict:
+    return {
+        "key": key,
+        "open_time": int(candle[0]),
+        "open": float(candle[1]),
+        "high": float(candle[2]),
+        "low": float(candle[3]),
+        "close": float(candle[4]),
+        "volume": float(candle[5]),
+        "close_time": int(candle[6]),
+        "quote_volume": float(candle[7]),
+        "trades": int(candle[8]),
+    }
+
+
+def batch_rows(batch: pa.RecordBatch):
+    """
+    Iterate (key, row) over the batch of v1 or v2 file. v2 rows are tuples built from the column lists,
+    without intermediate dict
+    """
+    names = batch.schema.names
+    keys = batch.column('key').to_pylist()
+    if 'row' in names:
+        yield from zip(keys, map(orjson.loads, batch.column('row').to_pylist()))
+        return
+    row_type = next(_type for column, _type in ROW_TYPES if column in names)
+    yield from zip(keys, map(row_type, zip(*(batch.column(i).to_pylist() for i in range(1, len(names))))))
+
+
+def first_row(ds: pq.ParquetFile) -> tuple:
+    return next(batch_rows(next(ds.iter_batches(batch_size=1))))
+
+
+def decimate(ds: pq.ParquetFile, step: int = 1, share: float = 1.0) -> pq.ParquetFile:
+    """
+    Low fidelity copy in memory: every step-th row of the first share of rows, the first and last rows are kept
+    """
+    table = ds.read()
+    stop = max(1, min(table.num_rows, math.ceil(table.num_rows * share)))
+    index = list(range(0, stop, max(1, step)))
+    if index[-1] != stop - 1:
+        index.append(stop - 1)
+    sink = pa.BufferOutputStream()
+    pq.write_table(table.take(index), sink, compression='none')
+    return pq.ParquetFile(pa.BufferReader(sink.getvalue()))
+
+
+def hold(path: Path) -> bool:
+    """
+    Keep files of raw/ folder in memory, RawSource of this folder reads them from there, in this process
+    and in the forked ones. Data of the folder is read again when any file is changed.
+    For the long-lived optimizer daemon, see backtest/optimizer_daemon.py
+    :return: True if the data was (re)read
+    """
+    path = Path(path).resolve()
+    files = sorted(p for p in path.iterdir() if p.is_file()) if path.is_dir() else []
+    stamp = tuple((p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in files)
+    if not stamp:
+        HELD.pop(path, None)
+        return False
+    if path in HELD and HELD[path][0] == stamp:
+        return False
+    HELD[path] = (stamp, {p.name: p.read_bytes() for p in files})
+    return True
+
+
+IpcMetadata = namedtuple('IpcMetadata', 'num_rows')
+
+
+class IpcFile:
+    """
+    Decoded table in memory mapped Arrow IPC file, zero-copy. Subset of pq.ParquetFile interface used for replay
+    """
+    __slots__ = ("reader",)
+
+    def __init__(self, path: Path):
+        self.reader = pa.ipc.open_file(pa.memory_map(str(path)))
+
+    @property
+    def schema_arrow(self) -> pa.Schema:
+        return self.reader.schema
+
+    @property
+    def metadata(self) -> IpcMetadata:
+        return IpcMetadata(sum(self.reader.get_batch(i).num_rows for i in range(self.reader.num_record_batches)))
+
+    def read(self) -> pa.Table:
+        return self.reader.read_all()
+
+    def iter_batches(self, batch_size: int = BATCH_SIZE):
+        for i in range(self.reader.num_record_batches):
+            batch = self.reader.get_batch(i)
+            for offset in range(0, batch.num_rows, batch_size):
+                yield batch.slice(offset, batch_size)
+
+
+class RawSource:
+    """
+    Session files from raw/ folder or from raw_bak.zip without extracting to disk. Archive member is read into
+    memory as is, parquet pages are decoded on demand same as from the file. Folder is read from memory if held,
+    parquet files are mapped from shared memory if shared
+    """
+    __slots__ = ("path", "archive", "held", "shared")
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        key = self.path.resolve() if HELD or SHARED else None
+        self.shared = SHARED.get(key)
+        self.archive = zipfile.ZipFile(self.path) if zipfile.is_zipfile(self.path) else None
+        self.held = HELD[key][1] if key in HELD else None
+
+    def _read(self, name: str) -> bytes:
+        if self.held is not None:
+            return self.held[name]
+        return self.archive.read(f"raw/{name}")
+
+    def names(self) -> list[str]:
+        """
+        Parquet files of the session
+        """
+        if self.held is not None:
+            names = self.held
+        elif self.archive is not None:
+            names = (name.removeprefix("raw/") for name in self.archive.namelist() if name.startswith("raw/"))
+        else:
+            names = (path.name for path in self.path.iterdir())
+        return sorted(name for name in names if name.endswith(".parquet"))
+
+    def parquet(self, name: str) -> pq.ParquetFile | IpcFile:
+        if self.shared is not None:
+            return IpcFile(Path(self.shared, name))
+        if self.archive is None and self.held is None:
+            return pq.ParquetFile(Path(self.path, name))
+        return pq.ParquetFile(pa.BufferReader(self._read(name)))
+
+    def klines(self) -> dict:
+        if self.archive is None and self.held is None:
+            return json.loads(Path(self.path, KLINES_FILE).read_text())
+        return json.loads(self._read(KLINES_FILE))
+
+    def close(self):
+        if self.archive:
+            self.archive.close()
+            self.archive = None
+
+
+def share(path: Path) -> Path | None:
+    """
+    Decode parquet files of raw/ folder or raw_bak.zip once into Arrow IPC files in SHARED_PATH, RawSource of
+    this path maps them zero-copy, in this process and in the forked ones. Replay of each trial worker then starts
+    without decoding and the pages of data are shared between workers.
+    :return: folder of IPC files, None if there is no space for them
+    """
+    path = Path(path).resolve()
+    if path in SHARED:
+        return SHARED[path]
+    target = Path(tempfile.mkdtemp(prefix="mb_raw_", dir=SHARED_PATH))
+    source = RawSource(path)
+    try:
+        for name in source.names():
+            table = source.parquet(name).read().combine_chunks()
+            with pa.OSFile(str(Path(target, name)), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    except OSError:
+        rmtree(target, ignore_errors=True)
+        return None
+    finally:
+        source.close()
+    SHARED[path] = target
+    return target
+
+
+def unshare(path: Path):
+    if target := SHARED.pop(Path(path).resolve(), None):
+        rmtree(target, ignore_errors=True)
+
+
+@contextmanager
+def shared(path: Path, enabled=True):
+    """
+    Dataset is shared inside the context, see share()
+    """
+    target = share(path) if enabled else None
+    try:
+        yield target
+    finally:
+        if target:
+            unshare(path)
+
+
+def _convert_file(path: Path, schema: pa.schema, record) -> int:
+    ds = pq.ParquetFile(path)
+    if is_v2(ds):
+        return 0
+    tmp = path.with_suffix('.v2')
+    rows = 0
+    with pq.ParquetWriter(tmp, schema=schema) as writer:
+        for batch in ds.iter_batches(BATCH_SIZE):
+            records = [record(key, row) for key, row in batch_rows(batch)]
+            writer.write_batch(pa.RecordBatch.from_pylist(records, schema=schema))
+            rows += len(records)
+    ds.close()
+    tmp.replace(path)
+    return rows
+
+
+def convert(raw_path: Path) -> dict:
+    """
+    Convert v1 files in raw/ folder to v2 in place, v2 files are skipped
+    :return: {file name: converted rows}
+    """
+    res = {}
+    for path in sorted(raw_path.glob("*.parquet")):
+        if path.name == TICKER_PRKT:
+            res[path.name] = _convert_file(path, TICKER_SCHEMA, ticker_record)
+        elif path.name == ORDER_BOOK_PRKT:
+            res[path.name] = _convert_file(path, ORDER_BOOK_SCHEMA, order_book_record)
+        elif path.name.startswith("candles_"):
+            res[path.name] = _convert_file(path, CANDLE_SCHEMA, candle_record)
+    return res
+
+
+def main():
+    """
+    python -m martin_binance.backtest.raw_data <session_root | raw folder> ...
+    """
+    if len(sys.argv) < 2:
+        print(main.__doc__)
+        raise SystemExit(1)
+    for arg in sys.argv[1:]:
+        raw_path = Path(arg)
+        if raw_path.name != 'raw':
+            raw_path = Path(raw_path, 'raw')
+        for name, rows in convert(raw_path).items():
+            print(f"{raw_path}/{name}: {f'{rows} rows converted' if rows else 'already v2'}")
+        if Path(raw_path.parent, "raw_bak.zip").exists():
+            make_archive(str(Path(raw_path.parent, "raw_bak")), 'zip', raw_path.parent, 'raw')
+
+
+if __name__ == '__main__':
+    main()
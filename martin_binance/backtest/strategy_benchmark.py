@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Throughput benchmark of Strategy in simulate mode on the synthetic sessions, with stored baseline for compare
+between versions. Each scenario runs in own forked process: plain run for the throughput and RSS growth,
+under cProfile for time by section, with tracemalloc for allocations by section
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+import asyncio
+import contextlib
+import cProfile
+import functools
+import multiprocessing
+import pstats
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from queue import Empty
+from shutil import rmtree
+
+import psutil
+import ujson as json
+
+from martin_binance import BACKTEST_PATH, __version__ as mb_ver
+from martin_binance.backtest.exchange_simulator import Account
+from martin_binance.backtest.optimizer import try_trade, load_strategy
+from martin_binance.backtest.synthetic import Session
+
+SCENARIOS = {
+    'calm': {'ticks': 200000, 'volatility': 0.3},
+    'volatile': {'ticks': 200000, 'volatility': 1.2},
+}
+SEED = 0
+BASELINE = Path(BACKTEST_PATH, "benchmark_baseline.json")
+SECTIONS = ('on_new_ticker', 'on_ticker_update', 'on_order_update_ex')
+COMPARE = ('ticks_s', 'fills_s', 'rss_mb')
+POLL = 5  # sec between checks that the scenario process is alive
+
+
+class Probe:
+    """
+    Calls count of the wrapped method and allocated bytes high-water per call with tracemalloc.
+    For a coroutine the high-water includes other tasks that run while it awaits
+    """
+    __slots__ = ("calls", "size", "items", "first", "last")
+
+    def __init__(self):
+        self.calls = 0
+        self.size = 0
+        self.items = 0  # Fill events for Account.on_ticker_update
+        self.first = None
+        self.last = None
+
+    def _enter(self) -> int:
+        self.calls += 1
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            return tracemalloc.get_traced_memory()[0]
+        return 0
+
+    def _exit(self, current: int):
+        if tracemalloc.is_tracing():
+            self.size += tracemalloc.get_traced_memory()[1] - current
+
+    def wrap(self, func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                current = self._enter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self._exit(current)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                self.first = self.first or time.perf_counter()
+                current = self._enter()
+                try:
+                    res = func(*args, **kwargs)
+                finally:
+                    self._exit(current)
+                self.items += len(res)
+                self.last = time.perf_counter()
+                return res
+        return wrapper
+
+
+def _run(mbs, mode: str, queue):
+    """
+    Child process: run strategy on the prepared session and put metrics into the queue.
+    RSS is counted from the fork, pages of the parent are not the scenario memory
+    """
+    rss = psutil.Process().memory_info().rss
+    from martin_binance.executor import Strategy
+    owners = {'on_new_ticker': Strategy, 'on_ticker_update': Account, 'on_order_update_ex': Strategy}
+    probes = {name: Probe() for name in SECTIONS}
+    funcs = {name: getattr(owners[name], name) for name in SECTIONS}
+    for name in SECTIONS:
+        setattr(owners[name], name, probes[name].wrap(funcs[name]))
+    profiler = cProfile.Profile() if mode == 'profile' else None
+    if mode == 'alloc':
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    try_trade(mbs, skip_log=True)
+    if profiler:
+        profiler.disable()
+    tracemalloc.stop()
+
+    ticker = probes['on_ticker_update']
+    replay = (ticker.last - ticker.first) if ticker.calls > 1 else 0
+    res = {
+        'replay_s': replay,
+        'delivered': ticker.calls,
+        'fills': ticker.items,
+        'rss_mb': (psutil.Process().memory_info().rss - rss) / 2 ** 20,
+        'sections': {},
+    }
+    stats = pstats.Stats(profiler).stats if profiler else {}
+    total = max((v[3] for v in stats.values()), default=0)
+    for name in SECTIONS:
+        code = funcs[name].__code__
+        key = (code.co_filename, code.co_firstlineno, code.co_name)
+        ct = stats.get(key, (0, 0, 0, 0))[3]  # Cumulative time, without the time of coroutine suspension
+        res['sections'][name] = {
+            'calls': probes[name].calls,
+            'us_call': ct * 1e6 / probes[name].calls if probes[name].calls else 0,
+            'share': ct / total if total else 0,
+            'alloc_tick': probes[name].size / ticker.calls if ticker.calls else 0,
+        }
+    queue.put(res)
+
+
+def run_scenario(mbs, mode: str) -> dict:
+    ctx = multiprocessing.get_context('fork')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_run, args=(mbs, mode, queue))
+    process.start()
+    try:
+        while True:
+            try:
+                return queue.get(timeout=POLL)
+            except Empty:
+                if process.exitcode is not None and queue.empty():
+                    raise UserWarning(f"Scenario {mode} failed, exit code {process.exitcode}")
+    finally:
+        process.join(POLL)
+        if process.is_alive():
+            process.terminate()
+
+
+@contextlib.contextmanager
+def session_aside(mbs, exchange: str):
+    """
+    BACKTEST_PATH/<exchange>_<SYMBOL> for the synthetic sessions, the collected session there is moved aside
+    and restored on exit
+    """
+    session_root = Path(BACKTEST_PATH, f"{exchange}_{mbs.ex.SYMBOL}")
+    saved = session_root.with_name(f"{session_root.name}.benchmark")
+    if session_root.exists():
+        session_root.replace(saved)
+    try:
+        yield session_root
+    finally:
+        rmtree(session_root, ignore_errors=True)
+        if saved.exists():
+            saved.replace(session_root)
+
+
+def benchmark(mbs, session_root: Path) -> dict:
+    results = {}
+    for name, scenario in SCENARIOS.items():
+        rows = Session(seed=SEED, **scenario).write(session_root)
+        ticks = rows['ticker.parquet']
+        plain = run_scenario(mbs, 'plain')
+        profile = run_scenario(mbs, 'profile')
+        alloc = run_scenario(mbs, 'alloc')
+        replay = plain['replay_s'] or float('inf')
+        results[name] = {
+            'version': mb_ver,
+            'ticks': ticks,
+            'ticks_s': ticks / replay,
+            'delivered_s': plain['delivered'] / replay,
+            'fills_s': plain['fills'] / replay,
+            'rss_mb': plain['rss_mb'],
+            'sections': {
+                section: {
+                    'us_call': profile['sections'][section]['us_call'],
+                    'share': profile['sections'][section]['share'],
+                    'alloc_tick': alloc['sections'][section]['alloc_tick'],
+                } for section in SECTIONS
+            },
+        }
+    return results
+
+
+def report(results: dict, baseline: dict):
+    for name, res in results.items():
+        base = baseline.get(name, {})
+        print(f"*** {name} *** {res['ticks']} ticks, version {res['version']}"
+              f"{', baseline ' + base['version'] if base else ''}")
+        for key in COMPARE:
+            delta = f" ({(res[key] / base[key] - 1) * 100:+.1f}%)" if base.get(key) else ''
+            print(f"{key:>12}: {res[key]:>14.1f}{delta}")
+        print(f"{'delivered_s':>12}: {res['delivered_s']:>14.1f}")
+        print(f"{'section':>20} {'us/call':>10} {'time %':>8} {'alloc B/tick':>14}")
+        for section, v in res['sections'].items():
+            print(f"{section:>20} {v['us_call']:>10.2f} {v['share'] * 100:>8.1f} {v['alloc_tick']:>14.1f}")
+
+
+def main():
+    """
+    python -m martin_binance.backtest.strategy_benchmark <cli_*.py> <exchange> [save]
+    Strategy from cli_*.py runs in MODE 'S' on the synthetic sessions in BACKTEST_PATH/<exchange>_<SYMBOL>,
+    the collected session there is moved aside while benchmark. Needs exchanges-wrapper server same as MODE 'S'.
+    With 'save' the results are stored as baseline for the next compare
+    """
+    if len(sys.argv) < 3:
+        print(main.__doc__)
+        raise SystemExit(1)
+    mbs = load_strategy(sys.argv[1])
+    with session_aside(mbs, sys.argv[2]) as session_root:
+        results = benchmark(mbs, session_root)
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    report(results, baseline)
+    if 'save' in sys.argv[3:]:
+        BASELINE.write_text(json.dumps(results, indent=4))
+        print(f"Baseline saved to {BASELINE}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Files of the multi-host study on the shared disk. Dataset and strategy cli are stored once by content hash
+in blobs/, the study keeps the manifest {name: hash}, so the worker host copies only the changed files
+and can check them after an incomplete sync. Journal of the study is in the same folder, see optimizer.JOURNAL
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+import functools
+import hashlib
+import time
+from pathlib import Path
+from shutil import copyfile
+
+BLOBS = "blobs"
+STATE = "saved_state.json"  # Strategy state at the session start in the session root, trials restore it
+BLOB_TTL = 86400  # sec, unused blob is kept for the worker which is late with the previous study
+
+
+def digest(path: Path) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, functools.partial(hashlib.blake2b, digest_size=16)).hexdigest()
+
+
+def _copy(src: Path, dst: Path):
+    """
+    Readers never see the partial file
+    """
+    tmp = dst.with_name(f"{dst.name}.tmp")
+    copyfile(src, tmp)
+    tmp.replace(dst)
+
+
+def publish(share: Path, files: dict) -> dict[str, str]:
+    """
+    files: {name: local path}
+    :return: manifest {name: hash}, new content is copied to share/blobs
+    """
+    blobs = Path(share, BLOBS)
+    blobs.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for name, path in files.items():
+        key = manifest[name] = digest(path)
+        if not Path(blobs, key).exists():
+            _copy(path, Path(blobs, key))
+    for blob in blobs.iterdir():
+        if blob.name not in manifest.values() and time.time() - blob.stat().st_mtime > BLOB_TTL:
+            blob.unlink(missing_ok=True)
+    return manifest
+
+
+def sync(share: Path, manifest: dict, target: Path) -> bool:
+    """
+    Files of the manifest are copied from share/blobs to target if the local content differs,
+    files of raw/ and the state that are not in the manifest are removed, else trials would start from them
+    :return: False if some blob is missing or is not synced completely yet
+    """
+    for name, key in manifest.items():
+        dst = Path(target, name)
+        if dst.exists() and digest(dst) == key:
+            continue
+        blob = Path(share, BLOBS, key)
+        if not blob.exists() or digest(blob) != key:
+            return False
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        _copy(blob, dst)
+    raw = Path(target, "raw")
+    if raw.exists():
+        [p.unlink() for p in raw.iterdir() if p.is_file() and f"raw/{p.name}" not in manifest]
+    if STATE not in manifest:
+        Path(target, STATE).unlink(missing_ok=True)
+    return True
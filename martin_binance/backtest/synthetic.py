@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synthetic market data in the raw/ session layout, same as collected in MODE 'TC', for load and regression test.
+Price models: gbm, jump (Merton jump-diffusion), regime (switching volatility), revert (Ornstein-Uhlenbeck
+on log price). All are vectorised and reproducible by seed
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+from decimal import Decimal
+from pathlib import Path
+from shutil import make_archive
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import ujson as json
+
+from martin_binance import KLINES_INIT
+from martin_binance.backtest.raw_data import (
+    TICKER_PRKT, TICKER_SCHEMA, ORDER_BOOK_PRKT, ORDER_BOOK_SCHEMA, CANDLE_SCHEMA
+)
+
+YEAR_MS = 365 * 24 * 60 * 60 * 1000
+UNIT_MS = {'m': 60 * 1000, 'h': 60 * 60 * 1000, 'd': 24 * 60 * 60 * 1000}
+START_MS = 1704067200000  # 2024-01-01
+HISTORY = 50  # candles in klines.json, see KLINES_LIM
+STATE_FILE = "saved_state.json"
+
+
+def interval_ms(interval: str) -> int:
+    return int(interval[:-1]) * UNIT_MS[interval[-1]]
+
+
+def gbm(rng: np.random.Generator, ticks: int, price: float, volatility: float, step_ms: int) -> np.ndarray:
+    """
+    Geometric Brownian motion without drift, volatility is annual
+    """
+    sigma = volatility * np.sqrt(step_ms / YEAR_MS)
+    return price * np.exp(np.cumsum(rng.normal(-sigma * sigma / 2, sigma, ticks)))
+
+
+def gbm_steps(rng: np.random.Generator, ticks: int, sigma: float) -> np.ndarray:
+    """
+    Log price increments of martingale GBM, sigma is per step
+    """
+    return rng.normal(-sigma * sigma / 2, sigma, ticks)
+
+
+def jump_steps(
+        rng: np.random.Generator,
+        ticks: int,
+        sigma: float,
+        intensity: float = 0.001,
+        jump_mean: float = 0.0,
+        jump_sigma: float = 0.01
+) -> np.ndarray:
+    """
+    Merton jump-diffusion: GBM plus Poisson number of normal log jumps, intensity is per step.
+    Drift is compensated, so the price stays martingale
+    """
+    count = rng.poisson(intensity, ticks)
+    jumps = count * jump_mean + np.sqrt(count) * jump_sigma * rng.standard_normal(ticks)
+    kappa = np.exp(jump_mean + jump_sigma * jump_sigma / 2) - 1
+    return gbm_steps(rng, ticks, sigma) - intensity * kappa + jumps
+
+
+def regime_steps(
+        rng: np.random.Generator,
+        ticks: int,
+        sigma: float,
+        scales: tuple = (0.5, 1.0, 3.0),
+        duration: int = 3600
+) -> np.ndarray:
+    """
+    GBM with volatility of sigma * scale of the current regime, regime is changed to another random one
+    after exponential duration with mean in steps
+    """
+    lengths = []
+    total = 0
+    while total < ticks:
+        chunk = rng.exponential(duration, max(16, 2 * (ticks - total) // duration)).astype(np.int64) + 1
+        lengths.append(chunk)
+        total += int(chunk.sum())
+    lengths = np.concatenate(lengths)
+    # Next regime is other than current: shift by 1..n-1 modulo n
+    regimes = np.cumsum(rng.integers(1, len(scales), len(lengths))) % len(scales) if len(scales) > 1 \
+        else np.zeros(len(lengths), dtype=np.int64)
+    sigmas = np.repeat(sigma * np.asarray(scales)[regimes], lengths)[:ticks]
+    return rng.normal(0, 1, ticks) * sigmas - sigmas * sigmas / 2
+
+
+def revert_steps(
+        rng: np.random.Generator,
+        ticks: int,
+        sigma: float,
+        half_life: int = 3600,
+        deviation: float = 0.0
+) -> np.ndarray:
+    """
+    Ornstein-Uhlenbeck on log price, half_life in steps, deviation is log offset of the start price from the mean.
+    Exact AR(1) recursion y[n] = a * y[n-1] + e[n] is solved in blocks as a^k * (y0 + cumsum(e[j] / a^j)),
+    block is short enough to keep a^-k in float range
+    """
+    a = 0.5 ** (1 / half_life)
+    noise = rng.normal(0, sigma, ticks)
+    block = max(1, min(ticks, int(30 / -np.log(a))))
+    powers = a ** np.arange(1, block + 1)
+    levels = np.empty(ticks + 1)
+    levels[0] = deviation
+    for start in range(0, ticks, block):
+        e = noise[start:start + block]
+        p = powers[:len(e)]
+        levels[start + 1:start + 1 + len(e)] = p * (levels[start] + np.cumsum(e / p))
+    return np.diff(levels)
+
+
+MODELS = {'gbm': gbm_steps, 'jump': jump_steps, 'regime': regime_steps, 'revert': revert_steps}
+
+
+def to_str(values: np.ndarray, decimals: int) -> list[str]:
+    return [f"{x:.{decimals}f}" for x in values]
+
+
+def to_str_array(values: np.ndarray, decimals: int) -> pa.Array:
+    """
+    Same as to_str for non-negative values by Arrow compute: integer in the last digit units with decimal point
+    """
+    units = pa.array(np.round(values * 10 ** decimals).astype(np.int64)).cast(pa.string())
+    if not decimals:
+        return units
+    units = pc.utf8_lpad(units, decimals + 1, '0')
+    return pc.binary_join_element_wise(
+        pc.utf8_slice_codeunits(units, 0, -decimals), pc.utf8_slice_codeunits(units, -decimals), '.'
+    )
+
+
+def state_price(state: dict) -> float | None:
+    """
+    Start price for the saved strategy state: between the nearest buy and sell of grid and take profit orders
+    """
+    orders = json.loads(state.get('orders', '[]'))
+    if tp_order := eval(json.loads(state.get('tp_order', '"()"'))):
+        orders.append({'buy': tp_order[0], 'price': tp_order[2]})
+    buy = [float(o['price']) for o in orders if o['buy']]
+    sell = [float(o['price']) for o in orders if not o['buy']]
+    if buy and sell:
+        return (max(buy) + min(sell)) / 2
+    return max(buy) if buy else (min(sell) if sell else None)
+
+
+class Session:
+    """
+    Synthetic session: ticks every step_ms by price model, top of the order book at one tick_size around the price,
+    closed candles for each of KLINES_INIT and candles history before the start.
+    model_params are passed to the model function, see MODELS
+    """
+    __slots__ = (
+        "rng", "ticks", "price", "volatility", "step_ms", "tick_size", "decimals", "start_ms", "model", "model_params"
+    )
+
+    def __init__(
+            self,
+            ticks: int,
+            price: float = 30000.0,
+            volatility: float = 0.5,
+            step_ms: int = 1000,
+            tick_size: str = '0.01',
+            seed: int = 0,
+            model: str = 'gbm',
+            **model_params
+    ):
+        if model not in MODELS:
+            raise UserWarning(f"Unknown price model {model}, use one of: {', '.join(MODELS)}")
+        self.rng = np.random.default_rng(seed)
+        self.ticks = ticks
+        self.price = price
+        self.volatility = volatility
+        self.step_ms = step_ms
+        self.tick_size = float(tick_size)
+        self.decimals = max(0, -Decimal(tick_size).normalize().as_tuple().exponent)
+        self.start_ms = START_MS
+        self.model = MODELS[model]
+        self.model_params = model_params
+
+    def prices(self) -> np.ndarray:
+        sigma = self.volatility * np.sqrt(self.step_ms / YEAR_MS)
+        prices = self.price * np.exp(np.cumsum(self.model(self.rng, self.ticks, sigma, **self.model_params)))
+        return np.maximum(np.round(prices / self.tick_size), 1) * self.tick_size
+
+    def write(self, session_root: Path, state: dict = None, backup: bool = False) -> dict:
+        """
+        Write session_root/raw/*, existing files are replaced. With backup also raw_bak.zip, it takes the most time.
+        state is the strategy state as saved in MODE 'TC', it is written to saved_state.json and the replay
+        continues it. Without state the strategy starts from scratch, stale saved_state.json is removed.
+        For a state set price near its orders, see state_price()
+        :return: {file name: rows}
+        """
+        raw_path = Path(session_root, "raw")
+        raw_path.mkdir(parents=True, exist_ok=True)
+        keys = self.start_ms + np.arange(1, self.ticks + 1, dtype=np.int64) * self.step_ms
+        prices = self.prices()
+        last = to_str_array(prices, self.decimals)
+        res = {}
+        _write(Path(raw_path, TICKER_PRKT), TICKER_SCHEMA, {
+            "key": keys,
+            "openPrice": pa.repeat(last[0], self.ticks),
+            "lastPrice": last,
+            "closeTime": keys,
+            "Qty": pa.repeat("0", self.ticks),
+            "delay": np.full(self.ticks, 0.5),
+        })
+        res[TICKER_PRKT] = self.ticks
+        qty = to_str_array(self.rng.uniform(0.01, 2, self.ticks), 5)
+        _write(Path(raw_path, ORDER_BOOK_PRKT), ORDER_BOOK_SCHEMA, {
+            "key": keys,
+            "bid_price": to_str_array(np.maximum(prices - self.tick_size, 0), self.decimals),
+            "bid_qty": qty,
+            "ask_price": last,
+            "ask_qty": qty,
+        })
+        res[ORDER_BOOK_PRKT] = self.ticks
+        klines = {}
+        for i in KLINES_INIT:
+            candles = self.candles(keys, prices, interval_ms(i.value))
+            _write(Path(raw_path, f"candles_{i.value}.parquet"), CANDLE_SCHEMA, candles)
+            res[f"candles_{i.value}.parquet"] = len(candles["key"])
+            klines[i.value] = self.history(interval_ms(i.value), prices[0])
+        with open(Path(raw_path, "klines.json"), 'w') as f:
+            json.dump(klines, f)
+        state_file = Path(session_root, STATE_FILE)
+        if state:
+            state = state | {'ms_start_time_ms': json.dumps(int(self.start_ms))}
+            with state_file.open(mode='w') as f:
+                json.dump(state, f, sort_keys=True, indent=4, ensure_ascii=False)
+            res[STATE_FILE] = 1
+        else:
+            state_file.unlink(missing_ok=True)
+        if backup:
+            make_archive(str(Path(session_root, "raw_bak")), 'zip', session_root, 'raw')
+        return res
+
+    def candles(self, keys: np.ndarray, prices: np.ndarray, _interval_ms: int) -> dict:
+        """
+        OHLCV of each closed candle, key is close time as the candle is received at close
+        """
+        bucket = keys // _interval_ms
+        bounds = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        starts = bounds[:-1]  # The last candle is not closed
+        last = bounds[1:] - 1
+        volume = self.rng.uniform(1, 100, len(starts))
+        close = prices[last]
+        open_time = bucket[starts] * _interval_ms
+        return {
+            "key": keys[last],
+            "open_time": open_time,
+            "open": prices[starts],
+            "high": np.maximum.reduceat(prices, bounds)[:-1],
+            "low": np.minimum.reduceat(prices, bounds)[:-1],
+            "close": close,
+            "volume": volume,
+            "close_time": open_time + _interval_ms - 1,
+            "quote_volume": volume * close,
+            "trades": self.rng.integers(10, 1000, len(starts)),
+        }
+
+    def history(self, _interval_ms: int, price: float) -> list[list]:
+        """
+        HISTORY candles before the start in exchange kline format, the last close is price
+        """
+        closes = gbm(self.rng, HISTORY, price, self.volatility, _interval_ms)
+        closes *= price / closes[-1]
+        opens = np.r_[closes[0], closes[:-1]]
+        spread = self.rng.uniform(0, self.volatility * np.sqrt(_interval_ms / YEAR_MS), HISTORY)
+        high = np.maximum(opens, closes) * (1 + spread)
+        low = np.minimum(opens, closes) * (1 - spread)
+        volume = self.rng.uniform(1, 100, HISTORY)
+        open_time = (self.start_ms // _interval_ms - HISTORY + np.arange(HISTORY)) * _interval_ms
+        return [
+            [int(t), *to_str((o, h, lo, c, v), self.decimals), int(t) + _interval_ms - 1,
+             f"{v * c:.{self.decimals}f}", int(n), "0", "0", "0"]
+            for t, o, h, lo, c, v, n in zip(
+                open_time, opens, high, low, closes, volume, self.rng.integers(10, 1000, HISTORY)
+            )
+        ]
+
+
+def _write(path: Path, schema: pa.Schema, columns: dict):
+    pq.write_table(pa.Table.from_pydict(columns, schema=schema), path)
+
+
+def load_state(path: Path) -> dict:
+    """
+    Strategy state from saved_state.json of the collected session
+    """
+    with open(path) as f:
+        return json.load(f)
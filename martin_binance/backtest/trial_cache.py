@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent results of optimizer trials. Key is the canonical parameters of trial with fingerprint
+of the dataset, strategy cli and martin-binance version, so the repeated point of the study costs nothing.
+SQLite in WAL mode, shared by the pool workers, entries older than CACHE_TTL are dropped on open
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+import hashlib
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+import ujson as json
+
+from martin_binance import BACKTEST_PATH, __version__ as mb_ver
+
+CACHE_FILE = Path(BACKTEST_PATH, "trial_cache.db")
+CACHE_TTL = 30 * 86400  # sec
+CACHE_TIMEOUT = 600  # sec of waiting for the write lock
+
+
+def fingerprint(*paths) -> str:
+    """
+    Content hash of files, folder is taken as its files sorted by relative name. Missing path counts by name only
+    """
+    digest = hashlib.blake2b(mb_ver.encode(), digest_size=16)
+    for path in map(Path, paths):
+        files = sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path]
+        for file in files:
+            digest.update(str(file.relative_to(path) if path.is_dir() else file.name).encode())
+            if file.exists():
+                with open(file, 'rb') as f:
+                    digest.update(hashlib.file_digest(f, 'blake2b').digest())
+    return digest.hexdigest()
+
+
+def canonical(params: dict) -> str:
+    """
+    Same point of the study gives the same string: sorted keys, float without step artefacts as 0.30000000000000004
+    """
+    return json.dumps(
+        {k: f"{v:.6f}".rstrip('0').rstrip('.') if isinstance(v, float) else v for k, v in sorted(params.items())}
+    )
+
+
+class TrialCache:
+    """
+    get(params) -> session result | None, put(params, session result)
+    Connection is opened per process, the cache made before fork is used by the pool workers as well
+    """
+    __slots__ = ("path", "salt", "_conn", "_pid")
+
+    def __init__(self, salt: str, path: Path = CACHE_FILE):
+        self.path = path
+        self.salt = salt  # fingerprint() of dataset and strategy
+        self._conn = None
+        self._pid = None
+        with self.conn as conn:
+            conn.execute("DELETE FROM results WHERE ts < ?", (time.time() - CACHE_TTL,))
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=CACHE_TIMEOUT)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result TEXT, ts REAL)")
+            self._pid = os.getpid()
+        return self._conn
+
+    def key(self, params: dict) -> str:
+        return hashlib.blake2b(f"{self.salt}{canonical(params)}".encode(), digest_size=16).hexdigest()
+
+    def get(self, params: dict) -> dict | None:
+        row = self.conn.execute("SELECT result FROM results WHERE key = ?", (self.key(params),)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, params: dict, result: dict):
+        with self.conn as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?)", (self.key(params), json.dumps(result), time.time())
+            )
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = self._pid = None
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Virtual clock for discrete-event replay of collected data in simulate mode
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+import asyncio
+import heapq
+from datetime import datetime, timezone
+from functools import partial
+
+
+class VirtualClock:
+    """
+    Simulated time source. Nothing really sleeps: every sleeper and scheduled job is a timer
+    in the heap, and the owner advances time by firing timers in (deadline, sequence) order.
+    Time is in seconds, same as time.time()
+    """
+    __slots__ = ("now", "timers", "seq", "sleepers", "feeds")
+
+    def __init__(self, now: float):
+        self.now = now
+        self.timers = []  # heap of (deadline, seq, asyncio.Future | callable)
+        self.seq = 0
+        self.sleepers = {}  # {task: asyncio.Future} of the tasks that are waiting for the clock
+        self.feeds = set()  # Timers of the market data streams, they don't depend on the ticker
+
+    def call_at(self, when: float, item) -> None:
+        self.seq += 1
+        heapq.heappush(self.timers, (max(when, self.now), self.seq, item))
+
+    async def sleep_until(self, when: float, feed=False) -> None:
+        fut = asyncio.get_running_loop().create_future()
+        self.call_at(when, fut)
+        if feed:
+            self.feeds.add(fut)
+        task = asyncio.current_task()
+        self.sleepers[task] = fut
+        try:
+            await fut
+        finally:
+            self.sleepers.pop(task, None)
+            self.feeds.discard(fut)
+
+    async def sleep(self, delay: float) -> None:
+        await self.sleep_until(self.now + max(delay, 0))
+
+    def horizon(self) -> float:
+        """
+        Deadline of the earliest timer, except market data feeds
+        """
+        return min((when for when, _, item in self.timers if item not in self.feeds), default=float('inf'))
+
+    def step(self):
+        """
+        Fire the earliest timer and move time to its deadline
+        :return: result of the fired job (maybe coroutine) or None, raise IndexError if no timers
+        """
+        when, _, item = heapq.heappop(self.timers)
+        self.now = max(self.now, when)
+        if isinstance(item, asyncio.Future):
+            if not item.done():
+                item.set_result(None)
+            # Woken task is runnable, not waiting, until it runs, else settle() would step the clock past it
+            for task, fut in self.sleepers.items():
+                if fut is item:
+                    del self.sleepers[task]
+                    break
+            return None
+        return item()
+
+    def discard(self, owner) -> None:
+        """
+        Remove scheduled jobs of the owner, i.e. the strategy that is done on the clock shared with others
+        """
+        self.timers = [
+            t for t in self.timers
+            if not (isinstance(t[2], partial) and getattr(t[2].args[0], '__self__', None) is owner)
+        ]
+        heapq.heapify(self.timers)
+
+    def add_jobs(self, jobs) -> None:
+        """
+        Run apscheduler jobs on the virtual time instead of the wall clock
+        """
+        funcs = {}
+        for job in jobs:
+            funcs.setdefault(job.func, job.trigger)  # The same job may be added on each strategy reset
+        for func, trigger in funcs.items():
+            if (fire_time := self._next_fire_time(trigger, None)) is not None:
+                self.call_at(fire_time, partial(self._run_job, func, trigger, fire_time))
+
+    def _run_job(self, func, trigger, fire_time: float):
+        if (next_fire_time := self._next_fire_time(trigger, fire_time)) is not None:
+            self.call_at(next_fire_time, partial(self._run_job, func, trigger, next_fire_time))
+        return func()
+
+    def _next_fire_time(self, trigger, previous: float | None) -> float | None:
+        if interval := getattr(trigger, 'interval_length', None):
+            # IntervalTrigger start_date is bound to the wall clock, use interval only
+            return (previous or self.now) + interval
+        now = datetime.fromtimestamp(self.now, timezone.utc)
+        prev = datetime.fromtimestamp(previous, timezone.utc) if previous is not None else None
+        next_fire_time = trigger.get_next_fire_time(prev, now)
+        return next_fire_time.timestamp() if next_fire_time else None
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Walk-forward test of the strategy parameters on the sequence of archived sessions (raw_bak.zip).
+Parameters are optimized on the train window of sessions and evaluated on the next test window, then
+the windows roll forward by test size. Sessions are replayed straight from the archives, without extracting
+"""
+__author__ = "Jerry Fedorenko"
+__copyright__ = "Copyright © 2026 Jerry Fedorenko aka VM"
+__license__ = "MIT"
+__version__ = "3.1.9"
+__maintainer__ = "Jerry Fedorenko"
+__contact__ = "https://github.com/DogsTailFarmer"
+
+import statistics
+import sys
+from pathlib import Path
+
+import optuna
+import ujson as json
+
+from martin_binance import BACKTEST_PATH
+from martin_binance.backtest.optimizer import (
+    load_strategy, notify_exception, session_value, strategy_cache, suggest, trade_result, trial_params
+)
+
+
+def sessions(paths: list) -> list[Path]:
+    """
+    Archive files in given order, folder is expanded to its *.zip sorted by name (time of archive)
+    """
+    res = []
+    for path in map(Path, paths):
+        res.extend(sorted(path.glob("*.zip")) if path.is_dir() else [path])
+    return res
+
+
+def windows(count: int, train: int, test: int) -> list[tuple[range, range]]:
+    return [
+        (range(start, start + train), range(start + train, start + train + test))
+        for start in range(0, count - train - test + 1, test)
+    ]
+
+
+def evaluate(mbs, sources: list[Path], skip_log: bool, params: dict, caches: dict = None) -> list[float]:
+    """
+    caches: {source: TrialCache}, the session overlapped by train windows is replayed once for the same parameters
+    """
+    res = []
+    for source in sources:
+        cache = (caches or {}).get(source)
+        if cache is None or (result := cache.get(params)) is None:
+            result = trade_result(mbs, skip_log, source=source, **params)
+            if cache:
+                cache.put(params, result)
+        res.append(session_value(result))
+    return res
+
+
+def walk_forward(mbs, paths: list, train: int, test: int, n_trials: int, skip_log=True) -> dict:
+    """
+    :return: {'windows': [result of each window], 'summary': {...}}
+    is - in-sample best value of train, oos - out-of-sample value of best parameters on test,
+    base - value of the cli parameters on test. Values are averaged per session
+    """
+    sys.excepthook = notify_exception
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    param_defs, _ = trial_params()  # Trial value is averaged over sessions, study settings are not used
+    _sessions = sessions(paths)
+    _windows = windows(len(_sessions), train, test)
+    if not _windows:
+        raise UserWarning(f"Need at least {train + test} sessions, found {len(_sessions)}")
+    caches = {source: strategy_cache(mbs, source) for source in _sessions}
+    res = []
+    for train_idx, test_idx in _windows:
+        train_set = [_sessions[i] for i in train_idx]
+        test_set = [_sessions[i] for i in test_idx]
+
+        def objective(_trial):
+            return statistics.fmean(evaluate(mbs, train_set, skip_log, suggest(_trial, param_defs), caches))
+
+        study = optuna.create_study(direction="maximize")
+        study.optimize(objective, n_trials=n_trials, gc_after_trial=True)
+        res.append({
+            'train': [path.name for path in train_set],
+            'test': [path.name for path in test_set],
+            'params': study.best_params,
+            'is': study.best_value,
+            'oos': statistics.fmean(evaluate(mbs, test_set, skip_log, study.best_params, caches)),
+            'base': statistics.fmean(evaluate(mbs, test_set, skip_log, {}, caches)),
+        })
+    [cache.close() for cache in caches.values() if cache]
+    return {'windows': res, 'summary': summary(res)}
+
+
+def summary(res: list[dict]) -> dict:
+    """
+    efficiency - out-of-sample to in-sample ratio, near 1 for robust parameters.
+    params - median of the best parameters over windows, candidate for the robust choice,
+    spread - their relative range, high value means the optimum is not stable in time
+    """
+    is_mean = statistics.fmean(w['is'] for w in res)
+    oos_mean = statistics.fmean(w['oos'] for w in res)
+    params = {}
+    spread = {}
+    for key in res[0]['params']:
+        values = [w['params'][key] for w in res]
+        median = statistics.median(values)
+        params[key] = round(median) if all(isinstance(v, int) for v in values) else median
+        spread[key] = (max(values) - min(values)) / abs(median) if median else 0.0
+    return {
+        'is': is_mean,
+        'oos': oos_mean,
+        'base': statistics.fmean(w['base'] for w in res),
+        'oos_positive': sum(w['oos'] > 0 for w in res) / len(res),
+        'efficiency': oos_mean / is_mean if is_mean else 0.0,
+        'params': params,
+        'spread': spread,
+    }
+
+
+def report(res: dict):
+    print(f"{'window':>6} {'train':>24} {'test':>24} {'is':>12} {'oos':>12} {'base':>12}")
+    for i, w in enumerate(res['windows']):
+        print(f"{i:>6} {w['train'][0][:24]:>24} {w['test'][0][:24]:>24} {w['is']:>12.4f} {w['oos']:>12.4f}"
+              f" {w['base']:>12.4f}")
+    s = res['summary']
+    print(f"Mean in-sample: {s['is']:.4f}, out-of-sample: {s['oos']:.4f}, base: {s['base']:.4f}")
+    print(f"Walk-forward efficiency: {s['efficiency']:.2f}, positive out-of-sample windows: {s['oos_positive']:.0%}")
+    print(f"Robust parameters (median): {s['params']}")
+    print(f"Relative spread: { {k: round(v, 3) for k, v in s['spread'].items()} }")
+
+
+def main():
+    """
+    python -m martin_binance.backtest.walk_forward <cli_*.py> <train> <test> <n_trials> <session.zip | folder> ...
+    Sessions are in the given order, folder (ARCHIVE_PATH/<exchange>_<SYMBOL>) is taken as its *.zip by name.
+    Needs exchanges-wrapper server same as MODE 'S'. Result is saved to BACKTEST_PATH/walk_forward_<SYMBOL>.json
+    """
+    if len(sys.argv) < 6:
+        print(main.__doc__)
+        raise SystemExit(1)
+    mbs = load_strategy(sys.argv[1])
+    res = walk_forward(mbs, sys.argv[5:], int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4]))
+    report(res)
+    out = Path(BACKTEST_PATH, f"walk_forward_{mbs.ex.SYMBOL}.json")
+    out.write_text(json.dumps(res, indent=4))
+    print(f"Result saved to {out}")
+
+
+if __name__ == '__main__':
+    main()
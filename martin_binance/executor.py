@@ -4,7 +4,7 @@ Cyclic grid strategy based on martingale
 __author__ = "Jerry Fedorenko"
 __copyright__ = "Copyright © 2021-2025 Jerry Fedorenko aka VM"
 __license__ = "MIT"
-__version__ = "3.1.7"
+__version__ = "3.1.9"
 __maintainer__ = "Jerry Fedorenko"
 __contact__ = 'https://github.com/DogsTailFarmer'
 ##################################################################
@@ -35,9 +35,8 @@ from martin_binance.strategy_base import StrategyBase, __version__ as msb_ver
 from martin_binance.lib import (
     Ticker, FundsEntry, OrderBook, Style, any2str, Order, OrderUpdate, Orders, f2d, solve, tasks_manage
 )
-from martin_binance.params import *  # NOSONAR python:S2208
+from martin_binance.params import Params
 
-scheduler = AsyncIOScheduler()
 logging.getLogger("apscheduler.executors.default").setLevel(logging.CRITICAL)
 
 O_DEC = Decimal()
@@ -58,12 +57,13 @@ def malloc_trim(trim_type: int = 0):
 
 
 class Strategy(StrategyBase):
-    def __init__(self, call_super=True):
+    def __init__(self, params: Params = None, call_super=True):
         if call_super:
-            super().__init__()
-        if LOGGING:
-            print(f"Init Strategy, ver: {HEAD_VERSION} + {__version__} + {msb_ver}")
-        self.cycle_buy = not START_ON_BUY if REVERSE else START_ON_BUY  # + Direction (Buy/Sell) for current cycle
+            super().__init__(params)
+        if self.prm.LOGGING:
+            print(f"Init Strategy, ver: {self.prm.HEAD_VERSION} + {__version__} + {msb_ver}")
+        # + Direction (Buy/Sell) for current cycle
+        self.cycle_buy = not self.prm.START_ON_BUY if self.prm.REVERSE else self.prm.START_ON_BUY
         self.orders_grid = Orders()  # + List of grid orders
         self.orders_init = Orders()  # - List of initial grid orders
         self.orders_hold = Orders()  # + List of grid orders for later place
@@ -89,8 +89,8 @@ class Strategy(StrategyBase):
         self.sum_amount_second = O_DEC  # Sum buy/sell in second currency for current cycle
         self.part_amount = {}  # + {order_id: (Decimal(str(amount_f)), Decimal(str(amount_s)))} of partially filled
         #
-        self.deposit_first = AMOUNT_FIRST  # + Calculated operational deposit
-        self.deposit_second = AMOUNT_SECOND  # + Calculated operational deposit
+        self.deposit_first = self.prm.AMOUNT_FIRST  # + Calculated operational deposit
+        self.deposit_second = self.prm.AMOUNT_SECOND  # + Calculated operational deposit
         self.sum_profit_first = O_DEC  # + Sum profit from start
         self.sum_profit_second = O_DEC  # + Sum profit from start
         self.cycle_buy_count = 0  # + Count for buy cycle
@@ -125,13 +125,15 @@ class Strategy(StrategyBase):
         self.pr_db = None  # - Process for save data to .db
         self.profit_first = O_DEC  # + Cycle profit
         self.profit_second = O_DEC  # + Cycle profit
-        self.queue_to_db = asyncio.Queue() if MODE != 'S' else None  # - Queue for save data to .db
+        self.queue_to_db = asyncio.Queue() if self.prm.MODE != 'S' else None  # - Queue for save data to .db
         self.restart = None  # - Set after execute take profit order and restart cycle
-        self.reverse = REVERSE  # + Current cycle is Reverse
+        self.reverse = self.prm.REVERSE  # + Current cycle is Reverse
         self.reverse_hold = False  # + Exist unreleased reverse state
-        self.reverse_init_amount = REVERSE_INIT_AMOUNT if REVERSE else O_DEC  # + Actual amount of initial cycle
+        # + Actual amount of initial cycle
+        self.reverse_init_amount = self.prm.REVERSE_INIT_AMOUNT if self.prm.REVERSE else O_DEC
         self.reverse_price = None  # + Price when execute last grid order and hold reverse cycle
-        self.reverse_target_amount = REVERSE_TARGET_AMOUNT if REVERSE else O_DEC  # + Amount for reverse cycle
+        # + Amount for reverse cycle
+        self.reverse_target_amount = self.prm.REVERSE_TARGET_AMOUNT if self.prm.REVERSE else O_DEC
         self.restore_orders = False  # + Flag when was filled grid order during grid cancellation
         self.round_base = '1.0123456789'  # - Round pattern for 0.00000 = 0.00
         self.round_quote = '1.0123456789'  # - Round pattern for 0.00000 = 0.00
@@ -145,26 +147,27 @@ class Strategy(StrategyBase):
         self.adx_di_avg_delta = []  # -
         self.trade_control_is_waiting_state = False  # -
         #
-        scheduler.add_job(self.event_grid_update, "interval",  minutes=5)
-        scheduler.add_job(self.event_processing, "interval",  seconds=5)
-        scheduler.add_job(self.event_update_tp, 'cron', minute='*', second='15')
-        scheduler.add_job(self.event_exec_command, "interval",  seconds=2)
-        if not GRID_ONLY:
-            scheduler.add_job(self.event_di, 'cron', minute='*', second='25')
-        if MODE in ('T', 'TC'):
-            scheduler.add_job(self.event_export_operational_status, 'cron', minute='*', second='35')
-            scheduler.add_job(self.event_get_external_command, "interval", seconds=30)
-            scheduler.add_job(self.event_report, "interval", seconds=6)
-            if GRID_ONLY:
-                scheduler.add_job(self.event_grid_only_release, 'cron', minute='*', second='45')
+        self.scheduler = AsyncIOScheduler()
+        self.scheduler.add_job(self.event_grid_update, "interval",  minutes=5)
+        self.scheduler.add_job(self.event_processing, "interval",  seconds=5)
+        self.scheduler.add_job(self.event_update_tp, 'cron', minute='*', second='15')
+        self.scheduler.add_job(self.event_exec_command, "interval",  seconds=2)
+        if not self.prm.GRID_ONLY:
+            self.scheduler.add_job(self.event_di, 'cron', minute='*', second='25')
+        if self.prm.MODE in ('T', 'TC'):
+            self.scheduler.add_job(self.event_export_operational_status, 'cron', minute='*', second='35')
+            self.scheduler.add_job(self.event_get_external_command, "interval", seconds=30)
+            self.scheduler.add_job(self.event_report, "interval", seconds=6)
+            if self.prm.GRID_ONLY:
+                self.scheduler.add_job(self.event_grid_only_release, 'cron', minute='*', second='45')
 
     async def init(self, check_funds=True) -> None:
         self.message_log('Start Init section')
-        if COLLECT_ASSETS and GRID_ONLY:
+        if self.prm.COLLECT_ASSETS and self.prm.GRID_ONLY:
             init_params_error = 'COLLECT_ASSETS and GRID_ONLY: one only allowed'
-        elif PROFIT_MAX and PROFIT_MAX < PROFIT + FEE_TAKER:
+        elif self.prm.PROFIT_MAX and self.prm.PROFIT_MAX < self.prm.PROFIT + self.prm.FEE_TAKER:
             init_params_error = 'PROFIT_MAX'
-        elif USE_ALL_FUND and START_ON_BUY and AMOUNT_FIRST:
+        elif self.prm.USE_ALL_FUND and self.prm.START_ON_BUY and self.prm.AMOUNT_FIRST:
             init_params_error = 'USE_ALL_FUND and (AMOUNT_FIRST and START_ON_BUY): one only allowed'
         else:
             init_params_error = None
@@ -174,53 +177,53 @@ class Strategy(StrategyBase):
         tcm = self.get_trading_capability_manager()
         self.f_currency = self.get_first_currency()
         self.s_currency = self.get_second_currency()
-        self.tlg_header = f"{EXCHANGE[ID_EXCHANGE]}, {self.f_currency}/{self.s_currency}"
+        self.tlg_header = f"{self.prm.EXCHANGE[self.prm.ID_EXCHANGE]}, {self.f_currency}/{self.s_currency}"
         self.message_log(f"{self.tlg_header}", color=Style.B_WHITE)
-        if MODE == 'S':
+        if self.prm.MODE == 'S':
             self.profit_first = self.profit_second = O_DEC
             self.sum_profit_first = self.sum_profit_second = O_DEC
             self.part_profit_first = self.part_profit_second = O_DEC
         else:
             await self.start_process()
-            if not GRID_ONLY_EXIT:
-                await db_management(EXCHANGE)
+            if not self.prm.GRID_ONLY_EXIT:
+                await db_management(self.prm.EXCHANGE)
         self.status_time = int(self.get_time())
-        self.over_price = OVER_PRICE
-        self.order_q = self.order_q_limit = ORDER_Q
-        self.martin = (MARTIN + 100) / 100
+        self.over_price = self.prm.OVER_PRICE
+        self.order_q = self.order_q_limit = self.prm.ORDER_Q
+        self.martin = (self.prm.MARTIN + 100) / 100
         if not check_funds:
             self.first_run = False
-        if GRID_ONLY:
+        if self.prm.GRID_ONLY:
             self.message_log(f"Mode for {'Buy' if self.cycle_buy else 'Sell'} {self.f_currency} by grid orders"
                              f" placement ON",
                              color=Style.B_WHITE)
 
-        mode_message, mode_color = get_mode_details(MODE)
+        mode_message, mode_color = get_mode_details(self.prm.MODE)
         self.message_log(f"This is {mode_message} mode", color=mode_color)
 
-        if MODE == 'TC' and SELF_OPTIMIZATION:
+        if self.prm.MODE == 'TC' and self.prm.SELF_OPTIMIZATION:
             self.message_log("Auto update parameters mode!", log_level=logging.WARNING, color=Style.B_RED)
         # Calculate round float multiplier
-        self.round_base = ROUND_BASE or str(tcm.round_amount(f2d(1.123456789), ROUND_FLOOR))
-        self.round_quote = ROUND_QUOTE or str(Decimal(self.round_base) *
+        self.round_base = self.prm.ROUND_BASE or str(tcm.round_amount(f2d(1.123456789), ROUND_FLOOR))
+        self.round_quote = self.prm.ROUND_QUOTE or str(Decimal(self.round_base) *
                                               Decimal(str(tcm.round_price(f2d(1.123456789), ROUND_FLOOR))))
         self.message_log(f"Round pattern, for base: {self.round_base}, quote: {self.round_quote}")
         if last_price := self.get_buffered_ticker().last_price:
             self.message_log(f"Last ticker price: {last_price}")
             self.avg_rate = last_price
 
-            if not self.started_balance_detail and MODE in ('T', 'TC') and not GRID_ONLY:
+            if not self.started_balance_detail and self.prm.MODE in ('T', 'TC') and not self.prm.GRID_ONLY:
                 self.started_balance_detail = self.get_free_assets()[:2] + (self.avg_rate,)
 
             if self.first_run and check_funds:
                 if self.cycle_buy:
                     ds = self.get_buffered_funds().get(self.s_currency, O_DEC)
                     ds = ds.available if ds else O_DEC
-                    if USE_ALL_FUND:
+                    if self.prm.USE_ALL_FUND:
                         self.deposit_second = self.round_truncate(ds, base=False)
-                    elif START_ON_BUY and AMOUNT_FIRST:
-                        self.message_log(f"Keep {self.f_currency} level at {AMOUNT_FIRST}"
-                                         f" by {AMOUNT_SECOND} {self.s_currency} tranche",
+                    elif self.prm.START_ON_BUY and self.prm.AMOUNT_FIRST:
+                        self.message_log(f"Keep {self.f_currency} level at {self.prm.AMOUNT_FIRST}"
+                                         f" by {self.prm.AMOUNT_SECOND} {self.s_currency} tranche",
                                          color=Style.B_WHITE)
                     elif self.deposit_second > ds:
                         self.message_log('Not enough second coin for Buy cycle!', color=Style.B_RED)
@@ -228,7 +231,7 @@ class Strategy(StrategyBase):
                 else:
                     df = self.get_buffered_funds().get(self.f_currency, O_DEC)
                     df = df.available if df else O_DEC
-                    if USE_ALL_FUND:
+                    if self.prm.USE_ALL_FUND:
                         self.deposit_first = self.round_truncate(df, base=True)
                     elif self.deposit_first > df:
                         self.message_log('Not enough first coin for Sell cycle!', color=Style.B_RED)
@@ -287,11 +290,14 @@ class Strategy(StrategyBase):
         }
 
     def scheduler_start(self):
-        scheduler.start()
+        if self.clock:
+            self.clock.add_jobs(self.scheduler.get_jobs())
+        else:
+            self.scheduler.start()
 
     def scheduler_stop(self):
-        if scheduler.running:
-            scheduler.shutdown()
+        if self.scheduler.running:
+            self.scheduler.shutdown()
 
     async def event_export_operational_status(self):
         ts = self.get_time()
@@ -299,8 +305,8 @@ class Strategy(StrategyBase):
             self.wss_fire_up = True
             self.message_log("WSS timeout, sending restart request", log_level=logging.DEBUG)
 
-        has_grid_hold_timeout = ts - self.grid_hold.get('timestamp', ts) > HOLD_TP_ORDER_TIMEOUT
-        has_tp_order_hold_timeout = ts - self.tp_order_hold.get('timestamp', ts) > HOLD_TP_ORDER_TIMEOUT
+        has_grid_hold_timeout = ts - self.grid_hold.get('timestamp', ts) > self.prm.HOLD_TP_ORDER_TIMEOUT
+        has_tp_order_hold_timeout = ts - self.tp_order_hold.get('timestamp', ts) > self.prm.HOLD_TP_ORDER_TIMEOUT
 
         if self.stable_state(alarm_mode=True) or has_grid_hold_timeout or has_tp_order_hold_timeout:
             orders = self.get_buffered_open_orders()
@@ -312,7 +318,7 @@ class Strategy(StrategyBase):
                 self.cycle_status = cycle_status
                 await self.queue_to_db.put(
                     {
-                        'ID_EXCHANGE': ID_EXCHANGE,
+                        'ID_EXCHANGE': self.prm.ID_EXCHANGE,
                         'f_currency': self.f_currency,
                         's_currency': self.s_currency,
                         'cycle_buy': self.cycle_buy,
@@ -369,17 +375,17 @@ class Strategy(StrategyBase):
         diff_sum = 0.0
         for tf in KLINES_INIT:
             try:
-                adx_data = self.adx(tf.value, TC_ADX_DATA_LIMIT, TC_ADX_PERIOD)
+                adx_data = self.adx(tf.value, self.prm.TC_ADX_DATA_LIMIT, self.prm.TC_ADX_PERIOD)
             except (ZeroDivisionError, statistics.StatisticsError) as e:
                 self.message_log(f"No data for ADX analysis on {tf.name} timeframe, {e}", log_level=logging.DEBUG)
                 continue
             else:
-                k = TC_K.get(tf.value, 0.0)
+                k = self.prm.TC_K.get(tf.value, 0.0)
                 k_sum += k
                 diff_sum += k * (adx_data['+DI'] - adx_data['-DI'])
         if k_sum:
             self.adx_di_avg_delta.append(diff_sum / k_sum)
-            self.adx_di_avg_delta = self.adx_di_avg_delta[-TC_ADX_DATA_LIMIT:]
+            self.adx_di_avg_delta = self.adx_di_avg_delta[-self.prm.TC_ADX_DATA_LIMIT:]
 
     async def event_exec_command(self):
         if self.command == 'stopped' and type(self.start_collect) is int:
@@ -394,7 +400,9 @@ class Strategy(StrategyBase):
             os.execv(sys.executable, [sys.executable] + [sys.argv[0]] + ['1'])
 
     async def event_report(self):  # NOSONAR S7503
-        is_time_for_report_update = STATUS_DELAY and (self.get_time() - self.status_time) / 60 > STATUS_DELAY
+        is_time_for_report_update = (
+            self.prm.STATUS_DELAY and (self.get_time() - self.status_time) / 60 > self.prm.STATUS_DELAY
+        )
         if self.command == 'status' or is_time_for_report_update:
             if self.command == 'status':
                 self.command = None
@@ -423,7 +431,7 @@ class Strategy(StrategyBase):
                                      f"Delay: {time_diff} sec", tlg=True)
                 elif self.tp_order_hold.get('timestamp'):
                     time_diff = int(self.get_time() - self.tp_order_hold['timestamp'])
-                    if time_diff > HOLD_TP_ORDER_TIMEOUT:
+                    if time_diff > self.prm.HOLD_TP_ORDER_TIMEOUT:
                         self.message_log(f"Exist hold TP order on {self.tp_order_hold['amount']}"
                                          f" {self.f_currency if self.cycle_buy else self.s_currency}\n"
                                          f"Available first:{fund_f} {self.f_currency}\n"
@@ -444,7 +452,7 @@ class Strategy(StrategyBase):
                     order_hold = len(self.orders_hold)
 
                 command = bool(self.command in ('end', 'stop'))
-                if GRID_ONLY:
+                if self.prm.GRID_ONLY:
                     header = (f"{'Buy' if self.cycle_buy else 'Sell'} assets Grid only mode\n"
                               f"{('Waiting funding for convert' + chr(10)) if self.grid_only_restart else ''}"
                               f"{self.get_free_assets()[3]}"
@@ -470,12 +478,13 @@ class Strategy(StrategyBase):
                                  f"{state_msg}\n"
                                  f"{'Buy' if self.cycle_buy else 'Sell'}{' Reverse' if self.reverse else ''}"
                                  f"{' Hold reverse' if self.reverse_hold else ''} "
-                                 f"{MODE}{'-SO' if MODE == 'TC' and SELF_OPTIMIZATION else ''}-cycle with"
+                                 f"{self.prm.MODE}"
+                                 f"{'-SO' if self.prm.MODE == 'TC' and self.prm.SELF_OPTIMIZATION else ''}-cycle with"
                                  f" {order_buy} buy and {order_sell} sell active orders.\n"
                                  f"{order_hold or 'No'} hold grid orders\n"
                                  f"Over price: {self.over_price:.2f}%\n"
                                  f"Last ticker price: {last_price}\n"
-                                 f"ver: {HEAD_VERSION}+{__version__}+{msb_ver}\n"
+                                 f"ver: {self.prm.HEAD_VERSION}+{__version__}+{msb_ver}\n"
                                  f"From start {ct}\n"
                                  f"WSS status: {ticker_update}s\n"
                                  f"{'-   ***   ***   ***   -' if self.command == 'stop' else ''}\n"
@@ -483,7 +492,7 @@ class Strategy(StrategyBase):
                                  tlg=True)
 
     async def event_processing(self):
-        if self.wait_wss_refresh and self.get_time() - self.wait_wss_refresh['timestamp'] > SHIFT_GRID_DELAY:
+        if self.wait_wss_refresh and self.get_time() - self.wait_wss_refresh['timestamp'] > self.prm.SHIFT_GRID_DELAY:
             await self.place_grid(self.wait_wss_refresh['buy_side'],
                                   self.wait_wss_refresh['depo'],
                                   self.reverse_target_amount,
@@ -494,16 +503,16 @@ class Strategy(StrategyBase):
             self.get_buffered_funds()
         if self.reverse_hold:
             if self.start_reverse_time:
-                if self.get_time() - self.start_reverse_time > 2 * SHIFT_GRID_DELAY:
+                if self.get_time() - self.start_reverse_time > 2 * self.prm.SHIFT_GRID_DELAY:
                     last_price = self.get_buffered_ticker().last_price
                     if self.cycle_buy:
                         price_diff = 100 * (self.reverse_price - last_price) / self.reverse_price
                     else:
                         price_diff = 100 * (last_price - self.reverse_price) / self.reverse_price
-                    if price_diff > ADX_PRICE_THRESHOLD:
+                    if price_diff > self.prm.ADX_PRICE_THRESHOLD:
                         # Reverse
                         self.cycle_buy = not self.cycle_buy
-                        self.command = 'stop' if REVERSE_STOP else None
+                        self.command = 'stop' if self.prm.REVERSE_STOP else None
                         self.reverse = True
                         self.reverse_hold = False
                         self.sum_amount_first = self.tp_part_amount_first
@@ -516,10 +525,10 @@ class Strategy(StrategyBase):
 
     async def event_update_tp(self):
         if (
-            ADAPTIVE_TRADE_CONDITION
+            self.prm.ADAPTIVE_TRADE_CONDITION
             and self.stable_state()
             and self.tp_order_id
-            and self.get_time() - self.tp_order[3] > TP_REFRESH
+            and self.get_time() - self.tp_order[3] > self.prm.TP_REFRESH
             and not self.tp_part_amount_first
         ):
             self.message_log("Update TP order", color=Style.B_WHITE)
@@ -528,15 +537,15 @@ class Strategy(StrategyBase):
     async def event_grid_only_release(self):
         if self.grid_only_restart and self.get_time() > self.grid_only_restart:
             ff, fs, _, _ = self.get_free_assets(mode='available')
-            if USE_ALL_FUND:
+            if self.prm.USE_ALL_FUND:
                 if self.check_min_amount(amount=(fs / self.avg_rate) if self.cycle_buy else ff):
                     self.grid_remove = True
                     await self.cancel_grid(cancel_all=True)
-                elif GRID_ONLY_EXIT:
+                elif self.prm.GRID_ONLY_EXIT:
                     self.message_log("Exit from sell asset cycle after time limit", color=Style.B_WHITE)
                     tasks_manage(self.tasks, self.raise_keyboard_interrupt(), add_done_callback=False)
-            elif AMOUNT_FIRST and START_ON_BUY:
-                if ff < AMOUNT_FIRST and fs > AMOUNT_SECOND:
+            elif self.prm.AMOUNT_FIRST and self.prm.START_ON_BUY:
+                if ff < self.prm.AMOUNT_FIRST and fs > self.prm.AMOUNT_SECOND:
                     self.save_init_assets(ff, fs)
                     await self.start()
 
@@ -546,7 +555,7 @@ class Strategy(StrategyBase):
         """
         return (
             self.grid_remove is None
-            and not GRID_ONLY
+            and not self.prm.GRID_ONLY
             and not self.grid_update_started
             and not self.tp_hold
             and not self.tp_order_hold
@@ -692,7 +701,7 @@ class Strategy(StrategyBase):
                     and not self.tp_order_id
                     and not self.tp_wait_id
             ):
-                self.message_log("Restore, Restart", tlg=not GRID_ONLY)
+                self.message_log("Restore, Restart", tlg=not self.prm.GRID_ONLY)
                 await self.start()
             elif self.orders_init:
                 for order_id in self.orders_init.get_id_list():
@@ -701,13 +710,13 @@ class Strategy(StrategyBase):
             elif not grid_open_orders_len and not self.reverse_hold:
                 self.message_log("Place grid orders", tlg=True)
                 await self.grid_update()
-            elif GRID_ONLY and grid_open_orders_len:
+            elif self.prm.GRID_ONLY and grid_open_orders_len:
                 ff, fs, _, _ = self.get_free_assets(mode='available')
                 if self.check_min_amount(amount=(fs / self.avg_rate) if self.cycle_buy else ff):
                     self.grid_remove = True
                     await self.cancel_grid(cancel_all=True)
-                elif USE_ALL_FUND:
-                    self.grid_only_restart = self.get_time() + GRID_ONLY_DELAY
+                elif self.prm.USE_ALL_FUND:
+                    self.grid_only_restart = self.get_time() + self.prm.GRID_ONLY_DELAY
 
             if self.tp_wait_id:
                 self.message_log("Restore, wait TP order", tlg=True)
@@ -746,7 +755,7 @@ class Strategy(StrategyBase):
                                              base=False)
                 go_trade = fs >= init_s
                 if go_trade:
-                    if FEE_MAKER:
+                    if self.prm.FEE_MAKER:
                         fs = self.initial_reverse_second if self.reverse else self.initial_second
                     _ff = ff
                     _fs = fs - profit_s
@@ -755,12 +764,12 @@ class Strategy(StrategyBase):
                                              base=True)
                 go_trade = ff >= init_f
                 if go_trade:
-                    if FEE_MAKER:
+                    if self.prm.FEE_MAKER:
                         ff = self.initial_reverse_first if self.reverse else self.initial_first
                     _ff = ff - profit_f
                     _fs = fs
             if go_trade:
-                if MODE in ('T', 'TC') and not GRID_ONLY:
+                if self.prm.MODE in ('T', 'TC') and not self.prm.GRID_ONLY:
                     if self.cycle_buy:
                         df = O_DEC
                         ds = self.deposit_second - self.profit_second
@@ -771,7 +780,7 @@ class Strategy(StrategyBase):
                     ct = ct.total_seconds()
                     # noinspection PyUnboundLocalVariable
                     data_to_db = {
-                        'ID_EXCHANGE': ID_EXCHANGE,
+                        'ID_EXCHANGE': self.prm.ID_EXCHANGE,
                         'f_currency': self.f_currency,
                         's_currency': self.s_currency,
                         'f_funds': _ff,
@@ -782,13 +791,13 @@ class Strategy(StrategyBase):
                         's_depo': ds,
                         'f_profit': self.profit_first,
                         's_profit': self.profit_second,
-                        'PRICE_SHIFT': PRICE_SHIFT,
-                        'PROFIT': PROFIT,
+                        'PRICE_SHIFT': self.prm.PRICE_SHIFT,
+                        'PROFIT': self.prm.PROFIT,
                         'order_q': self.order_q,
-                        'MARTIN': MARTIN,
-                        'LINEAR_GRID_K': LINEAR_GRID_K,
-                        'ADAPTIVE_TRADE_CONDITION': ADAPTIVE_TRADE_CONDITION,
-                        'KBB': KBB,
+                        'MARTIN': self.prm.MARTIN,
+                        'LINEAR_GRID_K': self.prm.LINEAR_GRID_K,
+                        'ADAPTIVE_TRADE_CONDITION': self.prm.ADAPTIVE_TRADE_CONDITION,
+                        'KBB': self.prm.KBB,
                         'over_price': self.over_price,
                         'cycle_time': ct,
                         'destination': 't_funds'
@@ -796,7 +805,7 @@ class Strategy(StrategyBase):
                     self.message_log('Send data to .db t_funds')
                     await self.queue_to_db.put(data_to_db)
                 self.save_init_assets(ff, fs)
-                if COLLECT_ASSETS and MODE != 'S':
+                if self.prm.COLLECT_ASSETS and self.prm.MODE != 'S':
                     _ff, _fs = await self.collect_assets()
                     ff -= _ff
                     fs -= _fs
@@ -811,30 +820,31 @@ class Strategy(StrategyBase):
         #
         self.wait_refunding_for_start = False
         self.avg_rate = self.get_buffered_ticker().last_price
-        if self.first_run or MODE in ('T', 'TC'):
+        if self.first_run or self.prm.MODE in ('T', 'TC'):
             self.cycle_time = datetime.now(timezone.utc).replace(tzinfo=None)
 
-        if GRID_ONLY:
-            if USE_ALL_FUND and not self.start_after_shift:
+        if self.prm.GRID_ONLY:
+            if self.prm.USE_ALL_FUND and not self.start_after_shift:
                 if self.cycle_buy:
                     self.deposit_second = fs
                 else:
                     self.deposit_first = ff
                 self.save_init_assets(ff, fs)
-                self.grid_only_restart = self.get_time() + GRID_ONLY_DELAY
+                self.grid_only_restart = self.get_time() + self.prm.GRID_ONLY_DELAY
 
-            if (START_ON_BUY and AMOUNT_FIRST and (ff >= AMOUNT_FIRST or fs < AMOUNT_SECOND)) \
+            if (self.prm.START_ON_BUY and self.prm.AMOUNT_FIRST
+                    and (ff >= self.prm.AMOUNT_FIRST or fs < self.prm.AMOUNT_SECOND)) \
                     or not self.check_min_amount(amount=(fs / self.avg_rate) if self.cycle_buy else ff):
                 if self.first_run:
                     self.message_log("Grid only mode started", tlg=True)
                     self.first_run = False
-                self.grid_only_restart = self.get_time() + GRID_ONLY_DELAY
+                self.grid_only_restart = self.get_time() + self.prm.GRID_ONLY_DELAY
                 self.message_log("Waiting for conditions for conversion", color=Style.B_WHITE)
                 self.message_log(f"Number of unreachable objects collected by GC: {gc.collect(generation=2)}")
                 malloc_trim()
                 return
 
-        if not self.first_run and not self.start_after_shift and not self.reverse and not GRID_ONLY:
+        if not self.first_run and not self.start_after_shift and not self.reverse and not self.prm.GRID_ONLY:
             self.message_log(f"Complete {self.cycle_buy_count} buy cycle and {self.cycle_sell_count} sell cycle\n"
                              f"For all cycles profit:\n"
                              f"First: {self.sum_profit_first}\n"
@@ -844,16 +854,16 @@ class Strategy(StrategyBase):
         #
         memory = psutil.virtual_memory()
         swap = psutil.swap_memory()
-        if VPS_NAME != 'DEVELOP':
+        if self.prm.VPS_NAME != 'DEVELOP':
             total_used_percent = 100 * float(swap.used + memory.used) / (swap.total + memory.total)
             if total_used_percent > 85:
-                self.message_log(f"For {VPS_NAME} critical memory availability, end", tlg=True)
+                self.message_log(f"For {self.prm.VPS_NAME} critical memory availability, end", tlg=True)
                 self.command = 'end'
             elif total_used_percent > 75:
-                self.message_log(f"For {VPS_NAME} low memory availability, stop after end of cycle", tlg=True)
+                self.message_log(f"For {self.prm.VPS_NAME} low memory availability, stop after end of cycle", tlg=True)
                 self.command = 'stop'
         if self.command == 'end' or (self.command == 'stop' and
-                                     (not self.reverse or (self.reverse and REVERSE_STOP))):
+                                     (not self.reverse or (self.reverse and self.prm.REVERSE_STOP))):
             self.command = 'stopped'
             self.operational_status = False
             self.start_collect = 1
@@ -867,8 +877,8 @@ class Strategy(StrategyBase):
         self.restart = None
         # Init variable
         self.profit_first = self.profit_second = O_DEC
-        self.over_price = OVER_PRICE
-        self.order_q = self.order_q_limit = ORDER_Q
+        self.over_price = self.prm.OVER_PRICE
+        self.order_q = self.order_q_limit = self.prm.ORDER_Q
         self.grid_update_started = None
         self.place_grid_part_after_tp = True
         #
@@ -877,20 +887,22 @@ class Strategy(StrategyBase):
             amount = self.deposit_second
             if start_cycle_output:
                 self.message_log(f"Start Buy{' Reverse' if self.reverse else ''}"
-                                 f" {'asset' if GRID_ONLY else 'cycle'} with {amount} {self.s_currency} depo\n"
-                                 f"{'' if GRID_ONLY else self.get_free_assets(ff, fs, mode='free')[3]}", tlg=True)
+                                 f" {'asset' if self.prm.GRID_ONLY else 'cycle'} with {amount} {self.s_currency} depo\n"
+                                 f"{'' if self.prm.GRID_ONLY else self.get_free_assets(ff, fs, mode='free')[3]}",
+                                 tlg=True)
         else:
             amount = self.deposit_first
             if start_cycle_output:
                 self.message_log(f"Start Sell{' Reverse' if self.reverse else ''}"
-                                 f" {'asset' if GRID_ONLY else 'cycle'} with {amount} {self.f_currency} depo\n"
-                                 f"{'' if GRID_ONLY else self.get_free_assets(ff, fs, mode='free')[3]}", tlg=True)
+                                 f" {'asset' if self.prm.GRID_ONLY else 'cycle'} with {amount} {self.f_currency} depo\n"
+                                 f"{'' if self.prm.GRID_ONLY else self.get_free_assets(ff, fs, mode='free')[3]}",
+                                 tlg=True)
         #
         if self.reverse:
             self.message_log(f"For Reverse cycle target return amount: {self.reverse_target_amount}",
                              color=Style.B_WHITE)
         self.debug_output()
-        if MODE in ('TC', 'S') and self.start_collect is None:
+        if self.prm.MODE in ('TC', 'S') and self.start_collect is None:
             self.start_collect = True
         self.first_run = False
         await self.place_grid(self.cycle_buy, amount, self.reverse_target_amount)
@@ -906,7 +918,7 @@ class Strategy(StrategyBase):
                      WHERE id_exchange=:id_exchange\
                      AND f_currency=:f_currency\
                      AND s_currency=:s_currency",
-                     {'id_exchange': ID_EXCHANGE, 'f_currency': self.f_currency, 's_currency': self.s_currency}
+                     {'id_exchange': self.prm.ID_EXCHANGE, 'f_currency': self.f_currency, 's_currency': self.s_currency}
                 )
                 await self.connection_db.commit()
             except aiosqlite.Error as err:
@@ -919,7 +931,7 @@ class Strategy(StrategyBase):
             depo = self.deposit_second
         else:
             depo = self.deposit_first
-        if ADAPTIVE_TRADE_CONDITION:
+        if self.prm.ADAPTIVE_TRADE_CONDITION:
             if self.first_run and self.order_q < 3:
                 self.message_log(f"Depo amount {depo} not enough to set the grid with 3 or more orders",
                                  log_level=logging.ERROR)
@@ -936,19 +948,19 @@ class Strategy(StrategyBase):
                                  f" {self.deposit_second if self.cycle_buy else self.deposit_first}",
                                  log_level=logging.WARNING)
         else:
-            first_order_vlm = depo * 1 * (1 - self.martin) / (1 - self.martin ** ORDER_Q)
+            first_order_vlm = depo * 1 * (1 - self.martin) / (1 - self.martin ** self.prm.ORDER_Q)
 
             first_order_vlm = (first_order_vlm / self.avg_rate) if self.cycle_buy else first_order_vlm
 
             if first_order_vlm < _amount_first_grid:
-                self.message_log(f"Depo amount {depo}{self.s_currency} not enough for {ORDER_Q} orders",
+                self.message_log(f"Depo amount {depo}{self.s_currency} not enough for {self.prm.ORDER_Q} orders",
                                  color=Style.B_RED)
                 if self.first_run:
                     raise SystemExit(1)
 
     def get_started_balance_diff(self):
         msg = str()
-        if MODE in ('T', 'TC'):
+        if self.prm.MODE in ('T', 'TC'):
             started_balance = self.round_truncate(
                 self.started_balance_detail[0] * self.started_balance_detail[2] + self.started_balance_detail[1],
                 base=False
@@ -961,7 +973,7 @@ class Strategy(StrategyBase):
         return msg
 
     async def trade_control(self):
-        if not TRADE_CONTROL or GRID_ONLY or not self.cycle_buy or not self.adx_di_avg_delta:
+        if not self.prm.TRADE_CONTROL or self.prm.GRID_ONLY or not self.cycle_buy or not self.adx_di_avg_delta:
             return
 
         first_iteration = True
@@ -982,12 +994,12 @@ class Strategy(StrategyBase):
                 self.message_log(
                     f"Last DI diff: {last_diff}, Trend: {result.trend} {'significant' if result.h else ''}"
                 )
-                if result.h and result.z > 0 and last_diff > -TC_DI_DIFF:
+                if result.h and result.z > 0 and last_diff > -self.prm.TC_DI_DIFF:
                     break
             else:
                 self.message_log("Not enough data for analysis, collecting it")
 
-            await asyncio.sleep(60)
+            await self.sleep(60)
         #
         self.trade_control_is_waiting_state = False
         self.message_log('The conditions are favorable, continue trading', color=Style.GREEN)
@@ -1113,8 +1125,8 @@ class Strategy(StrategyBase):
         sma = statistics.mean(candle_close)
         st_dev = statistics.stdev(candle_close)
         # print('sma={}, st_dev={}'.format(sma, st_dev))
-        tbb = sma + KBB * st_dev
-        bbb = sma - KBB * st_dev
+        tbb = sma + self.prm.KBB * st_dev
+        bbb = sma - self.prm.KBB * st_dev
         min_price = self.get_trading_capability_manager().get_minimal_price_change()
         bbb = max(bbb, min_price)
         # self.message_log(f"bollinger_band: tbb={tbb:f}, bbb={bbb:f}", log_level=logging.DEBUG)
@@ -1144,7 +1156,8 @@ class Strategy(StrategyBase):
     def debug_output(self):
         self.message_log(f"\n"
                          f"! =======================================\n"
-                         f"! debug output: ver: {self.client.srv_version}: {HEAD_VERSION}+{__version__}+{msb_ver}\n"
+                         f"! debug output: ver: {self.client.srv_version}: "
+                         f"{self.prm.HEAD_VERSION}+{__version__}+{msb_ver}\n"
                          f"! trade_id: {self.session.trade_id}\n"
                          f"! reverse: {self.reverse}\n"
                          f"! Cycle Buy: {self.cycle_buy}\n"
@@ -1264,12 +1277,12 @@ class Strategy(StrategyBase):
             if buy_side:
                 best_price = self.get_buffered_order_book().bids[0].price
                 _price = min(best_price, last_executed_grid_price or best_price)
-                base_price = _price - PRICE_SHIFT * _price / 100
+                base_price = _price - self.prm.PRICE_SHIFT * _price / 100
                 amount_min = tcm.get_min_buy_amount(base_price)
             else:
                 best_price = self.get_buffered_order_book().asks[0].price
                 _price = max(best_price, last_executed_grid_price or best_price)
-                base_price = _price + PRICE_SHIFT * _price / 100
+                base_price = _price + self.prm.PRICE_SHIFT * _price / 100
                 amount_min = tcm.get_min_sell_amount(base_price)
             min_delta = tcm.get_minimal_price_change()
             base_price = tcm.round_price(base_price, ROUND_HALF_EVEN)
@@ -1281,7 +1294,7 @@ class Strategy(StrategyBase):
                 amount_min += (amount_min * self.avg_rate - _s) / self.avg_rate
             amount_min = self.round_truncate(amount_min, base=True, _rounding=ROUND_CEILING)
             #
-            if ADAPTIVE_TRADE_CONDITION or self.reverse or additional_grid:
+            if self.prm.ADAPTIVE_TRADE_CONDITION or self.reverse or additional_grid:
                 try:
                     amount_first_grid = self.set_trade_conditions(buy_side,
                                                                   depo,
@@ -1309,8 +1322,8 @@ class Strategy(StrategyBase):
                     )
                     return
             else:
-                self.over_price = OVER_PRICE
-                self.order_q = ORDER_Q
+                self.over_price = self.prm.OVER_PRICE
+                self.order_q = self.prm.ORDER_Q
                 amount_first_grid = amount_min
             if self.order_q > 1:
                 self.message_log(f"For{' Reverse' if self.reverse else ''} {'Buy' if buy_side else 'Sell'}"
@@ -1349,7 +1362,7 @@ class Strategy(StrategyBase):
             for order in orders:
                 i, amount, price = order
                 # create order for grid
-                if i < GRID_MAX_COUNT:
+                if i < self.prm.GRID_MAX_COUNT:
                     waiting_order_id = self.place_limit_order(buy_side, amount, price)
                     self.orders_init.append_order(waiting_order_id, buy_side, amount, price)
                 else:
@@ -1357,9 +1370,9 @@ class Strategy(StrategyBase):
             #
             if allow_grid_shift:
                 bb = None
-                if GRID_ONLY:
+                if self.prm.GRID_ONLY:
                     try:
-                        bb = self.bollinger_band(15, BB_NUMBER_OF_CANDLES)
+                        bb = self.bollinger_band(15, self.prm.BB_NUMBER_OF_CANDLES)
                     except Exception as ex:
                         self.message_log(f"Can't get BollingerBand: {ex}", log_level=logging.ERROR)
                     else:
@@ -1367,11 +1380,11 @@ class Strategy(StrategyBase):
                             self.shift_grid_threshold = bb.get('tbb')
                         else:
                             self.shift_grid_threshold = bb.get('bbb')
-                if not GRID_ONLY or (GRID_ONLY and bb is None):
+                if not self.prm.GRID_ONLY or (self.prm.GRID_ONLY and bb is None):
                     if buy_side:
-                        self.shift_grid_threshold = base_price + 2 * PRICE_SHIFT * base_price / 100
+                        self.shift_grid_threshold = base_price + 2 * self.prm.PRICE_SHIFT * base_price / 100
                     else:
-                        self.shift_grid_threshold = base_price - 2 * PRICE_SHIFT * base_price / 100
+                        self.shift_grid_threshold = base_price - 2 * self.prm.PRICE_SHIFT * base_price / 100
                 self.message_log(f"Shift grid threshold: {self.shift_grid_threshold:f}")
             #
             self.start_after_shift = 0
@@ -1417,8 +1430,8 @@ class Strategy(StrategyBase):
         orders = []
 
         for i in range(self.order_q):
-            if LINEAR_GRID_K >= 0:
-                price_k = f2d(1 - math.log(self.order_q - i, self.order_q + LINEAR_GRID_K))
+            if self.prm.LINEAR_GRID_K >= 0:
+                price_k = f2d(1 - math.log(self.order_q - i, self.order_q + self.prm.LINEAR_GRID_K))
             price = base_price - i * delta_price * price_k if buy_side else base_price + i * delta_price * price_k
             price = tcm.round_price(price, ROUND_HALF_EVEN)
             if buy_side and i and price_prev - price < min_delta:
@@ -1487,16 +1500,16 @@ class Strategy(StrategyBase):
             return
         #
         do_it = False
-        if ADAPTIVE_TRADE_CONDITION and self.stable_state() and not self.part_amount \
+        if self.prm.ADAPTIVE_TRADE_CONDITION and self.stable_state() and not self.part_amount \
                 and (self.orders_grid or self.orders_hold):
             depo_remaining = self.depo_unused() / (self.deposit_second if self.cycle_buy else self.deposit_first)
 
             if self.reverse and depo_remaining >= f2d(0.65):
-                if self.get_time() - self.ts_grid_update > GRID_UPDATE_INTERVAL:
+                if self.get_time() - self.ts_grid_update > self.prm.GRID_UPDATE_INTERVAL:
                     do_it = True
             elif not self.reverse and depo_remaining >= f2d(0.35):
                 try:
-                    bb = self.bollinger_band(BB_CANDLE_SIZE_IN_MINUTES, BB_NUMBER_OF_CANDLES)
+                    bb = self.bollinger_band(self.prm.BB_CANDLE_SIZE_IN_MINUTES, self.prm.BB_NUMBER_OF_CANDLES)
                 except Exception as ex:
                     self.message_log(f"Can't get BB in grid update: {ex}", log_level=logging.INFO)
                 else:
@@ -1519,7 +1532,7 @@ class Strategy(StrategyBase):
             await self.cancel_grid()
 
     async def place_profit_order(self, by_market=False, after_error=False) -> None:
-        if not GRID_ONLY and self.check_min_amount():
+        if not self.prm.GRID_ONLY and self.check_min_amount():
             self.tp_order_hold.clear()
             if self.tp_wait_id or self.cancel_order_id or self.tp_was_filled:
                 # Waiting confirm or cancel old or processing ending and replace it
@@ -1583,12 +1596,15 @@ class Strategy(StrategyBase):
         tcm = self.get_trading_capability_manager()
         step_size = tcm.get_minimal_amount_change()
         depo_c = (depo / base_price) if buy_side else depo
-        if not additional_grid and not grid_update and not GRID_ONLY and 0 < PROFIT_MAX < 100:
+        if not additional_grid and not grid_update and not self.prm.GRID_ONLY and 0 < self.prm.PROFIT_MAX < 100:
             try:
-                profit_max = min(PROFIT_MAX, max(PROFIT, 100 * self.atr() / self.get_buffered_ticker().last_price))
+                profit_max = min(
+                    self.prm.PROFIT_MAX,
+                    max(self.prm.PROFIT, 100 * self.atr() / self.get_buffered_ticker().last_price)
+                )
             except statistics.StatisticsError as ex:
                 self.message_log(f"Can't get ATR value: {ex}, use default PROFIT value", logging.WARNING)
-                profit_max = PROFIT
+                profit_max = self.prm.PROFIT
             self.message_log(f"Profit max for first order set {float(profit_max):f}%", logging.DEBUG)
             k_m = 1 - profit_max / 100
             amount_first_grid = max(amount_min, (step_size * base_price / ((1 / k_m) - 1)) / base_price)
@@ -1607,16 +1623,16 @@ class Strategy(StrategyBase):
                                               amount_first_grid,
                                               amount_min)
         else:
-            bb = self.bollinger_band(BB_CANDLE_SIZE_IN_MINUTES, BB_NUMBER_OF_CANDLES)
+            bb = self.bollinger_band(self.prm.BB_CANDLE_SIZE_IN_MINUTES, self.prm.BB_NUMBER_OF_CANDLES)
             if buy_side:
                 bbb = bb.get('bbb')
                 over_price = 100 * (base_price - bbb) / base_price
             else:
                 tbb = bb.get('tbb')
                 over_price = 100 * (tbb - base_price) / base_price
-        self.over_price = max(over_price, OVER_PRICE)
+        self.over_price = max(over_price, self.prm.OVER_PRICE)
         # Adapt grid orders quantity for new over price
-        order_q = int(self.over_price * ORDER_Q / OVER_PRICE)
+        order_q = int(self.over_price * self.prm.ORDER_Q / self.prm.OVER_PRICE)
         amnt_2 = amount_min * self.martin
         q_max = int(math.log(1 + (depo_c - amount_first_grid) * self.martin * (self.martin - 1) / amnt_2, self.martin))
         self.message_log(f"set_trade_conditions: buy_side: {buy_side}, depo: {float(depo):f},"
@@ -1624,10 +1640,10 @@ class Strategy(StrategyBase):
                          f" amount_min: {amount_min}, step_size: {step_size}, delta_min: {delta_min},"
                          f" amount_first_grid: {amount_first_grid:f}, coarse overprice: {float(self.over_price):f}",
                          logging.DEBUG)
-        while q_max > ORDER_Q or (GRID_ONLY and q_max > 1):
+        while q_max > self.prm.ORDER_Q or (self.prm.GRID_ONLY and q_max > 1):
             delta_price = self.over_price * base_price / (100 * (q_max - 1))
-            if LINEAR_GRID_K >= 0:
-                price_k = f2d(1 - math.log(q_max - 1, q_max + LINEAR_GRID_K))
+            if self.prm.LINEAR_GRID_K >= 0:
+                price_k = f2d(1 - math.log(q_max - 1, q_max + self.prm.LINEAR_GRID_K))
             else:
                 price_k = 1
             delta = delta_price * price_k
@@ -1646,15 +1662,15 @@ class Strategy(StrategyBase):
                                               amount_first_grid,
                                               amount_min,
                                               over_price)
-            self.over_price = max(over_price, OVER_PRICE)
+            self.over_price = max(over_price, self.prm.OVER_PRICE)
         return amount_first_grid
 
     def set_profit(self, tp_amount: Decimal, amount: Decimal, by_market: bool) -> Decimal:
-        fee = FEE_TAKER if by_market else FEE_MAKER
+        fee = self.prm.FEE_TAKER if by_market else self.prm.FEE_MAKER
         tbb = None
         bbb = None
         n = len(self.orders_grid) + len(self.orders_init) + len(self.orders_hold) + len(self.orders_save)
-        if PROFIT_MAX and (n > 1 or self.reverse):
+        if self.prm.PROFIT_MAX and (n > 1 or self.reverse):
             try:
                 bb = self.bollinger_band(15, 20)
             except statistics.StatisticsError:
@@ -1668,9 +1684,9 @@ class Strategy(StrategyBase):
                 profit = 100 * (tbb * amount - tp_amount) / tp_amount
             else:
                 profit = 100 * (amount / bbb - tp_amount) / tp_amount
-            profit = min(max(profit, PROFIT + fee), PROFIT_MAX)
+            profit = min(max(profit, self.prm.PROFIT + fee), self.prm.PROFIT_MAX)
         else:
-            profit = PROFIT + fee
+            profit = self.prm.PROFIT + fee
         return profit.quantize(Decimal("1.0123"), rounding=ROUND_CEILING)
 
     def calc_profit_order(self, buy_side: bool, by_market=False, log_output=True) -> Dict[str, Decimal]:
@@ -1772,8 +1788,8 @@ class Strategy(StrategyBase):
         """
         Calculate trade amount with Fee for grid order for both currency
         """
-        fee = FEE_TAKER if by_market else FEE_MAKER
-        if FEE_FIRST or (self.cycle_buy and not FEE_SECOND):
+        fee = self.prm.FEE_TAKER if by_market else self.prm.FEE_MAKER
+        if self.prm.FEE_FIRST or (self.cycle_buy and not self.prm.FEE_SECOND):
             amount_first -= self.round_fee(fee, amount_first, base=True)
             message = f"For grid order First - fee: {any2str(amount_first)}"
         else:
@@ -1791,8 +1807,8 @@ class Strategy(StrategyBase):
         """
         Calculate trade amount with Fee for take profit order for both currency
         """
-        fee = FEE_TAKER if by_market else FEE_MAKER
-        if FEE_SECOND or (self.cycle_buy and not FEE_FIRST):
+        fee = self.prm.FEE_TAKER if by_market else self.prm.FEE_MAKER
+        if self.prm.FEE_SECOND or (self.cycle_buy and not self.prm.FEE_FIRST):
             amount_second -= self.round_fee(fee, amount_second, base=False)
             log_text = f"Take profit order Second - fee: {amount_second}"
         else:
@@ -1926,7 +1942,7 @@ class Strategy(StrategyBase):
             self.reverse_target_amount = O_DEC
             self.reverse_init_amount = O_DEC
             self.initial_reverse_first = self.initial_reverse_second = O_DEC
-            self.command = 'stop' if REVERSE_STOP and REVERSE else self.command
+            self.command = 'stop' if self.prm.REVERSE_STOP and self.prm.REVERSE else self.command
             if (self.cycle_buy and self.profit_first < 0) or (not self.cycle_buy and self.profit_second < 0):
                 self.message_log("Strategy have a negative cycle result, STOP", log_level=logging.CRITICAL)
                 self.command = 'end'
@@ -1972,7 +1988,7 @@ class Strategy(StrategyBase):
             if (self.cycle_buy and trend_down) or (not self.cycle_buy and trend_up):
                 self.message_log('Start reverse cycle', tlg=True)
                 self.reverse = True
-                self.command = 'stop' if REVERSE_STOP else None
+                self.command = 'stop' if self.prm.REVERSE_STOP else None
             else:
                 self.message_log('Hold reverse cycle', color=Style.B_WHITE)
                 self.reverse_hold = True
@@ -1993,7 +2009,7 @@ class Strategy(StrategyBase):
                 self.message_log(f"Place next part of grid orders, hold {len(self.orders_hold)}", color=Style.B_WHITE)
                 k = 0
                 for i in self.orders_hold:
-                    if k == GRID_MAX_COUNT or k + n >= self.order_q_limit:
+                    if k == self.prm.GRID_MAX_COUNT or k + n >= self.order_q_limit:
                         break
                     waiting_order_id = self.place_limit_order_check(
                         i['buy'],
@@ -2022,14 +2038,14 @@ class Strategy(StrategyBase):
                              f"Sell {self.sum_amount_first} {self.f_currency}\n"
                              f"Average rate is {avg_rate}", tlg=True)
         self.sum_amount_first = self.sum_amount_second = O_DEC
-        if USE_ALL_FUND:
-            self.grid_only_restart = self.get_time() + GRID_ONLY_DELAY
+        if self.prm.USE_ALL_FUND:
+            self.grid_only_restart = self.get_time() + self.prm.GRID_ONLY_DELAY
             self.message_log("Waiting funding for convert", color=Style.B_WHITE)
             return
-        if START_ON_BUY and AMOUNT_FIRST:
-            self.deposit_second = AMOUNT_SECOND
+        if self.prm.START_ON_BUY and self.prm.AMOUNT_FIRST:
+            self.deposit_second = self.prm.AMOUNT_SECOND
             self.grid_only_restart = self.get_time()
-            self.message_log(f"Keep the level {self.f_currency} at {AMOUNT_FIRST}", color=Style.B_WHITE)
+            self.message_log(f"Keep the level {self.f_currency} at {self.prm.AMOUNT_FIRST}", color=Style.B_WHITE)
             return
         self.command = 'stop'
 
@@ -2060,7 +2076,7 @@ class Strategy(StrategyBase):
             self.message_log(f"Sum_amount_first: {self.sum_amount_first},"
                              f" Sum_amount_second: {self.sum_amount_second}",
                              log_level=logging.DEBUG, color=Style.MAGENTA)
-            if GRID_ONLY:
+            if self.prm.GRID_ONLY:
                 # Correct depo and init amount
                 if self.cycle_buy:
                     self.deposit_second -= delta_s
@@ -2084,7 +2100,7 @@ class Strategy(StrategyBase):
                 # Wait tp order and cancel in on_cancel_order_success and restart
                 self.tp_cancel_from_grid_handler = True
                 return
-            if GRID_ONLY:
+            if self.prm.GRID_ONLY:
                 self.shift_grid_threshold = None
                 self.grid_only_stop()
             elif self.tp_part_amount_first and await self.convert_tp(
@@ -2232,8 +2248,8 @@ class Strategy(StrategyBase):
                     await self.grid_update()
                 else:
                     self.grid_update_started = None
-                    if GRID_ONLY:
-                        await asyncio.sleep(HEARTBEAT)
+                    if self.prm.GRID_ONLY:
+                        await self.sleep(HEARTBEAT)
                     await self.start()
         else:
             self.grid_remove = None
@@ -2267,11 +2283,11 @@ class Strategy(StrategyBase):
         tcm = self.get_trading_capability_manager()
         if self.cycle_buy:
             min_trade_amount = tcm.get_min_sell_amount(_price)
-            if not _amount and not GRID_ONLY:
+            if not _amount and not self.prm.GRID_ONLY:
                 _amount = self.sum_amount_first if for_tp else (self.deposit_second / _price)
         else:
             min_trade_amount = tcm.get_min_buy_amount(_price)
-            if not _amount and not GRID_ONLY:
+            if not _amount and not self.prm.GRID_ONLY:
                 if for_tp and self.sum_amount_first:
                     _tp = self.calc_profit_order(not self.cycle_buy, by_market=by_market, log_output=False)
                     if _tp['target'] * _tp['price'] < tcm.min_notional:
@@ -2308,7 +2324,7 @@ class Strategy(StrategyBase):
         # print(f"on_new_ticker:{datetime.fromtimestamp(ticker.timestamp/1000)}: last_price: {ticker.last_price}")
         self.last_ticker_update = int(self.get_time())
         shift_time_elapsed = self.shift_grid_threshold and self.last_shift_time and (
-                    self.get_time() - self.last_shift_time > SHIFT_GRID_DELAY)
+                    self.get_time() - self.last_shift_time > self.prm.SHIFT_GRID_DELAY)
 
         if shift_time_elapsed:
             price_above_threshold = self.cycle_buy and ticker.last_price >= self.shift_grid_threshold
@@ -2342,6 +2358,18 @@ class Strategy(StrategyBase):
             self.grid_remove = None
             await self.cancel_grid(cancel_all=True)
 
+    def fast_forward_bounds(self) -> tuple[float, float, float]:
+        low, high, until = super().fast_forward_bounds()
+        if self.shift_grid_threshold and self.last_shift_time:
+            if self.get_time() - self.last_shift_time > self.prm.SHIFT_GRID_DELAY:
+                if self.cycle_buy:
+                    high = min(high, float(self.shift_grid_threshold))
+                else:
+                    low = max(low, float(self.shift_grid_threshold))
+            else:
+                until = min(until, self.last_shift_time + self.prm.SHIFT_GRID_DELAY)
+        return low, high, until
+
     def on_new_order_book(self, order_book: OrderBook) -> None:
         # print(f"on_new_order_book: max_bids: {order_book.bids[0].price}, min_asks: {order_book.asks[0].price}")
         pass
@@ -2394,7 +2422,7 @@ class Strategy(StrategyBase):
                         update_grid = True
                     self.initial_reverse_second += delta
                 else:
-                    if GRID_ONLY and START_ON_BUY and AMOUNT_FIRST:
+                    if self.prm.GRID_ONLY and self.prm.START_ON_BUY and self.prm.AMOUNT_FIRST:
                         self.message_log("Deposit is not updated for First asset level control mode")
                     else:
                         if delta < 0 and abs(delta) > self.initial_second - self.deposit_second:
@@ -2404,7 +2432,7 @@ class Strategy(StrategyBase):
                             update_grid = True
                     self.initial_second += delta
             elif asset == self.f_currency:
-                if delta > 0 and not GRID_ONLY:
+                if delta > 0 and not self.prm.GRID_ONLY:
                     self.shift_grid_threshold = None
                     deposit_add = self.round_truncate(delta * self.avg_rate, base=False)
                     self.deposit_second += deposit_add
@@ -2457,7 +2485,7 @@ class Strategy(StrategyBase):
                         update_grid = True
                     self.initial_first += delta
             elif asset == self.s_currency:
-                if delta > 0 and not GRID_ONLY:
+                if delta > 0 and not self.prm.GRID_ONLY:
                     self.shift_grid_threshold = None
                     deposit_add = self.round_truncate(delta / self.avg_rate, base=True)
                     self.deposit_first += deposit_add
@@ -2485,11 +2513,11 @@ class Strategy(StrategyBase):
 
         self.debug_output()
 
-        if update_grid and not GRID_ONLY:
+        if update_grid and not self.prm.GRID_ONLY:
             self.grid_update_started = True
             await self.cancel_grid()
 
-        if restart and GRID_ONLY and USE_ALL_FUND:
+        if restart and self.prm.GRID_ONLY and self.prm.USE_ALL_FUND:
             self.restart = True
             self.grid_remove = None
             await self.cancel_grid(cancel_all=True)
@@ -2568,7 +2596,7 @@ class Strategy(StrategyBase):
                          f" price: {any2str(self.avg_rate)}")
         if update.status in (OrderUpdate.FILLED, OrderUpdate.ADAPTED_AND_FILLED):
             if self.orders_grid.exist(update.original_order.id):
-                if not GRID_ONLY:
+                if not self.prm.GRID_ONLY:
                     self.shift_grid_threshold = None
                 self.ts_grid_update = self.get_time()
                 self.orders_grid.remove(update.original_order.id)
@@ -2632,7 +2660,7 @@ class Strategy(StrategyBase):
                 self.part_amount[update.original_order.id] = (part_amount_first, part_amount_second)
                 self.message_log(f"Part_amount_first: {part_amount_first},"
                                  f" Part_amount_second: {part_amount_second}", log_level=logging.DEBUG)
-                if GRID_ONLY:
+                if self.prm.GRID_ONLY:
                     # Correct depo and init amount
                     if self.cycle_buy:
                         self.deposit_second -= amount_second_fee
@@ -2648,7 +2676,7 @@ class Strategy(StrategyBase):
                         self.shift_grid_threshold = None
                         await self.grid_handler(by_market=by_market, after_full_fill=False)
                     else:
-                        self.last_shift_time = self.get_time() + 2 * SHIFT_GRID_DELAY
+                        self.last_shift_time = self.get_time() + 2 * self.prm.SHIFT_GRID_DELAY
                         self.message_log("Partially trade too small, ignore", color=Style.B_WHITE)
             elif self.tp_order_id == update.original_order.id:
                 self.message_log("Take profit partially filled", color=Style.B_WHITE)
@@ -2713,13 +2741,13 @@ class Strategy(StrategyBase):
                     self.message_log('Continue remove grid orders', color=Style.B_WHITE)
                     self.cancel_grid_hold = False
                     await self.cancel_grid()
-                elif GRID_ONLY or not self.shift_grid_threshold:
+                elif self.prm.GRID_ONLY or not self.shift_grid_threshold:
                     self.place_grid_part()
             if not self.orders_hold and not self.orders_init:
-                if GRID_ONLY:
-                    if USE_ALL_FUND:
-                        self.grid_only_restart = self.get_time() + GRID_ONLY_DELAY
-                    elif AMOUNT_FIRST:
+                if self.prm.GRID_ONLY:
+                    if self.prm.USE_ALL_FUND:
+                        self.grid_only_restart = self.get_time() + self.prm.GRID_ONLY_DELAY
+                    elif self.prm.AMOUNT_FIRST:
                         self.grid_only_restart = 0
                 self.message_log('All grid orders have been successfully placed', color=Style.B_WHITE)
         elif place_order_id == self.tp_wait_id:
@@ -2741,7 +2769,7 @@ class Strategy(StrategyBase):
             self.orders_hold.orders_list.append(_order)
             self.orders_hold.sort(self.cycle_buy)
             self.place_grid_part_after_tp = False
-            if self.order_q_limit > GRID_MAX_COUNT:
+            if self.order_q_limit > self.prm.GRID_MAX_COUNT:
                 self.order_q_limit -= 1
                 self.message_log(
                     f'The limit for placed grid orders has been changed to: {self.order_q_limit}',
@@ -2795,7 +2823,7 @@ class Strategy(StrategyBase):
                     self.orders_hold.sort(self.cycle_buy)
                     self.grid_remove = None
                     if isinstance(self.start_after_shift, Decimal):
-                        if GRID_ONLY or not self.check_min_amount():
+                        if self.prm.GRID_ONLY or not self.check_min_amount():
                             self.shift_grid_threshold = self.start_after_shift
                         self.start_after_shift = 0
                     await self.place_profit_order()
@@ -2838,7 +2866,7 @@ class Strategy(StrategyBase):
             self.cancel_order_id = None
         self.message_log(f"On cancel order {order_id} {error}", logging.ERROR)
         if self.orders_grid.exist(order_id) and self.grid_remove:
-            await asyncio.sleep(np.random.default_rng().integers(HEARTBEAT, HEARTBEAT * 10))  # NOSONAR S6709
+            await self.sleep(np.random.default_rng().integers(HEARTBEAT, HEARTBEAT * 10))  # NOSONAR S6709
             await self.cancel_grid()
 
     def restore_state_before_backtesting_ex(self, saved_state):
@@ -2884,8 +2912,10 @@ class Strategy(StrategyBase):
                 free_f = self.initial_first = self.deposit_first
                 free_s = self.initial_second = Decimal()
 
-        self.account.funds.base = {'asset': self.base_asset, 'free': free_f, 'locked': Decimal()}
-        self.account.funds.quote = {'asset': self.quote_asset, 'free': free_s, 'locked': Decimal()}
+        self.account.init_funds(
+            {'asset': self.base_asset, 'free': free_f, 'locked': Decimal()},
+            {'asset': self.quote_asset, 'free': free_s, 'locked': Decimal()}
+        )
 
         # Restore orders
         orders = json.loads(saved_state.get('orders'))
@@ -2906,4 +2936,4 @@ class Strategy(StrategyBase):
         )
 
     def reset_vars_ex(self):
-        self.__init__(call_super=False)
+        self.__init__(self.prm, call_super=False)
@@ -4,7 +4,7 @@ martin-binance classes and methods definitions
 __author__ = "Jerry Fedorenko"
 __copyright__ = "Copyright © 2021 Jerry Fedorenko aka VM"
 __license__ = "MIT"
-__version__ = "3.1.6"
+__version__ = "3.1.9"
 __maintainer__ = "Jerry Fedorenko"
 __contact__ = "https://github.com/DogsTailFarmer"
 
@@ -269,6 +269,23 @@ class PrivateTrade:
         self.commission_asset = _trade.get('commissionAsset', "")
         self.timestamp = int(_trade["time"])
 
+    @classmethod
+    def from_fill(cls, event):
+        """
+        From the simulator FillEvent, its numbers are Decimal already
+        """
+        trade = cls.__new__(cls)
+        trade.amount = event.last_executed_quantity
+        trade.buy = event.side == 'BUY'
+        trade.is_maker = event.is_maker_side
+        trade.id = event.trade_id
+        trade.order_id = event.order_id
+        trade.price = event.last_executed_price
+        trade.commission = event.commission_amount
+        trade.commission_asset = event.commission_asset
+        trade.timestamp = event.transaction_time
+        return trade
+
     def __call__(self):
         return self
 
@@ -345,6 +362,22 @@ class Order:
         self.remaining_amount = self.amount - self.received_amount
         self.timestamp = int(order.get('transactTime', order.get('time', time.time())))
 
+    @classmethod
+    def from_fill(cls, event):
+        """
+        Partially filled order from the simulator FillEvent, its numbers are Decimal already
+        """
+        order = cls.__new__(cls)
+        order.amount = event.order_quantity
+        order.buy = event.side == 'BUY'
+        order.id = event.order_id
+        order.order_type = event.order_type
+        order.received_amount = event.cumulative_filled_quantity
+        order.price = event.order_price
+        order.remaining_amount = order.amount - order.received_amount
+        order.timestamp = event.transaction_time
+        return order
+
     def __call__(self):
         return self
 
@@ -497,9 +530,11 @@ class Klines:
     klines_series = {}
     klines_lim = int()
 
-    def __init__(self, _interval):
+    def __init__(self, _interval, klines_series: dict = None):
         self.interval = _interval
         self.kline = []
+        if klines_series is not None:
+            self.klines_series = klines_series  # Own series of the Strategy instance
         self.klines_series[_interval] = self.kline
 
     def refresh(self, _candle):
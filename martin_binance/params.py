@@ -4,7 +4,7 @@ martin-binance strategy parameters
 __author__ = "Jerry Fedorenko"
 __copyright__ = "Copyright © 2021-2025 Jerry Fedorenko aka VM"
 __license__ = "MIT"
-__version__ = "3.1.4"
+__version__ = "3.1.9"
 __maintainer__ = "Jerry Fedorenko"
 __contact__ = "https://github.com/DogsTailFarmer"
 
@@ -21,8 +21,12 @@ __all__ = [
     'BB_CANDLE_SIZE_IN_MINUTES', 'BB_NUMBER_OF_CANDLES', 'KBB', 'LINEAR_GRID_K', 'ADX_CANDLE_SIZE_IN_MINUTES',
     'ADX_NUMBER_OF_CANDLES', 'ADX_PERIOD', 'ADX_THRESHOLD', 'ADX_PRICE_THRESHOLD', 'REVERSE', 'REVERSE_TARGET_AMOUNT',
     'REVERSE_INIT_AMOUNT', 'REVERSE_STOP', 'HEAD_VERSION', 'LOAD_LAST_STATE', 'LAST_STATE_FILE', 'VPS_NAME', 'PARAMS',
-    'TELEGRAM_CONFIG', 'MODE', 'XTIME', 'SAVE_DS', 'SAVE_PERIOD', 'LOGGING', 'SELF_OPTIMIZATION', 'N_TRIALS',
-    'SESSION_RESULT', 'TRADE_CONTROL', 'TC_ADX_DATA_LIMIT', 'TC_ADX_PERIOD', 'TC_DI_DIFF', 'TC_K', 'GRID_ONLY_EXIT'
+    'TELEGRAM_CONFIG', 'MODE', 'XTIME', 'VIRTUAL_CLOCK', 'FIXED_POINT', 'SAVE_DS', 'SAVE_PERIOD', 'LOGGING',
+    'SELF_OPTIMIZATION', 'N_TRIALS', 'N_WORKERS', 'SESSION_RESULT', 'CHECKPOINT', 'TRADE_CONTROL', 'TC_ADX_DATA_LIMIT',
+    'TC_ADX_PERIOD', 'TC_DI_DIFF', 'TC_K', 'GRID_ONLY_EXIT', 'RAW_SOURCE', 'ARCHIVE_SESSIONS', 'PRUNER',
+    'PRUNE_INTERVAL', 'TRIAL', 'TRIAL_CACHE',
+    'FIDELITY', 'LOW_FIDELITY', 'PARETO', 'METRICS_INTERVAL',
+    'WARM_START', 'OPTIMIZER_DAEMON', 'SHARE_DATASET', 'GOVERNOR', 'ROBUSTNESS', 'STUDY_SHARE', 'FAST_FORWARD'
 ]
 
 SYMBOL = str()
@@ -100,15 +104,74 @@ TLG_INLINE = False
 # Backtesting
 MODE = 'T'  # 'T' - Trade, 'TC' - Trade and Collect, 'S' - Simulate
 XTIME = 1000  # Time accelerator
+VIRTUAL_CLOCK = False  # For MODE == 'S' replay on the simulated time as fast as possible, XTIME is ignored
+FAST_FORWARD = True  # With VIRTUAL_CLOCK skip the ticks that don't cross any order, see backtest/crossing_index.py
+FIXED_POINT = False  # For MODE == 'S' scaled integer accounting, prices and amounts must be on exchange grid
 SAVE_DS = False  # Save session result data (ticker, orders) for compare
 SAVE_PERIOD = 1 * 60 * 60  # sec, timetable for save data portion
 LOGGING = True
 SELF_OPTIMIZATION = True  # Cyclic self-optimization of parameters, together with MODE == 'TC'
 N_TRIALS = 250  # Number of optimization cycles for optuna study
+N_WORKERS = 1  # Processes for parallel trials of optuna study in self optimization mode
+WARM_START = 10  # Best trials of the previous cycle study that are re-evaluated first on the new session
+OPTIMIZER_DAEMON = False  # Submit self optimization to the running backtest/optimizer_daemon.py, else new process
+SHARE_DATASET = True  # Session is decoded once to shared memory for all trials of the study, see raw_data.share()
+STUDY_SHARE = None  # Folder on the shared disk, self optimization study is open there for backtest/optimizer_worker.py
+# Self optimization beside live trading {'nice': 10, 'cpus': [2, 3], 'workers': 2, 'ionice': 'idle',
+# 'lag': 0.2, 'resume': 0.05}: optimizer is throttled while event loop lag, sec, is above 'resume'
+# and suspended above 'lag', see backtest/governor.py
+GOVERNOR = None
 SESSION_RESULT = {}
+CHECKPOINT = None  # backtest.checkpoint.Checkpoint, set by optimizer for fork trials from the shared warm-up
+# Trials pruner {'type': 'median' | 'halving' | 'hyperband', **kwargs}, else from 'optimizer' of trial_params.json
+PRUNER = None
+PRUNE_INTERVAL = 60 * 60  # sec of simulated time between intermediate reports of trial for pruner
+TRIAL = None  # optuna.Trial, set by optimizer for intermediate reports
+TRIAL_CACHE = True  # Reuse the result of the same trial parameters on the same dataset, see backtest/trial_cache.py
+# Multi-fidelity study {'step': 10, 'share': 1.0, 'promote': 0.2, 'control': 0.05},
+# else from 'optimizer' of trial_params.json
+FIDELITY = None
+LOW_FIDELITY = None  # (step, share) for MODE == 'S', replay every step-th tick of the first share of session
+# Multi-objective study {'objectives': {'value': 'maximize', 'drawdown': 'minimize'}, 'limits': {'drawdown': 0.2}}
+# Metrics: value, profit, free, drawdown, reverse, cycles, locked, efficiency, see backtest/metrics.py
+# The front point within limits with the best first objective is applied, else from 'optimizer' of trial_params.json
+PARETO = None
+METRICS_INTERVAL = 60  # sec of simulated time between samples of session metrics
+# Best parameters are applied if their neighbours (one step on each parameter) and they on the first 'windows'
+# shares of session are profitable, in 'profitable' share of cases {'windows': [0.9, 0.8], 'profitable': 1.0},
+# else from 'optimizer' of trial_params.json
+ROBUSTNESS = None
+RAW_SOURCE = None  # For MODE == 'S' raw/ folder or raw_bak.zip to replay instead of the session, start from scratch
+ARCHIVE_SESSIONS = 0  # Keep raw_bak.zip of last N periods of MODE == 'TC' in ARCHIVE_PATH for walk-forward
 # Trade control
 TRADE_CONTROL = True
 TC_ADX_DATA_LIMIT = 60
 TC_ADX_PERIOD = 14
 TC_DI_DIFF = 5
 TC_K = {'1m': 1.0, '15m': 2.0, '1h': 0.5}
+
+
+class Params:
+    """
+    Snapshot of the module level parameters for one Strategy instance, changed by attribute, so several
+    instances (optimizer trials) can live in one process. Mutable values are copied, SESSION_RESULT is own
+    """
+    __slots__ = tuple(dict.fromkeys(k for k in (*globals(), *__annotations__) if k.isupper()))
+
+    def __init__(self, **kwargs):
+        _params = globals()
+        for key in self.__slots__:
+            value = kwargs.pop(key) if key in kwargs else _params.get(key)
+            setattr(self, key, value.copy() if isinstance(value, dict) else value)
+        if kwargs:
+            raise UserWarning(f"Unknown parameters: {', '.join(kwargs)}")
+
+    def update(self, **kwargs):
+        for key, value in kwargs.items():
+            if key not in self.__slots__:
+                raise UserWarning(f"Unknown parameter: {key}")
+            setattr(self, key, value)
+        return self
+
+    def copy(self, **kwargs):
+        return Params(**({key: getattr(self, key) for key in self.__slots__} | kwargs))
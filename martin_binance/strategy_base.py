@@ -4,7 +4,7 @@ martin-binance base class and methods definitions
 __author__ = "Jerry Fedorenko"
 __copyright__ = "Copyright © 2021-2025 Jerry Fedorenko aka VM"
 __license__ = "MIT"
-__version__ = "3.1.8"
+__version__ = "3.1.9"
 __maintainer__ = "Jerry Fedorenko"
 __contact__ = "https://github.com/DogsTailFarmer"
 
@@ -35,62 +35,63 @@ from tqdm import tqdm
 
 from exchanges_wrapper import martin as mr, Status, GRPCError
 
-import martin_binance.params as prm
-from martin_binance import LAST_STATE_PATH, BACKTEST_PATH, HEARTBEAT, KLINES_INIT, EQUAL_STR, ORDER_TIMEOUT
-from martin_binance.backtest.exchange_simulator import Account as backTestAccount
-from martin_binance.backtest.optimizer import OPTIMIZER, PARAMS_FLOAT
+from martin_binance import (
+    LAST_STATE_PATH, BACKTEST_PATH, ARCHIVE_PATH, HEARTBEAT, KLINES_INIT, EQUAL_STR, ORDER_TIMEOUT
+)
+from martin_binance.backtest.crossing_index import CrossingIndex
+from martin_binance.backtest.exchange_simulator import Account as backTestAccount, FillEvent, FixedPoint
+from martin_binance.backtest.governor import LagGovernor
+from martin_binance.backtest.grid_log import GridLog, GRID_LOG_PRKT
+from martin_binance.backtest.metrics import SessionMetrics
+from martin_binance.backtest.order_archive import ORDERS_PRKT
+from martin_binance.backtest.optimizer import JOURNAL, OPTIMIZER, PARAMS_FLOAT
+from martin_binance.backtest.optimizer_daemon import DaemonJob
+from martin_binance.backtest.raw_data import (
+    TICKER_PRKT, ORDER_BOOK_PRKT, TICKER_SCHEMA, ORDER_BOOK_SCHEMA, CANDLE_SCHEMA,
+    ticker_record, order_book_record, candle_record, batch_rows, first_row, RawSource, decimate
+)
+from martin_binance.backtest.virtual_clock import VirtualClock
 from martin_binance.client import Trade
 from martin_binance.lib import (
     Candle, TradingCapabilityManager, Ticker, FundsEntry, OrderBook, Style, any2str, PrivateTrade, Order,
     convert_from_minute, OrderUpdate, load_file, load_last_state, Klines, tasks_manage, tasks_cancel,
 )
-from martin_binance.params import GRID_ONLY, LOG_LEVEL
+from martin_binance.params import Params
 from martin_binance.telegram_proxy.tlg_client import TlgClient
 
-if prm.MODE == 'S':
-    logger = logging.getLogger('logger_S')
-else:
-    logger = logging.getLogger(f'logger.{__name__}')
-
 color_init()
 
-RATE_LIMITER = HEARTBEAT * (60 if prm.GRID_ONLY else 10)
+RATE_LIMITER = HEARTBEAT * 10
+RATE_LIMITER_GRID_ONLY = HEARTBEAT * 60
 KLINES_LIM = 50  # Number of candles must be <= 1000
 CANCEL_ALL_ORDERS = True  # Ask about cancel all active orders before start strategy and par.LOAD_LAST_STATE = 0
 TRADES_LIST_LIMIT = 50
 TRY_LIMIT = 10
 PYARROW_BATCH_BUFFER_SIZE = 20480  # Rows
-ORDER_BOOK_PRKT = "order_book.parquet"
-TICKER_PRKT = "ticker.parquet"
+SETTLE_LIMIT = 100  # Max event loop passes for wait strategy tasks before the virtual clock step
 MS_ORDER_ID = 'ms.order_id'
 MS_ORDERS = 'ms.orders'
 O_DEC = Decimal()
-SAVE_TRADE_QUEUE = asyncio.Queue()
-
-TLG_CHAT_ID = prm.TELEGRAM_CONFIG['chat_id']
-TLG_DELAY = prm.TELEGRAM_CONFIG['heartbeat']
-for bot in prm.TELEGRAM_CONFIG['Bots']:
-    if prm.ID_EXCHANGE in bot['id_exchange']:
-        TLG_TOKEN = bot['token']
-        break
 
 
-async def refresh_t_asset(connection_db, key, value, used):
+async def refresh_t_asset(connection_db, id_exchange, key, value, used):
     await connection_db.execute(
         'DELETE FROM t_asset\
          WHERE id_exchange=:id_exchange\
          AND currency=:currency\
          AND use=:use',
-        {'id_exchange': prm.ID_EXCHANGE, 'currency': key, 'use': used}
+        {'id_exchange': id_exchange, 'currency': key, 'use': used}
     )
     await connection_db.execute(
         'INSERT into t_asset values(?, ?, ?, ?, ?)',
-        (prm.ID_EXCHANGE, key, float(value), used, int(time.time()))
+        (id_exchange, key, float(value), used, int(time.time()))
     )
 
 
 class StrategyBase(metaclass=ABCMeta):
-    def __init__(self):
+    def __init__(self, params: Params = None):
+        self.prm = params or Params()  # Parameters of this instance, see params.Params
+        self.logger = logging.getLogger('logger_S' if self.prm.MODE == 'S' else f'logger.{__name__}')
         self.session = None
         self.client = None
         self.exchange = str()
@@ -105,10 +106,12 @@ class StrategyBase(metaclass=ABCMeta):
         self.order_book = {}
         self.order_id = int(datetime.now().strftime("%f%S%M"))
         self.trades = []  # List of trades associated with strategy (limit = TRADES_LIST_LIMIT)
+        self.save_trade_queue = asyncio.Queue()
         self.orders = {}  # {int(id): Order(), } of orders associated with strategy
+        self.klines_series = {}  # {interval: [Candle]} for Klines of this instance
         self.tcm = None  # TradingCapabilityManager
         self.last_state = None
-        self.rate_limiter = RATE_LIMITER
+        self.rate_limiter = RATE_LIMITER_GRID_ONLY if self.prm.GRID_ONLY else RATE_LIMITER
         self.start_time_ms = int(time.time() * 1000)
         self.send_request = None
         self.for_request = None
@@ -122,7 +125,9 @@ class StrategyBase(metaclass=ABCMeta):
         self.tasks = set()
         #
         self.time_operational = {'ts': 0.0, 'diff': 0.0, 'new': 0.0}  # - See get_time()
+        self.clock = None  # VirtualClock for MODE == 'S' and VIRTUAL_CLOCK
         self.account = None
+        self.portfolio = None  # backtest.portfolio.PortfolioReplay for MODE == 'S' of several pairs in one process
         self.get_buffered_funds_last_time = self.get_time()
         self.status_time = None  # + Last time sending status message
         self.tlg_header = ''  # - Header for Telegram message
@@ -130,15 +135,15 @@ class StrategyBase(metaclass=ABCMeta):
         self.start_collect = None
         self.s_mode_break = None
         self.backtest_process = None
+        self.governor = None  # LagGovernor of the backtest_process
         # Init in reset_backtest_vars()
         self.s_ticker = None
         self.s_order_book = None
         self.klines = None
         self.candles = None
-        self.grid_buy = None
-        self.grid_sell = None
+        self.grid_log = None
         #
-        if prm.MODE in ('TC', 'S'):
+        if self.prm.MODE in ('TC', 'S'):
             self.reset_backtest_vars()
         #
         self.cycle_time = None  # + Cycle start time
@@ -155,10 +160,10 @@ class StrategyBase(metaclass=ABCMeta):
         self.candles = {}
         for i in KLINES_INIT:
             self.candles.update({f"pylist_{i.value}": []})
-        self.grid_buy = {}
-        self.grid_sell = {}
+        self.grid_log = None
 
     def reset_vars(self):
+        self.clock = None
         self.account = None
         self.ticker = {}
         self.funds = {}
@@ -167,8 +172,10 @@ class StrategyBase(metaclass=ABCMeta):
         self.trades = []  # List of trades associated with strategy (limit = TRADES_LIST_LIMIT)
         self.orders = {}  # Set of orders associated with strategy
         self.get_buffered_funds_last_time = self.get_time()
-        self.rate_limiter = RATE_LIMITER
+        self.rate_limiter = RATE_LIMITER_GRID_ONLY if self.prm.GRID_ONLY else RATE_LIMITER
         self.start_time_ms = int(time.time() * 1000)
+        if source := self.backtest.get('source'):
+            source.close()
         self.backtest = {}
         self.bulk_orders_cancel = {}
         self.time_operational = {'ts': 0.0, 'diff': 0.0, 'new': 0.0}
@@ -220,8 +227,8 @@ class StrategyBase(metaclass=ABCMeta):
     def get_buffered_open_order(self, _id) -> Order:
         return self.orders.get(_id)
 
-    @staticmethod
     def get_buffered_recent_candles(
+            self,
             candle_size_in_minutes: int | str,
             number_of_candles: int = 50,
             include_current_building_candle: bool = False
@@ -230,13 +237,15 @@ class StrategyBase(metaclass=ABCMeta):
             size = convert_from_minute(candle_size_in_minutes)
         else:
             size = candle_size_in_minutes
-        kline = Klines.get_kline(size)
+        kline = self.klines_series.get(size, [])
         if len(kline) > number_of_candles + 1:
             return kline[-number_of_candles - (0 if include_current_building_candle else 1):
                          None if include_current_building_candle else -1]
         return kline[:None if include_current_building_candle else -1]
 
     def get_time(self) -> float:
+        if self.clock:
+            return self.clock.now
         current_time = time.time()
         if self.time_operational['new']:
             diff = current_time - self.time_operational['diff'] if self.time_operational['diff'] else 0.0
@@ -247,8 +256,86 @@ class StrategyBase(metaclass=ABCMeta):
             last = current_time
         return last
 
+    async def sleep(self, delay: float) -> None:
+        """
+        Strategy time delay, on the virtual clock in simulate mode
+        """
+        if self.clock:
+            await self.clock.sleep(delay)
+        else:
+            await asyncio.sleep(delay)
+
+    async def settle(self, *args) -> None:
+        """
+        Give all strategy tasks a chance to finish or to wait for the virtual clock.
+        Task that still waits after SETTLE_LIMIT passes is on real I/O, the clock goes on without it,
+        so the replay may differ from run to run. It is logged once per coroutine for the session
+        """
+        current = asyncio.current_task()
+        for _ in range(SETTLE_LIMIT):
+            pending = [t for t in (*self.tasks, *args) if not (t.done() or t is current or t in self.clock.sleepers)]
+            if not pending:
+                break
+            await asyncio.sleep(0)
+        else:
+            names = {getattr(t.get_coro(), '__qualname__', t.get_name()) for t in pending if not t.done()}
+            if new := names - self.backtest.setdefault('settle_pending', set()):
+                self.backtest['settle_pending'] |= new
+                self.message_log(
+                    f"Virtual clock step while tasks wait for real I/O: {', '.join(sorted(new))},"
+                    f" replay may be nondeterministic",
+                    log_level=logging.WARNING
+                )
+
+    async def clock_run(self, main_task):
+        """
+        Discrete-event loop for simulate mode: fire virtual clock timers in order, without real sleeping
+        """
+        while True:
+            await self.settle(main_task)
+            if not self.clock.timers or not self.checkpoint_fork() or not self.trial_report():
+                break
+            res = self.clock.step()
+            if asyncio.iscoroutine(res):
+                tasks_manage(self.tasks, res)
+
+    def checkpoint_fork(self) -> bool:
+        """
+        Fork optimizer trials when the replay reach CHECKPOINT, see backtest/checkpoint.py
+        :return: False in the parent process after all trials, its simulation is not needed more
+        """
+        if self.prm.CHECKPOINT is None:
+            return True
+        if not self.prm.CHECKPOINT.due(self.get_time() - self.backtest['ticker_index_first'] / 1000):
+            return True
+        if self.prm.CHECKPOINT.fork():
+            return True
+        self.s_mode_break = True
+        asyncio.get_event_loop().stop()
+        return False
+
+    def trial_report(self) -> bool:
+        """
+        Report session value (profit + free) to the optimizer TRIAL every PRUNE_INTERVAL of simulated time
+        :return: False if the trial is pruned, the replay is stopped
+        """
+        if self.prm.TRIAL is None:
+            return True
+        step = int((self.get_time() - self.backtest['ticker_index_first'] / 1000) // self.prm.PRUNE_INTERVAL)
+        if step <= self.backtest.get('trial_step', 0):
+            return True
+        self.backtest['trial_step'] = step
+        value = self.get_sum_profit() + self.get_free_assets(mode='free', backtest=True)[2]
+        self.prm.TRIAL.report(float(value), step)
+        if not self.prm.TRIAL.should_prune():
+            return True
+        self.prm.SESSION_RESULT['pruned'] = step
+        self.s_mode_break = True
+        tasks_manage(self.tasks, self.stop_replay())
+        return False
+
     async def transfer_to(self, symbol: str, amount: str, email=None):  # NOSONAR S7503
-        if prm.MODE in ('T', 'TC'):
+        if self.prm.MODE in ('T', 'TC'):
             if email:
                 tasks_manage(self.tasks, self.transfer2sub(email, symbol, amount))
             else:
@@ -263,28 +350,28 @@ class StrategyBase(metaclass=ABCMeta):
         return self.order_id
 
     def message_log(self, msg: str, log_level=logging.INFO, tlg=False, color=Style.WHITE, tlg_inline=False) -> None:
-        if prm.LOGGING:
+        if self.prm.LOGGING:
             if tlg and color == Style.WHITE:
                 color = Style.B_WHITE
             if log_level >= logging.ERROR:
                 tlg = True
                 color = Style.B_RED
             color_msg = color + msg + Style.RESET if color else msg
-            if log_level >= prm.LOG_LEVEL:
-                if prm.MODE in ('T', 'TC'):
+            if log_level >= self.prm.LOG_LEVEL:
+                if self.prm.MODE in ('T', 'TC'):
                     print(f"{datetime.now().strftime('%d/%m %H:%M:%S')} {color_msg}")
                 else:
                     tqdm.write(f"{datetime.fromtimestamp(self.get_time()).strftime('%H:%M:%S.%f')[:-3]} {color_msg}")
-            if prm.MODE in ('T', 'TC'):
-                logger.log(log_level, msg)
+            if self.prm.MODE in ('T', 'TC'):
+                self.logger.log(log_level, msg)
                 self.status_time = self.get_time()
                 if tlg and self.tlg_client:
                     tasks_manage(
                         self.tasks,
-                        self.tlg_client.post_message(msg, inline_buttons=tlg_inline and prm.TLG_INLINE)
+                        self.tlg_client.post_message(msg, inline_buttons=tlg_inline and self.prm.TLG_INLINE)
                     )
         elif log_level >= logging.ERROR:
-            logger.log(log_level, msg)
+            self.logger.log(log_level, msg)
 
     def order_exist(self, _id) -> bool:
         return bool(self.orders.get(int(_id)))
@@ -323,25 +410,51 @@ class StrategyBase(metaclass=ABCMeta):
         while True:
             await asyncio.sleep(delay)
             try:
-                if self.operational_status and self.start_collect and time.time() - ts > prm.SAVE_PERIOD:
+                if self.operational_status and self.start_collect and time.time() - ts > self.prm.SAVE_PERIOD:
                     self.start_collect = False
                     self.session_data_handler()
                     self.reset_backtest_vars()
-                    if prm.SELF_OPTIMIZATION and self.command != 'stopped':
+                    if self.prm.SELF_OPTIMIZATION and self.command != 'stopped':
                         _ts = datetime.now(timezone.utc).replace(tzinfo=None)
                         storage_name = Path(self.session_root, "_study.db")
+                        storage = f"sqlite:///{storage_name}"
+                        warm_storage = f"sqlite:///{Path(self.session_root, 'study.db')}"  # Previous cycle
+                        if self.prm.STUDY_SHARE:
+                            # Journal per cycle, so late trials of the other hosts don't get into the next study
+                            share = Path(self.prm.STUDY_SHARE, self.session_root.name)
+                            share.mkdir(parents=True, exist_ok=True)
+                            logs = sorted(share.glob("*.log"))
+                            warm_storage = f"{JOURNAL}{logs[-1]}" if logs else ''
+                            storage_name = Path(share, f"{_ts:%Y%m%d-%H%M%S}.log")
+                            storage = f"{JOURNAL}{storage_name}"
+                        args = (
+                            f"{self.exchange}_{self.symbol}",
+                            Path(self.session_root, Path(self.prm.PARAMS).name),
+                            str(self.prm.N_TRIALS),
+                            storage,
+                            json.dumps(prm_best or _prm_best),
+                            f"{self.prm.ID_EXCHANGE}_{self.prm.SYMBOL}_S.log",
+                            str(self.prm.N_WORKERS),
+                            warm_storage,
+                        )
                         try:
-                            self.backtest_process = await asyncio.create_subprocess_exec(
-                                OPTIMIZER,
-                                f"{self.exchange}_{self.symbol}",
-                                Path(self.session_root, Path(prm.PARAMS).name),
-                                str(prm.N_TRIALS),
-                                f"sqlite:///{storage_name}",
-                                json.dumps(prm_best or _prm_best),
-                                f"{prm.ID_EXCHANGE}_{prm.SYMBOL}_S.log",
-                                stdout=asyncio.subprocess.PIPE
-                            )
-                            stdout, _ = await self.backtest_process.communicate()
+                            if self.prm.OPTIMIZER_DAEMON:
+                                try:
+                                    self.backtest_process = await asyncio.to_thread(DaemonJob, args)
+                                except OSError as ex:
+                                    self.message_log(f"Optimizer daemon: {ex}, start optimizer process",
+                                                     log_level=logging.WARNING)
+                            if self.backtest_process:
+                                self.governor = LagGovernor.start(self.backtest_process.pid, self.prm.GOVERNOR)
+                                stdout, _ = await asyncio.to_thread(self.backtest_process.communicate)
+                            else:
+                                self.backtest_process = await asyncio.create_subprocess_exec(
+                                    OPTIMIZER,
+                                    *args,
+                                    stdout=asyncio.subprocess.PIPE
+                                )
+                                self.governor = LagGovernor.start(self.backtest_process.pid, self.prm.GOVERNOR)
+                                stdout, _ = await self.backtest_process.communicate()
                         except Exception as ex:
                             self.message_log(f"Backtest process: {ex}", log_level=logging.ERROR)
                         else:
@@ -354,7 +467,20 @@ class StrategyBase(metaclass=ABCMeta):
                                 self.message_log(f"Backtest control: response {_res}", log_level=logging.ERROR)
                         #
                         self.backtest_process = None
-                        storage_name.replace(storage_name.with_name('study.db'))
+                        if self.governor:
+                            if paused := self.governor.stop():
+                                self.message_log(f"Optimizer was suspended by event loop lag for {paused:.0f}s")
+                            self.governor = None
+                        if self.prm.STUDY_SHARE:
+                            [p.unlink(missing_ok=True) for p in storage_name.parent.glob("*.log") if p != storage_name]
+                        else:
+                            for ext in ('', '-wal', '-shm'):  # SQLite in WAL mode, see optimizer.study_storage()
+                                src = storage_name.with_name(f"{storage_name.name}{ext}")
+                                dst = storage_name.with_name(f"study.db{ext}")
+                                if src.exists():
+                                    src.replace(dst)
+                                else:
+                                    dst.unlink(missing_ok=True)
                         if prm_best:
                             if '_value' in prm_best:
                                 _prm_best = dict(prm_best)
@@ -362,24 +488,25 @@ class StrategyBase(metaclass=ABCMeta):
                                     f"Updating parameters from backtest,"
                                     f" predicted value {prm_best.pop('_value')} -> {prm_best.pop('new_value')}",
                                     color=Style.B_WHITE,
-                                    tlg=LOG_LEVEL == logging.DEBUG
+                                    tlg=self.prm.LOG_LEVEL == logging.DEBUG
                                 )
                                 for key, value in prm_best.items():
-                                    self.message_log(f"{key}: {getattr(prm, key)} -> {value}")
+                                    self.message_log(f"{key}: {getattr(self.prm, key)} -> {value}")
                                     setattr(
-                                        prm, key,
+                                        self.prm, key,
                                         value if isinstance(value, int) or key in PARAMS_FLOAT else Decimal(f"{value}")
                                     )
                             else:
                                 continue
                         # noinspection PyTypeChecker
                         l_m = str(
-                            datetime.now(timezone.utc).replace(tzinfo=None) - _ts + timedelta(seconds=prm.SAVE_PERIOD)
+                            datetime.now(timezone.utc).replace(tzinfo=None) - _ts +
+                            timedelta(seconds=self.prm.SAVE_PERIOD)
                         ).rsplit('.')[0]
                         self.message_log(
                             f"Strategy parameters are optimal now. Optimization cycle duration {l_m}",
                             color=Style.B_WHITE,
-                            tlg=LOG_LEVEL == logging.DEBUG
+                            tlg=self.prm.LOG_LEVEL == logging.DEBUG
                         )
                         restart = True
                     else:
@@ -411,7 +538,7 @@ class StrategyBase(metaclass=ABCMeta):
                     #
                     self.start_collect = True
                     ts = time.time()
-                    self.message_log("Start data collect", tlg=LOG_LEVEL == logging.DEBUG)
+                    self.message_log("Start data collect", tlg=self.prm.LOG_LEVEL == logging.DEBUG)
             except (asyncio.CancelledError, KeyboardInterrupt):
                 break
             except Exception as err:
@@ -428,7 +555,7 @@ class StrategyBase(metaclass=ABCMeta):
         if _ticker := self.s_ticker['pylist']:
             # noinspection PyArgumentList
             self.s_ticker['writer'].write_batch(
-                pa.RecordBatch.from_pylist(mapping=_ticker)
+                pa.RecordBatch.from_pylist(mapping=_ticker, schema=TICKER_SCHEMA)
             )
             self.s_ticker['pylist'].clear()
         self.s_ticker['writer'].close()
@@ -437,7 +564,7 @@ class StrategyBase(metaclass=ABCMeta):
         if _order_book := self.s_order_book['pylist']:
             # noinspection PyArgumentList
             self.s_order_book['writer'].write_batch(
-                pa.RecordBatch.from_pylist(mapping=_order_book)
+                pa.RecordBatch.from_pylist(mapping=_order_book, schema=ORDER_BOOK_SCHEMA)
             )
             self.s_order_book['pylist'].clear()
         self.s_order_book['writer'].close()
@@ -452,73 +579,105 @@ class StrategyBase(metaclass=ABCMeta):
             if _candles := self.candles[f"pylist_{i.value}"]:
                 # noinspection PyArgumentList
                 self.candles[f"writer_{i.value}"].write_batch(
-                    pa.RecordBatch.from_pylist(mapping=_candles)
+                    pa.RecordBatch.from_pylist(mapping=_candles, schema=CANDLE_SCHEMA)
                 )
                 self.candles[f"pylist_{i.value}"].clear()
             self.candles[f"writer_{i.value}"].close()
 
-        if prm.SAVE_DS:
-            # Save session detail for analytics
-            session_data = Path(self.session_root, "snapshot")
-            session_data.mkdir(parents=True, exist_ok=True)
-            #
-            df_grid_sell = pd.DataFrame().from_dict(self.grid_sell, orient='index')
-            df_grid_sell.index = pd.to_datetime(df_grid_sell.index, unit='ms')
-            df_grid_sell.to_pickle(Path(session_data, "sell.pkl"))
-            #
-            df_grid_buy = pd.DataFrame().from_dict(self.grid_buy, orient='index')
-            df_grid_buy.index = pd.to_datetime(df_grid_buy.index, unit='ms')
-            df_grid_buy.to_pickle(Path(session_data, "buy.pkl"))
+        if self.grid_log:
+            # Session detail for analytics
+            self.grid_log.close()
+            self.grid_log = None
 
         make_archive(str(Path(self.session_root, "raw_bak")), 'zip', self.session_root, 'raw')
         self.message_log(f"Stream data for backtesting saved to {self.session_root}")
+        if self.prm.ARCHIVE_SESSIONS:
+            self.archive_session()
+
+    def archive_session(self):
+        """
+        Keep copy of raw_bak.zip for walk-forward, only the last ARCHIVE_SESSIONS copies are kept
+        """
+        archive_path = Path(ARCHIVE_PATH, f"{self.exchange}_{self.symbol}")
+        archive_path.mkdir(parents=True, exist_ok=True)
+        copy(
+            Path(self.session_root, "raw_bak.zip"),
+            Path(archive_path, f"{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}.zip")
+        )
+        for path in sorted(archive_path.glob("*.zip"))[:-self.prm.ARCHIVE_SESSIONS]:
+            path.unlink()
 
     def parquet_declare(self, raw_path):
         """
         pyarrow and parquet declare
         """
-        schema = pa.schema([("key", pa.int64()), ("row", pa.binary())])
-        self.s_ticker['writer'] = pq.ParquetWriter(Path(raw_path, TICKER_PRKT), schema=schema)
-        self.s_order_book['writer'] = pq.ParquetWriter(Path(raw_path, ORDER_BOOK_PRKT), schema=schema)
+        self.s_ticker['writer'] = pq.ParquetWriter(Path(raw_path, TICKER_PRKT), schema=TICKER_SCHEMA)
+        self.s_order_book['writer'] = pq.ParquetWriter(Path(raw_path, ORDER_BOOK_PRKT), schema=ORDER_BOOK_SCHEMA)
         for i in KLINES_INIT:
             self.candles[f"writer_{i.value}"] = pq.ParquetWriter(Path(
-                raw_path, f"candles_{i.value}.parquet"), schema=schema
+                raw_path, f"candles_{i.value}.parquet"), schema=CANDLE_SCHEMA
             )
+        if self.prm.SAVE_DS:
+            session_data = Path(raw_path.parent, "snapshot")
+            session_data.mkdir(parents=True, exist_ok=True)
+            self.grid_log = GridLog(Path(session_data, GRID_LOG_PRKT))
+
+    def sample_metrics(self, force=False):
+        """
+        Session metrics sample every METRICS_INTERVAL of simulated time, MODE 'S' only
+        """
+        now = self.get_time()
+        if (metrics := self.backtest.get('metrics')) is None:
+            metrics = self.backtest['metrics'] = SessionMetrics(now)
+        elif not force and now - metrics.ts < self.prm.METRICS_INTERVAL:
+            return
+        metrics.update(
+            now,
+            float(self.get_free_assets()[2]),
+            float(self.get_free_assets(mode='reserved')[2]),
+            self.reverse
+        )
 
     async def back_test_handler(self):
         # Test result handler
-        s_profit = prm.SESSION_RESULT['profit'] = f"{self.get_sum_profit()}"
-        s_free = prm.SESSION_RESULT['free'] = f"{self.get_free_assets(mode='free', backtest=True)[2]}"
-        if prm.LOGGING:
+        s_profit = self.prm.SESSION_RESULT['profit'] = f"{self.get_sum_profit()}"
+        s_free = self.prm.SESSION_RESULT['free'] = f"{self.get_free_assets(mode='free', backtest=True)[2]}"
+        self.sample_metrics(force=True)
+        self.prm.SESSION_RESULT |= self.backtest['metrics'].result(
+            float(s_profit) + float(s_free),
+            self.cycle_buy_count + self.cycle_sell_count
+        )
+        if self.prm.LOGGING:
             print(f"Session profit: {s_profit}, free: {s_free}, total: {float(s_profit) + float(s_free)}")
             test_time = datetime.now(timezone.utc).replace(tzinfo=None) - self.cycle_time
             original_time = (self.backtest['ticker_index_last'] - self.backtest['ticker_index_first']) / 1000
             original_time = timedelta(seconds=original_time)
             print(f"Original time: {original_time}, test time: {test_time}, x = {original_time / test_time:.2f}")
-        if prm.SAVE_DS:
+        if self.prm.SAVE_DS:
             self._back_test_handler_ext()
+        if self.prm.CHECKPOINT and self.prm.CHECKPOINT.child:
+            self.prm.CHECKPOINT.done(self.prm.SESSION_RESULT)
+        await self.stop_replay()
 
+    async def stop_replay(self):
         self.session.channel.close()
-        await tasks_cancel(self.tasks, name='wss', log_out=prm.LOGGING)
+        if self.portfolio:
+            # Other pairs go on in this event loop
+            self.portfolio.finish(self)
+            await tasks_cancel(self.tasks, log_out=self.prm.LOGGING)
+            return
+        await tasks_cancel(self.tasks, name='wss', log_out=self.prm.LOGGING)
         asyncio.get_event_loop().stop()
 
     def _back_test_handler_ext(self):
-        # Save test data
-        session_path = Path(BACKTEST_PATH,
-                            f"{self.exchange}_{self.symbol}_{datetime.now().strftime('%m%d-%H-%M-%S')}")
-        session_path.mkdir(parents=True)
+        # Save test data, grid history and terminal orders are already streamed to session_path by account
+        session_path = self.backtest['session_path']
+        self.account.close()
         ds_ticker = pd.Series(self.account.ticker).astype(float)
         ds_ticker.index = pd.to_datetime(ds_ticker.index, unit='ms')
-        df_grid_sell = pd.DataFrame().from_dict(self.account.grid_sell, orient='index').astype(float)
-        df_grid_sell.index = pd.to_datetime(df_grid_sell.index, unit='ms')
-        df_grid_buy = pd.DataFrame().from_dict(self.account.grid_buy, orient='index').astype(float)
-        df_grid_buy.index = pd.to_datetime(df_grid_buy.index, unit='ms')
-        #
         ds_ticker.to_pickle(Path(session_path, "ticker.pkl"))
-        df_grid_sell.to_pickle(Path(session_path, "sell.pkl"))
-        df_grid_buy.to_pickle(Path(session_path, "buy.pkl"))
-        copy(prm.PARAMS, Path(session_path, Path(prm.PARAMS).name))
-        if prm.LOGGING:
+        copy(self.prm.PARAMS, Path(session_path, Path(self.prm.PARAMS).name))
+        if self.prm.LOGGING:
             print(f"Session data saved to: {session_path}")
 
     def restore_state_before_backtesting(self):
@@ -541,15 +700,17 @@ class StrategyBase(metaclass=ABCMeta):
 
         last_exec_time = time.time()
         self.scheduler_start()
+        if self.clock:
+            return
         while True:
             try:
-                if prm.MODE in ('T', 'TC'):
+                if self.prm.MODE in ('T', 'TC'):
                     last_state = self.save_strategy_state()
                     self.last_state_update(last_state)
                     # print(f"heartbeat.last_state: {last_state}")
-                    if prm.LAST_STATE_FILE.exists():
-                        prm.LAST_STATE_FILE.replace(prm.LAST_STATE_FILE.with_suffix('.prev'))
-                    with prm.LAST_STATE_FILE.open(mode='w') as outfile:
+                    if self.prm.LAST_STATE_FILE.exists():
+                        self.prm.LAST_STATE_FILE.replace(self.prm.LAST_STATE_FILE.with_suffix('.prev'))
+                    with self.prm.LAST_STATE_FILE.open(mode='w') as outfile:
                         # noinspection PyTypeChecker
                         json.dump(last_state, outfile, sort_keys=True, indent=4, ensure_ascii=False)
                     #
@@ -627,8 +788,8 @@ class StrategyBase(metaclass=ABCMeta):
                 # Refresh actual balance
                 default_balance = {'free': '0.0', 'locked': '0.0'}
 
-                if self.exchange == 'binance' and Decimal(prm.FEE_BNB["target_amount"]) and \
-                        not (prm.FEE_FIRST and prm.FEE_SECOND) and (prm.FEE_MAKER or prm.FEE_TAKER):
+                if self.exchange == 'binance' and Decimal(self.prm.FEE_BNB["target_amount"]) and \
+                        not (self.prm.FEE_FIRST and self.prm.FEE_SECOND) and (self.prm.FEE_MAKER or self.prm.FEE_TAKER):
 
                     await self.fee_generate_bnb_request(balances, self.connection_db, default_balance)
 
@@ -679,9 +840,9 @@ class StrategyBase(metaclass=ABCMeta):
                         {'timestamp': time.time() - max_use_update}
                     )
                     for key, value in assets_fw.items():
-                        await refresh_t_asset(self.connection_db, key, value, used=0)
+                        await refresh_t_asset(self.connection_db, self.prm.ID_EXCHANGE, key, value, used=0)
                     for key, value in assets.items():
-                        await refresh_t_asset(self.connection_db, key, value, used=0)
+                        await refresh_t_asset(self.connection_db, self.prm.ID_EXCHANGE, key, value, used=0)
                     await self.connection_db.commit()
                 except aiosqlite.Error as err:
                     self.message_log(f"Refresh t_asset: {err}")
@@ -694,12 +855,12 @@ class StrategyBase(metaclass=ABCMeta):
         _price = await self.send_request(
             self.stub.fetch_symbol_price_ticker,
             mr.MarketRequest,
-            symbol=prm.FEE_BNB['symbol'].replace('/', '')
+            symbol=self.prm.FEE_BNB['symbol'].replace('/', '')
         )
         price = _price.to_pydict()['price']
         if (Decimal(bnb) * Decimal(price) <=
-                max(self.tcm.min_notional, Decimal(prm.FEE_BNB['target_amount']))):
-            bot_id = f"{prm.EXCHANGE[prm.FEE_BNB['id_exchange']]}, {prm.FEE_BNB['symbol']}"
+                max(self.tcm.min_notional, Decimal(self.prm.FEE_BNB['target_amount']))):
+            bot_id = f"{self.prm.EXCHANGE[self.prm.FEE_BNB['id_exchange']]}, {self.prm.FEE_BNB['symbol']}"
             try:
                 cursor = await connection_db.execute(
                     'SELECT max(message_id), text_in\
@@ -713,8 +874,8 @@ class StrategyBase(metaclass=ABCMeta):
                 row = None
                 self.message_log(f"SELECT from t_control: {err}")
 
-            if row and (row[0] is None or prm.FEE_BNB['email'] not in row[1]):
-                msg = json.dumps(['BNB_request', prm.FEE_BNB])
+            if row and (row[0] is None or self.prm.FEE_BNB['email'] not in row[1]):
+                msg = json.dumps(['BNB_request', self.prm.FEE_BNB])
                 try:
                     await connection_db.execute(
                         'insert into t_control values(?,?,?,?)',
@@ -724,7 +885,7 @@ class StrategyBase(metaclass=ABCMeta):
                 except aiosqlite.Error as err:
                     self.message_log(f"INSERT into t_control: {err}", log_level=logging.ERROR)
                 else:
-                    self.message_log(f"BNB request was generated from {bot_id} to {prm.FEE_BNB['email']}",
+                    self.message_log(f"BNB request was generated from {bot_id} to {self.prm.FEE_BNB['email']}",
                                      color=Style.BLUE)
 
     @staticmethod
@@ -737,24 +898,26 @@ class StrategyBase(metaclass=ABCMeta):
         self.s_mode_break = True
         if self.backtest_process:
             self.backtest_process.terminate()
+            if self.governor:
+                self.governor.stop()
             self.message_log("Backtest process was terminated", color=Style.GREEN)
         await asyncio.sleep(HEARTBEAT)
-        if prm.MODE in ('T', 'TC'):
+        if self.prm.MODE in ('T', 'TC'):
             try:
                 await self.send_request(self.stub.stop_stream, mr.MarketRequest, symbol=self.symbol)
             except Exception as ex:
                 self.message_log(f"ask_exit: {ex}", log_level=logging.WARNING)
 
             self.session.channel.close()
-            await tasks_cancel(self.tasks, name='wss', log_out=prm.LOGGING)
+            await tasks_cancel(self.tasks, name='wss', log_out=self.prm.LOGGING)
 
-            if prm.MODE == 'TC' and self.start_collect:
+            if self.prm.MODE == 'TC' and self.start_collect:
                 # Save stream data for backtesting
                 self.start_collect = False
                 self.session_data_handler()
 
-            if prm.LAST_STATE_FILE.exists():
-                print(f"Current state saved into {prm.LAST_STATE_FILE}")
+            if self.prm.LAST_STATE_FILE.exists():
+                print(f"Current state saved into {self.prm.LAST_STATE_FILE}")
 
             if self.tlg_client:
                 await self.tlg_client.close()
@@ -768,7 +931,7 @@ class StrategyBase(metaclass=ABCMeta):
             except TimeoutError:
                 self.message_log("Task cancel timed out")
 
-            if prm.LOGGING:
+            if self.prm.LOGGING:
                 print(f"Cancelling {len(tasks)} outstanding tasks")
             await self.stop()
 
@@ -795,7 +958,7 @@ class StrategyBase(metaclass=ABCMeta):
         return {}
 
     async def on_funds_update(self):
-        if prm.MODE in ('T', 'TC'):
+        if self.prm.MODE in ('T', 'TC'):
             try:
                 async for _funds in self.for_request(
                         self.stub.on_funds_update, mr.OnFundsUpdateRequest,
@@ -827,24 +990,29 @@ class StrategyBase(metaclass=ABCMeta):
 
     async def loop_ds(self, ds, ticker=False):
         while not self.start_collect:
-            await asyncio.sleep(0.010)
+            await self.sleep(0.010)
 
         batches = ds.iter_batches(PYARROW_BATCH_BUFFER_SIZE)
         index_prev = 0
         for batch in batches:
-            for row in batch.to_pylist():
-                index = row.pop('key') / 1000
-                if ticker:
+            for index, row in batch_rows(batch):
+                index /= 1000
+                if self.clock:
+                    # Discrete-event replay, time is moved by clock_run()
+                    delay = 0
+                    await self.clock.sleep_until(index, feed=True)
+                elif ticker:
                     self.time_operational['new'] = index
                     delay = index - index_prev if index_prev else 0
-                    index_prev = index
                 else:
                     delay = index - self.get_time()
+                if ticker:
+                    index_prev = index
 
                 if delay > 0:
-                    delay /= prm.XTIME
+                    delay /= self.prm.XTIME
                     await asyncio.sleep(delay)
-                yield orjson.loads(row['row'])
+                yield row
 
                 if self.s_mode_break:
                     break
@@ -855,6 +1023,43 @@ class StrategyBase(metaclass=ABCMeta):
         if ticker:
             self.backtest['ticker_index_last'] = index_prev * 1000
 
+    async def loop_ds_fast_forward(self):
+        """
+        Ticker replay on the virtual clock. Ticks that don't cross any order or threshold are skipped,
+        except the last one before the next strategy timer, so the strategy see the same state
+        """
+        while not self.start_collect:
+            await self.sleep(0.010)
+
+        ci = self.backtest['crossing_index']
+        i = 0
+        while i < len(ci):
+            self.backtest['ticks_skipped'] = 0
+            if i:
+                # All reactions to the previous tick are settled and have their timers
+                await self.clock.sleep_until(self.clock.now)
+                low, high, until = self.fast_forward_bounds()
+                stop = max(i, ci.before(until))
+                k = ci.next_crossing(i, stop, low, high)
+                if k == stop:
+                    k = max(stop - 1, i)
+                self.backtest['ticks_skipped'] = k - i
+                i = k
+            await self.clock.sleep_until(float(ci.keys[i]), feed=True)
+            yield ci.row(i)
+            i += 1
+            if self.s_mode_break:
+                break
+
+        self.backtest['ticker_index_last'] = float(ci.keys[i - 1]) * 1000 if i else 0
+
+    def fast_forward_bounds(self) -> tuple[float, float, float]:
+        """
+        Ticker price corridor (low, high) and time limit where ticks can be skipped in MODE 'S'
+        """
+        low, high = self.account.ticker_corridor()
+        return low, high, self.clock.horizon()
+
     async def aiter_candles(self, _klines: dict[str, Klines], _i: str):
         self.s_mode_break = None
         async for row in self.loop_ds(self.backtest[f"candles_{_i}"]):
@@ -865,6 +1070,8 @@ class StrategyBase(metaclass=ABCMeta):
         self.message_log(f"Backtest candles *** {_i} *** timeSeries ended")
 
     def open_orders_snapshot(self, ts=None):
+        if not self.grid_log:
+            return
         orders_buy = {}
         orders_sell = {}
         for k, order in self.orders.items():
@@ -872,13 +1079,12 @@ class StrategyBase(metaclass=ABCMeta):
                 orders_buy[k] = order.price
             else:
                 orders_sell[k] = order.price
-        self.grid_buy.update({ts or int(time.time() * 1000): pd.Series(orders_buy)})
-        self.grid_sell.update({ts or int(time.time() * 1000): pd.Series(orders_sell)})
+        self.grid_log.snapshot(ts or int(time.time() * 1000), orders_buy, orders_sell)
 
     async def cancel_order(self, order_id: int, cancel_all=False):
         _fetch_order = False
         try:
-            if prm.MODE in ('T', 'TC'):
+            if self.prm.MODE in ('T', 'TC'):
                 if cancel_all:
                     if order_id not in self.bulk_orders_cancel:
                         res = await self.send_request(
@@ -919,7 +1125,7 @@ class StrategyBase(metaclass=ABCMeta):
                 self.message_log(f"Cancel order {order_id}: Warning, not result getting")
                 _fetch_order = True
         finally:
-            if prm.MODE in ('T', 'TC') and _fetch_order:
+            if self.prm.MODE in ('T', 'TC') and _fetch_order:
                 res = await self.fetch_order(order_id, _filled_update_call=True)
                 if res.get('status') in ('CANCELED', 'EXPIRED_IN_MATCH'):
                     await self.cancel_order_handler(order_id, cancel_all)
@@ -935,9 +1141,9 @@ class StrategyBase(metaclass=ABCMeta):
         self.message_log(f"Cancel order {_id} success", color=Style.GREEN)
         self.remove_from_orders_lists([_id])
         await self.on_cancel_order_success(_id, cancel_all=cancel_all)
-        if prm.MODE == 'TC' and prm.SAVE_DS and self.start_collect:
+        if self.prm.MODE == 'TC' and self.prm.SAVE_DS and self.start_collect:
             self.open_orders_snapshot()
-        elif prm.MODE == 'S':
+        elif self.prm.MODE == 'S':
             await self.on_funds_update()
 
     async def transfer2master(self, symbol: str, amount: str):
@@ -983,7 +1189,7 @@ class StrategyBase(metaclass=ABCMeta):
 
     async def buffered_funds(self, print_info: bool = True):
         try:
-            if prm.MODE in ('T', 'TC'):
+            if self.prm.MODE in ('T', 'TC'):
                 res = await self.send_request(self.stub.fetch_account_information, mr.OpenClientConnectionId)
                 balances = list(map(json.loads, res.items))
             else:
@@ -1004,7 +1210,7 @@ class StrategyBase(metaclass=ABCMeta):
             funds = {self.base_asset: {'free': balance_f['free'], 'locked': balance_f['locked']},
                      self.quote_asset: {'free': balance_s['free'], 'locked': balance_s['locked']}}
             self.funds = funds
-            if print_info and prm.LOGGING:
+            if print_info and self.prm.LOGGING:
                 print(EQUAL_STR)
                 print(f"Base asset balance: {balance_f}")
                 print(f"Quote asset balance: {balance_s}")
@@ -1028,7 +1234,7 @@ class StrategyBase(metaclass=ABCMeta):
             else:
                 self.info_symbol = _exchange_info_symbol.to_pydict()
                 self.tcm = TradingCapabilityManager(self.info_symbol)
-                if prm.MODE == 'S':
+                if self.prm.MODE == 'S':
                     break
             await asyncio.sleep(600)
 
@@ -1037,13 +1243,11 @@ class StrategyBase(metaclass=ABCMeta):
         klines = {}
         klines_from_file = {}
         kline = []
-        if prm.MODE == 'S':
-            async with aiofiles.open(Path(self.session_root, "raw/klines.json"), "r") as file:
-                klines_from_file = await file.read()
-                klines_from_file = json.loads(klines_from_file)
+        if self.prm.MODE == 'S':
+            klines_from_file = self.backtest['source'].klines()
 
         for i in KLINES_INIT:
-            if prm.MODE in ('T', 'TC'):
+            if self.prm.MODE in ('T', 'TC'):
                 try:
                     res = await self.send_request(
                         self.stub.fetch_klines, mr.FetchKlinesRequest,
@@ -1056,12 +1260,12 @@ class StrategyBase(metaclass=ABCMeta):
                     raise UserWarning
                 if res:
                     kline = list(map(json.loads, res.items))
-                    if prm.MODE == 'TC' and (self.start_collect or self.start_collect is None):
+                    if self.prm.MODE == 'TC' and (self.start_collect or self.start_collect is None):
                         self.klines[i.value] = kline
             else:
                 kline = klines_from_file.get(i.value, [])
 
-            kline_i = Klines(i.value)
+            kline_i = Klines(i.value, self.klines_series)
             for candle in kline:
                 kline_i.refresh(candle)
             klines[i.value] = kline_i
@@ -1075,23 +1279,26 @@ class StrategyBase(metaclass=ABCMeta):
 
     async def on_klines_update(self, _klines: dict[str, Klines]):
         _intervals = list(_klines.keys())
-        if prm.MODE in ('T', 'TC'):
+        if self.prm.MODE in ('T', 'TC'):
             try:
                 async for res in self.for_request(self.stub.on_klines_update, mr.FetchKlinesRequest,
                                                   symbol=self.symbol,
                                                   interval=json.dumps(_intervals)):
                     candle = json.loads(res.candle)
                     _klines.get(res.interval).refresh(candle)
-                    if prm.MODE == 'TC' and (self.start_collect or self.start_collect is None):
+                    if self.prm.MODE == 'TC' and (self.start_collect or self.start_collect is None):
                         if len(self.candles[f"pylist_{res.interval}"]) > PYARROW_BATCH_BUFFER_SIZE:
                             # noinspection PyArgumentList
                             self.candles[f"writer_{res.interval}"].write_batch(
-                                pa.RecordBatch.from_pylist(mapping=self.candles[f"pylist_{res.interval}"])
+                                pa.RecordBatch.from_pylist(
+                                    mapping=self.candles[f"pylist_{res.interval}"],
+                                    schema=CANDLE_SCHEMA
+                                )
                             )
                             self.candles[f"pylist_{res.interval}"].clear()
 
                         self.candles[f"pylist_{res.interval}"].append(
-                            {"key": int(time.time() * 1000), "row": orjson.dumps(candle)}
+                            candle_record(int(time.time() * 1000), candle)
                         )
             except Exception as ex:
                 self.message_log(f"Exception on WSS, on_klines_update loop closed: {ex}", log_level=logging.WARNING)
@@ -1107,7 +1314,7 @@ class StrategyBase(metaclass=ABCMeta):
         _fetch_order = False
         msg = None
         try:
-            if prm.MODE in ('T', 'TC'):
+            if self.prm.MODE in ('T', 'TC'):
                 ts = time.time()
                 res = await self.send_request(
                     self.stub.create_limit_order, mr.CreateLimitOrderRequest,
@@ -1120,7 +1327,10 @@ class StrategyBase(metaclass=ABCMeta):
                 result = res.to_pydict()
                 self.delay_ordering_s = time.time() - ts
             else:
-                await asyncio.sleep(self.delay_ordering_s / prm.XTIME)
+                if self.clock:
+                    await self.clock.sleep(self.delay_ordering_s)
+                else:
+                    await asyncio.sleep(self.delay_ordering_s / self.prm.XTIME)
                 result = self.account.create_order(
                     symbol=self.symbol,
                     client_order_id=str(_id),
@@ -1146,7 +1356,7 @@ class StrategyBase(metaclass=ABCMeta):
                 _fetch_order = True
                 msg = f"Creating order {_id}: no result getting"
         finally:
-            if prm.MODE in ('T', 'TC') and _fetch_order:
+            if self.prm.MODE in ('T', 'TC') and _fetch_order:
                 await asyncio.sleep(HEARTBEAT)
                 await self.fetch_created_order(_id, msg)
 
@@ -1168,25 +1378,21 @@ class StrategyBase(metaclass=ABCMeta):
 
             await self.on_place_order_success(_id, order)
 
-            if prm.MODE == 'S':
+            if self.prm.MODE == 'S':
                 await self.on_funds_update()
-            elif prm.MODE == 'TC' and self.start_collect:
+            elif self.prm.MODE == 'TC' and self.start_collect:
                 executed_qty = Decimal(result['executedQty'])
                 cummulative_quote_qty = Decimal(result['cummulativeQuoteQty'])
                 if executed_qty > 0 and self.s_ticker['pylist']:
-                    s_tic = self.s_ticker['pylist'].pop()
-                    s_tic_row = orjson.loads(s_tic['row'])
-                    s_tic_row['lastPrice'] = str(cummulative_quote_qty / executed_qty)
-                    s_tic['row'] = orjson.dumps(s_tic_row)
-                    self.s_ticker['pylist'].append(s_tic)
-                if prm.SAVE_DS:
+                    self.s_ticker['pylist'][-1]['lastPrice'] = str(cummulative_quote_qty / executed_qty)
+                if self.prm.SAVE_DS:
                     self.open_orders_snapshot()
 
     async def on_balance_update(self):
         try:
             async for res in self.for_request(self.stub.on_balance_update, mr.MarketRequest, symbol=self.symbol):
                 _res = json.loads(res.event)
-                await SAVE_TRADE_QUEUE.put(
+                await self.save_trade_queue.put(
                     ['TRANSFER',
                      _res["event_time"],
                      _res["asset"],
@@ -1213,28 +1419,52 @@ class StrategyBase(metaclass=ABCMeta):
         else:
             self.message_log("WSS: on_order_update loop closed", log_level=logging.DEBUG)
 
+    @staticmethod
+    def event_order(ed) -> dict:
+        """
+        Order of the execution report, as placed order response
+        """
+        return {
+            "symbol": ed['symbol'],
+            "orderId": ed['order_id'],
+            "orderListId": -1,
+            "clientOrderId": ed["client_order_id"],
+            "transactTime": ed["transaction_time"],
+            "price": ed['order_price'],
+            "origQty": ed['order_quantity'],
+            "executedQty": ed["cumulative_filled_quantity"],
+            "cummulativeQuoteQty": ed["quote_asset_transacted"],
+            "status": ed['order_status'],
+            "timeInForce": ed['time_in_force'],
+            "type": ed['order_type'],
+            "side": ed['side'],
+            "workingTime": ed['order_creation_time'],
+            "selfTradePreventionMode": "NONE"
+        }
+
+    async def on_fill_event(self, ed: FillEvent):
+        """
+        MODE 'S' execution report of the simulator, same flow as on_order_update_handler()
+        on the event attributes, which are Decimal already
+        """
+        if self.symbol != ed.symbol:
+            return
+        if ed.order_id not in self.orders and ed.client_order_id.isnumeric():
+            await self.create_order_handler(int(ed.client_order_id), self.event_order(ed))
+        if not ed.cumulative_filled_quantity:
+            return
+        if ed.order_status == 'FILLED':
+            self.orders.pop(ed.order_id, None)
+        elif ed.order_status == 'PARTIALLY_FILLED':
+            self.orders[ed.order_id] = Order.from_fill(ed)
+        if self.trade_not_exist(ed.order_id, ed.trade_id):
+            await self._on_order_update_handler_ext(ed, PrivateTrade.from_fill(ed), ed.order_quantity)
+
     async def on_order_update_handler(self, ed):
         if self.symbol != ed['symbol']:
             return
         if not self.order_exist(ed['order_id']) and ed["client_order_id"].isnumeric():
-            _ed = {
-                "symbol": ed['symbol'],
-                "orderId": ed['order_id'],
-                "orderListId": -1,
-                "clientOrderId": ed["client_order_id"],
-                "transactTime": ed["transaction_time"],
-                "price": ed['order_price'],
-                "origQty": ed['order_quantity'],
-                "executedQty": ed["cumulative_filled_quantity"],
-                "cummulativeQuoteQty": ed["quote_asset_transacted"],
-                "status": ed['order_status'],
-                "timeInForce": ed['time_in_force'],
-                "type": ed['order_type'],
-                "side": ed['side'],
-                "workingTime": ed['order_creation_time'],
-                "selfTradePreventionMode": "NONE"
-            }
-            await self.create_order_handler(int(ed["client_order_id"]), _ed)
+            await self.create_order_handler(int(ed["client_order_id"]), self.event_order(ed))
 
         if not Decimal(ed["cumulative_filled_quantity"]):
             return
@@ -1256,9 +1486,20 @@ class StrategyBase(metaclass=ABCMeta):
             self.orders |= {ed['order_id']: Order(_order)}
 
         if self.trade_not_exist(ed["order_id"], ed["trade_id"]):
-            await self._on_order_update_handler_ext(ed)
-            if prm.MODE in ('T', 'TC'):
-                await SAVE_TRADE_QUEUE.put(
+            trade = {
+                "qty": ed['last_executed_quantity'],
+                "isBuyer": ed['side'] == 'BUY',
+                "isMaker": ed['is_maker_side'],
+                "id": ed['trade_id'],
+                "orderId": ed['order_id'],
+                "price": ed['last_executed_price'],
+                "commission": ed['commission_amount'],
+                "commissionAsset": ed['commission_asset'],
+                "time": ed['transaction_time'],
+            }
+            await self._on_order_update_handler_ext(ed, PrivateTrade(trade), Decimal(ed['order_quantity']))
+            if self.prm.MODE in ('T', 'TC'):
+                await self.save_trade_queue.put(
                     ["TRADE" if ed['is_maker_side'] else "TRADE_BY_MARKET",
                      ed["transaction_time"],
                      ed["side"],
@@ -1273,33 +1514,19 @@ class StrategyBase(metaclass=ABCMeta):
                      ed["last_executed_price"]]
                 )
 
-        if prm.MODE == 'TC' and self.start_collect and self.s_ticker['pylist']:
-            s_tic = self.s_ticker['pylist'].pop()
-            s_tic_row = orjson.loads(s_tic['row'])
-            s_tic_row['lastPrice'] = ed['last_executed_price']
+        if self.prm.MODE == 'TC' and self.start_collect and self.s_ticker['pylist']:
+            s_tic = self.s_ticker['pylist'][-1]
+            s_tic['lastPrice'] = ed['last_executed_price']
             if ed['order_status'] == 'PARTIALLY_FILLED':
-                s_tic_row['Qty'] = ed['last_executed_quantity']
-            s_tic['row'] = orjson.dumps(s_tic_row)
-            self.s_ticker['pylist'].append(s_tic)
-            if prm.SAVE_DS:
+                s_tic['Qty'] = ed['last_executed_quantity']
+            if self.prm.SAVE_DS:
                 self.open_orders_snapshot()
 
-    async def _on_order_update_handler_ext(self, ed):
-        trade = {
-            "qty": ed['last_executed_quantity'],
-            "isBuyer": ed['side'] == 'BUY',
-            "isMaker": ed['is_maker_side'],
-            "id": ed['trade_id'],
-            "orderId": ed['order_id'],
-            "price": ed['last_executed_price'],
-            "commission": ed['commission_amount'],
-            "commissionAsset": ed['commission_asset'],
-            "time": ed['transaction_time'],
-        }
-        self.trades.append(PrivateTrade(trade))
+    async def _on_order_update_handler_ext(self, ed, trade: PrivateTrade, order_quantity: Decimal):
+        self.trades.append(trade)
         # noinspection PyStatementEffect
         self.trades[-TRADES_LIST_LIMIT:]
-        if ed['order_status'] == 'FILLED' and self.order_trades_sum(ed['order_id']) < Decimal(ed['order_quantity']):
+        if ed['order_status'] == 'FILLED' and self.order_trades_sum(ed['order_id']) < order_quantity:
             self.message_log(f"Order: {ed['order_id']} was missed partially filling event", log_level=logging.INFO)
             ed['order_status'] = 'PARTIALLY_FILLED'
         await self.on_order_update_ex(OrderUpdate(ed, self.trades))
@@ -1309,7 +1536,7 @@ class StrategyBase(metaclass=ABCMeta):
         row = {'openPrice': '26923.97000000', 'lastPrice': '26882.51000000', 'closeTime': 1684572464013}
         :return:
         """
-        if prm.MODE in ('T', 'TC'):
+        if self.prm.MODE in ('T', 'TC'):
             try:
                 async for _ticker in self.for_request(
                         self.stub.on_ticker_update,
@@ -1319,17 +1546,17 @@ class StrategyBase(metaclass=ABCMeta):
                     self.ticker = _ticker.to_pydict()
                     await self.on_new_ticker(Ticker(self.ticker))
                     #
-                    if prm.MODE == 'TC' and self.start_collect:
+                    if self.prm.MODE == 'TC' and self.start_collect:
                         ts = int(time.time() * 1000)
                         self.ticker |= {'delay': self.delay_ordering_s, 'Qty': "0"}
                         if len(self.s_ticker['pylist']) > PYARROW_BATCH_BUFFER_SIZE:
                             # noinspection PyArgumentList
                             self.s_ticker['writer'].write_batch(
-                                pa.RecordBatch.from_pylist(mapping=self.s_ticker['pylist'])
+                                pa.RecordBatch.from_pylist(mapping=self.s_ticker['pylist'], schema=TICKER_SCHEMA)
                             )
                             self.s_ticker['pylist'].clear()
-                        self.s_ticker['pylist'].append({"key": ts, "row": orjson.dumps(self.ticker)})
-                        if prm.SAVE_DS:
+                        self.s_ticker['pylist'].append(ticker_record(ts, self.ticker))
+                        if self.prm.SAVE_DS:
                             self.open_orders_snapshot(ts=ts)
             except Exception as ex:
                 self.message_log(f"Exception on WSS, on_ticker_update loop closed: {ex}", log_level=logging.WARNING)
@@ -1338,31 +1565,36 @@ class StrategyBase(metaclass=ABCMeta):
             else:
                 self.message_log("WSS: on_ticker_update loop closed", log_level=logging.DEBUG)
         else:
-            if prm.LOGGING:
+            if self.prm.LOGGING:
                 pbar = tqdm(total=self.backtest['ticker'].metadata.num_rows)
             self.s_mode_break = None
-            async for row in self.loop_ds(self.backtest['ticker'], ticker=True):
-                self.delay_ordering_s = row.pop('delay', 0)
+            if self.clock and self.prm.FAST_FORWARD and not self.prm.SAVE_DS:
+                ds = self.loop_ds_fast_forward()
+            else:
+                ds = self.loop_ds(self.backtest['ticker'], ticker=True)
+            async for row in ds:
+                self.delay_ordering_s = row.get('delay', 0)
                 self.ticker = row
                 await self.on_new_ticker(Ticker(row))
                 res = self.account.on_ticker_update(row, int(self.get_time() * 1000))
                 for _res in res:
-                    await self.on_order_update_handler(_res)
+                    await self.on_fill_event(_res)
                     await self.on_funds_update()
-                if prm.LOGGING:
+                self.sample_metrics()
+                if self.prm.LOGGING:
                     # noinspection PyUnboundLocalVariable
-                    pbar.update()
+                    pbar.update(1 + self.backtest.get('ticks_skipped', 0))
                 # noinspection PyUnreachableCode
                 if self.s_mode_break:
                     break
-            if prm.LOGGING:
+            if self.prm.LOGGING:
                 pbar.close()
             self.message_log("Backtest *** ticker *** timeSeries ended")
             self.s_mode_break = True
             await self.back_test_handler()
 
     async def on_order_book_update(self):
-        if prm.MODE in ('T', 'TC'):
+        if self.prm.MODE in ('T', 'TC'):
             try:
                 async for _order_book in self.for_request(
                         self.stub.on_order_book_update,
@@ -1371,17 +1603,20 @@ class StrategyBase(metaclass=ABCMeta):
                 ):
                     self.order_book = order_book_prepare(_order_book)
                     self.on_new_order_book(OrderBook(self.order_book))
-                    if prm.MODE == 'TC' and self.start_collect:
+                    if self.prm.MODE == 'TC' and self.start_collect:
                         self.order_book['bids'] = self.order_book['bids'][:1]
                         self.order_book['asks'] = self.order_book['asks'][:1]
                         if len(self.s_order_book['pylist']) > PYARROW_BATCH_BUFFER_SIZE:
                             # noinspection PyArgumentList
                             self.s_order_book['writer'].write_batch(
-                                pa.RecordBatch.from_pylist(mapping=self.s_order_book['pylist'])
+                                pa.RecordBatch.from_pylist(
+                                    mapping=self.s_order_book['pylist'],
+                                    schema=ORDER_BOOK_SCHEMA
+                                )
                             )
                             self.s_order_book['pylist'].clear()
                         self.s_order_book['pylist'].append(
-                            {"key": int(time.time() * 1000), "row": orjson.dumps(self.order_book)}
+                            order_book_record(int(time.time() * 1000), self.order_book)
                         )
             except Exception as ex:
                 self.message_log(f"Exception on WSS, on_order_book_update loop closed: {ex}", log_level=logging.WARNING)
@@ -1425,7 +1660,7 @@ class StrategyBase(metaclass=ABCMeta):
                     self.message_log(
                         "Restore saved state after restart",
                         color=Style.GREEN,
-                        tlg=not prm.GRID_ONLY
+                        tlg=not self.prm.GRID_ONLY
                     )
                     await self.restore_strategy_state(restore=True)
 
@@ -1446,7 +1681,7 @@ class StrategyBase(metaclass=ABCMeta):
                         if res.get('status') in ('CANCELED', 'EXPIRED_IN_MATCH'):
                             await self.cancel_order_handler(_id, cancel_all=False)
 
-                if self.last_state and prm.MODE == 'TC':
+                if self.last_state and self.prm.MODE == 'TC':
                     last_state = self.save_strategy_state()
                     self.last_state_update(last_state)
                     with self.state_file.open(mode='w') as outfile:
@@ -1521,7 +1756,7 @@ class StrategyBase(metaclass=ABCMeta):
         await self.buffered_candle()
         tasks_manage(self.tasks, self.on_ticker_update(), name='wss')
         tasks_manage(self.tasks, self.on_order_book_update(), name='wss')
-        if prm.MODE in ('T', 'TC'):
+        if self.prm.MODE in ('T', 'TC'):
             # User Stream
             tasks_manage(self.tasks, self.on_funds_update(), name='wss')
             tasks_manage(self.tasks, self.on_order_update(), name='wss')
@@ -1530,7 +1765,7 @@ class StrategyBase(metaclass=ABCMeta):
     async def wss_init(self, rerise=False):
         if self.client_id:
             self.message_log(f"Init WSS, client_id: {self.client_id}")
-            await tasks_cancel(self.tasks, name='wss-', log_out=prm.LOGGING)
+            await tasks_cancel(self.tasks, name='wss-', log_out=self.prm.LOGGING)
             await asyncio.sleep(HEARTBEAT)
             try:
                 await self.wss_declare()
@@ -1555,19 +1790,33 @@ class StrategyBase(metaclass=ABCMeta):
             await asyncio.sleep(random.randint(HEARTBEAT, HEARTBEAT * 5))  # NOSONAR python:S2245
             self.wss_fire_up = True
 
+    def tlg_config(self) -> tuple:
+        """
+        (token, chat_id, delay) of Telegram bot for ID_EXCHANGE
+        """
+        token = next(
+            (bot['token'] for bot in self.prm.TELEGRAM_CONFIG['Bots'] if self.prm.ID_EXCHANGE in bot['id_exchange']),
+            None
+        )
+        return token, self.prm.TELEGRAM_CONFIG['chat_id'], self.prm.TELEGRAM_CONFIG['heartbeat']
+
+    def trades_file(self) -> Path:
+        return Path(LAST_STATE_PATH, f"{self.prm.ID_EXCHANGE}_{self.prm.SYMBOL}.csv")
+
     async def tlg_get_command(self):
+        tlg_delay = self.tlg_config()[2]
         while True:
             try:
                 command = await self.tlg_client.get_update()
             except Exception as ex:
                 self.message_log(f"Can't get command from Tlg proxy, trying later: {ex}", log_level=logging.WARNING)
                 command = None
-                await asyncio.sleep(TLG_DELAY * 10)
+                await asyncio.sleep(tlg_delay * 10)
             if command:
                 if command == 'exit':
                     raise SystemExit(1)
                 self.command = command
-            await asyncio.sleep(TLG_DELAY)
+            await asyncio.sleep(tlg_delay)
 
     async def main(self, _symbol):  # NOSONAR
         restore_state = None
@@ -1577,10 +1826,10 @@ class StrategyBase(metaclass=ABCMeta):
         try:
             if self.session is None:
                 self.symbol = _symbol
-                if len(prm.EXCHANGE) > prm.ID_EXCHANGE:
-                    account_name = prm.EXCHANGE[prm.ID_EXCHANGE]
+                if len(self.prm.EXCHANGE) > self.prm.ID_EXCHANGE:
+                    account_name = self.prm.EXCHANGE[self.prm.ID_EXCHANGE]
                 else:
-                    print(f"ID_EXCHANGE = {prm.ID_EXCHANGE} not in list. See readme 'Add new exchange'")
+                    print(f"ID_EXCHANGE = {self.prm.ID_EXCHANGE} not in list. See readme 'Add new exchange'")
                     raise SystemExit(1)
                 self.session = Trade(
                     account_name=account_name,
@@ -1592,13 +1841,13 @@ class StrategyBase(metaclass=ABCMeta):
                 self.update_vars(self.session)
                 # noinspection PyTypeChecker
                 send_request = self.session.send_request
-                if prm.LOGGING:
+                if self.prm.LOGGING:
                     print(f"main.account_name: {account_name}")  # lgtm [py/clear-text-logging-sensitive-data]
                     print(f"main.exchange: {self.exchange}")
                     print(f"main.client_id: {self.client_id}")
                     print(f"main.srv_version: {self.session.client.srv_version}")
                 #
-                if prm.MODE in ('T', 'TC'):
+                if self.prm.MODE in ('T', 'TC'):
                     # Check and Cancel ALL ACTIVE ORDER
                     try:
                         _active_orders = await send_request(
@@ -1614,10 +1863,10 @@ class StrategyBase(metaclass=ABCMeta):
                             print(f"Order: {order['orderId']}({order['clientOrderId']}), side: {order['side']},"
                                   f" amount: {order['origQty']}, price:{order['price']}, status: {order['status']}")
                     # Try load last strategy state from saved files
-                    last_state = load_last_state(prm.LAST_STATE_FILE)
+                    last_state = load_last_state(self.prm.LAST_STATE_FILE)
                     restore_state = bool(last_state)
                     print(f"main.restore_state: {restore_state}")
-                    if CANCEL_ALL_ORDERS and active_orders and not prm.LOAD_LAST_STATE:
+                    if CANCEL_ALL_ORDERS and active_orders and not self.prm.LOAD_LAST_STATE:
                         answer = await asyncio.to_thread(
                             input,
                             'Are you want cancel all active order for this pair? Y:\n'
@@ -1644,14 +1893,14 @@ class StrategyBase(metaclass=ABCMeta):
                 tasks_manage(self.tasks, self.get_exchange_info(send_request, _symbol))
                 while not self.info_symbol:
                     await asyncio.sleep(0.1)
-                if prm.LOGGING:
+                if self.prm.LOGGING:
                     filters = self.info_symbol.get('filters')
                     for _filter in filters:
                         print(f"{filters.get(_filter).pop('filterType')}: {filters.get(_filter)}")
                 # init Strategy class var
                 self.base_asset = self.info_symbol.get('baseAsset')
                 self.quote_asset = self.info_symbol.get('quoteAsset')
-                if prm.MODE in ('T', 'TC'):
+                if self.prm.MODE in ('T', 'TC'):
                     # region Get and processing Order book
                     _order_book = await self.send_request(
                         self.stub.fetch_order_book,
@@ -1679,17 +1928,17 @@ class StrategyBase(metaclass=ABCMeta):
                     )
                     self.ticker = _ticker.to_pydict()
                 #
-                if prm.MODE in ('TC', 'S'):
+                if self.prm.MODE in ('TC', 'S'):
                     self.session_root = Path(BACKTEST_PATH, f"{self.exchange}_{self.symbol}")
                     self.state_file = Path(self.session_root, "saved_state.json")
                     raw_path = Path(self.session_root, "raw")
-                    if prm.MODE == 'TC':
+                    if self.prm.MODE == 'TC':
                         BACKTEST_PATH.mkdir(parents=True, exist_ok=True)
                         rmtree(self.session_root, ignore_errors=True)
                         self.session_root.mkdir(parents=True, exist_ok=True)
                         raw_path.mkdir(parents=True, exist_ok=True)
                         #
-                        copy(prm.PARAMS, Path(self.session_root, Path(prm.PARAMS).name))
+                        copy(self.prm.PARAMS, Path(self.session_root, Path(self.prm.PARAMS).name))
                         self.parquet_declare(raw_path)
             #
             else:
@@ -1698,34 +1947,45 @@ class StrategyBase(metaclass=ABCMeta):
                 self.reset_vars()
                 self.reset_vars_ex()
             #
-            if prm.MODE == 'S':
-                self.account = backTestAccount(prm.SAVE_DS)
-                self.account.funds.base = {
-                    'asset': self.base_asset,
-                    'free': prm.AMOUNT_FIRST,
-                    'locked': Decimal()
-                }
-                self.account.funds.quote = {
-                    'asset': self.quote_asset,
-                    'free': prm.AMOUNT_SECOND,
-                    'locked': Decimal()
-                }
-                self.account.fee_maker = prm.FEE_MAKER
-                self.account.fee_taker = prm.FEE_TAKER
-                # ticker
+            if self.prm.MODE == 'S':
+                grid_log = spill = None
+                if self.prm.SAVE_DS:
+                    session_path = Path(
+                        BACKTEST_PATH,
+                        f"{self.exchange}_{self.symbol}_{datetime.now().strftime('%m%d-%H-%M-%S')}"
+                    )
+                    session_path.mkdir(parents=True)
+                    self.backtest['session_path'] = session_path
+                    grid_log = GridLog(Path(session_path, GRID_LOG_PRKT))
+                    spill = Path(session_path, ORDERS_PRKT)
+                if self.portfolio:
+                    self.account = self.portfolio.open_account(self)
+                else:
+                    fees = (self.prm.FEE_MAKER, self.prm.FEE_TAKER)
+                    self.account = backTestAccount(
+                        self.prm.SAVE_DS,
+                        FixedPoint(self.tcm, fees) if self.prm.FIXED_POINT else None,
+                        grid_log,
+                        spill
+                    )
+                    self.account.init_funds(
+                        {'asset': self.base_asset, 'free': self.prm.AMOUNT_FIRST, 'locked': Decimal()},
+                        {'asset': self.quote_asset, 'free': self.prm.AMOUNT_SECOND, 'locked': Decimal()}
+                    )
+                    self.account.set_fee(self.prm.FEE_MAKER, self.prm.FEE_TAKER)
                 # noinspection PyUnboundLocalVariable
-                self.backtest['ticker'] = pq.ParquetFile(Path(raw_path, TICKER_PRKT))
-                ticker_first_row = next(self.backtest['ticker'].iter_batches(batch_size=1)).to_pylist()[0]
-                self.ticker = orjson.loads(ticker_first_row['row'])
-                self.backtest['ticker_index_first'] = ticker_first_row['key']
+                source = self.backtest['source'] = RawSource(self.prm.RAW_SOURCE or raw_path)
+                # ticker
+                self.backtest['ticker'] = source.parquet(TICKER_PRKT)
+                if self.prm.LOW_FIDELITY:
+                    self.backtest['ticker'] = decimate(self.backtest['ticker'], *self.prm.LOW_FIDELITY)
+                self.backtest['ticker_index_first'], self.ticker = first_row(self.backtest['ticker'])
                 # order_book
-                self.backtest['order_book'] = pq.ParquetFile(Path(raw_path, ORDER_BOOK_PRKT))
-                self.order_book = orjson.loads(
-                    next(self.backtest['order_book'].iter_batches(batch_size=1)).to_pylist()[0]['row']
-                )
+                self.backtest['order_book'] = source.parquet(ORDER_BOOK_PRKT)
+                _, self.order_book = first_row(self.backtest['order_book'])
                 # candles
                 for i in KLINES_INIT:
-                    self.backtest[f"candles_{i.value}"] = pq.ParquetFile(Path(raw_path, f"candles_{i.value}.parquet"))
+                    self.backtest[f"candles_{i.value}"] = source.parquet(f"candles_{i.value}.parquet")
 
             await self.buffered_funds()
             answer = str()
@@ -1737,12 +1997,12 @@ class StrategyBase(metaclass=ABCMeta):
                         'Saved state was "stopped". Press Enter for continue or Ctrl-Z for Cancel\n'
                     )
                     last_state["command"] = 'null'
-                if not prm.LOAD_LAST_STATE:
+                if not self.prm.LOAD_LAST_STATE:
                     answer = await asyncio.to_thread(
                         input,
                         'Restore saved state after restart? Y:\n'
                     )
-                if prm.LOAD_LAST_STATE or answer.lower() == 'y':
+                if self.prm.LOAD_LAST_STATE or answer.lower() == 'y':
                     self.message_log("Load saved state after restart", color=Style.GREEN)
                     self.last_state = last_state
                     # Restore StrategyBase class var
@@ -1763,7 +2023,7 @@ class StrategyBase(metaclass=ABCMeta):
                                 log_level=logging.WARNING,
                                 color=Style.YELLOW
                             )
-                    [self.trades.append(PrivateTrade(trade)) for trade in load_from_csv()]
+                    [self.trades.append(PrivateTrade(trade)) for trade in load_from_csv(self.trades_file())]
                     #
                     await self.restore_strategy_state(strategy_state=last_state, restore=False)
                     #
@@ -1772,7 +2032,7 @@ class StrategyBase(metaclass=ABCMeta):
                     restore_state = False
 
             if not restore_state:
-                if prm.MODE in ('T', 'TC'):
+                if self.prm.MODE in ('T', 'TC'):
                     await self.init()
                     await asyncio.to_thread(
                         input,
@@ -1781,33 +2041,52 @@ class StrategyBase(metaclass=ABCMeta):
                 else:
                     # Set initial local time from backtest data
                     self.time_operational['new'] = self.backtest['ticker_index_first'] / 1000
+                    if self.prm.VIRTUAL_CLOCK:
+                        # Pairs of the portfolio replay run on one simulated time
+                        self.clock = (
+                            self.portfolio.clock if self.portfolio else VirtualClock(self.time_operational['new'])
+                        )
+                        if self.prm.FAST_FORWARD and not self.prm.SAVE_DS:
+                            self.backtest['crossing_index'] = CrossingIndex(self.backtest['ticker'])
                     self.get_buffered_funds_last_time = self.get_time()
                     self.start_time_ms = int(self.get_time() * 1000)
                     self.cycle_time = datetime.now(timezone.utc).replace(tzinfo=None)
                     #
                     await self.wss_declare()
-                    if self.state_file.exists():
+                    if self.portfolio:
+                        self.portfolio.ready(self)
+                    elif self.clock:
+                        tasks_manage(self.tasks, self.clock_run(asyncio.current_task()))
+                    restore = not self.prm.RAW_SOURCE and self.state_file.exists()
+                    if restore:
                         self.restore_state_before_backtesting()
+                    # Default checkpoint: data and saved state are loaded, init() depends on the trial parameters
+                    if not self.checkpoint_fork():
+                        return
+                    if restore:
                         await self.init(check_funds=False)
                         self.start_collect = True
                     else:
                         await self.init()
                         await self.start()
 
-            if prm.MODE in ('T', 'TC'):
-                if prm.TLG_SERVICE:
-                    self.tlg_client = TlgClient(self.tlg_header, TLG_TOKEN, TLG_CHAT_ID)
+            if self.prm.MODE in ('T', 'TC'):
+                if self.prm.TLG_SERVICE:
+                    tlg_token, tlg_chat_id, _ = self.tlg_config()
+                    self.tlg_client = TlgClient(self.tlg_header, tlg_token, tlg_chat_id)
                     tasks_manage(
                         self.tasks,
-                        self.tlg_client.connect(send_init_message=(not GRID_ONLY or LOG_LEVEL == logging.DEBUG))
+                        self.tlg_client.connect(
+                            send_init_message=(not self.prm.GRID_ONLY or self.prm.LOG_LEVEL == logging.DEBUG)
+                        )
                     )
                     tasks_manage(self.tasks, self.tlg_get_command())
                 await self.wss_init()
-                tasks_manage(self.tasks, save_to_csv())
+                tasks_manage(self.tasks, save_to_csv(self.trades_file(), self.save_trade_queue))
                 tasks_manage(self.tasks, self.buffered_orders(), add_done_callback=False)
-                if self.session.client.real_market and prm.SAVE_ASSET:
+                if self.session.client.real_market and self.prm.SAVE_ASSET:
                     tasks_manage(self.tasks, self.save_asset(), add_done_callback=False)
-                if prm.MODE == 'TC':
+                if self.prm.MODE == 'TC':
                     tasks_manage(self.tasks, self.backtest_control(), add_done_callback=False)
                 if not restore_state:
                     await self.start()
@@ -1910,19 +2189,16 @@ class StrategyBase(metaclass=ABCMeta):
     # endregion
 
 
-async def save_to_csv() -> None:
-    file_name = Path(LAST_STATE_PATH, f"{prm.ID_EXCHANGE}_{prm.SYMBOL}.csv")
-
+async def save_to_csv(file_name: Path, queue: asyncio.Queue) -> None:
     async with aiofiles.open(file_name, mode="a", newline='') as afp:
         writer = AsyncWriter(afp)
         while True:
-            row_data = await SAVE_TRADE_QUEUE.get()
+            row_data = await queue.get()
             await writer.writerow(row_data)
-            SAVE_TRADE_QUEUE.task_done()
+            queue.task_done()
 
 
-def load_from_csv() -> list:
-    file_name = Path(LAST_STATE_PATH, f"{prm.ID_EXCHANGE}_{prm.SYMBOL}.csv")
+def load_from_csv(file_name: Path) -> list:
     trades = []
     if file_name.exists() and file_name.stat().st_size:
         data = []